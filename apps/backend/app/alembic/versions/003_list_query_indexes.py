@@ -0,0 +1,39 @@
+"""Add composite indexes for filtered, keyset-paginated list queries
+
+Revision ID: 003_list_query_indexes
+Revises: 0001
+Create Date: 2025-05-20 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '003_list_query_indexes'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns); each ends with the keyset order (sort key, id)
+INDEXES = [
+    ('ix_uba_login_anomaly_alerts_status_timestamp', 'uba_login_anomaly_alerts', ['status', 'timestamp', 'id']),
+    ('ix_uba_login_anomaly_alerts_user_id_timestamp', 'uba_login_anomaly_alerts', ['user_id', 'timestamp', 'id']),
+    ('ix_uba_login_anomaly_alerts_alert_type_timestamp', 'uba_login_anomaly_alerts', ['alert_type', 'timestamp', 'id']),
+    ('ix_threat_indicators_last_seen_id', 'threat_indicators', ['last_seen', 'id']),
+    ('ix_workflow_definitions_created_at_id', 'workflow_definitions', ['created_at', 'id']),
+    ('ix_workflow_instances_status_created_at', 'workflow_instances', ['status', 'created_at', 'id']),
+    ('ix_workflow_instances_definition_id_created_at', 'workflow_instances', ['definition_id', 'created_at', 'id']),
+]
+
+
+def upgrade():
+    # Build indexes without blocking writes; CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
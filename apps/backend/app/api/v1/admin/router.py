@@ -1,9 +1,12 @@
+from anyio import from_thread
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
 from app.db.models import User
 from app.api.v1.security.auth import has_role, has_permission
+from app.core.permissions import get_permission_engine
+from app.repositories import get_user_repository
 
 router = APIRouter(
     prefix="/admin",
@@ -11,7 +14,7 @@ router = APIRouter(
 )
 
 @router.get("/dashboard")
-async def admin_dashboard(current_user: User = Depends(has_role(["admin"]))):
+def admin_dashboard(current_user: User = Depends(has_role(["admin"]))):
     """Admin dashboard - requires admin role."""
     return {
         "message": "Welcome to the admin dashboard",
@@ -23,7 +26,7 @@ async def admin_dashboard(current_user: User = Depends(has_role(["admin"]))):
     }
 
 @router.delete("/users/{user_id}")
-async def delete_user(
+def delete_user(
     user_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(has_permission(["delete"]))
@@ -41,5 +44,10 @@ async def delete_user(
     # Delete user
     db.delete(user)
     db.commit()
+    get_user_repository(db).cache.delete_many([user_id])
+    
+    # Tokens with permission claims skip the user lookup; moving the permission
+    # epoch sends them back through the database, where the user no longer exists
+    from_thread.run(get_permission_engine().invalidate)
     
     return {"message": f"User with ID {user_id} has been deleted"}
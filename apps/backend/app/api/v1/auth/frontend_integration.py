@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 from typing import Dict, Any, Optional
 
 from app.db.session import get_db
+from app.repositories import get_user_repository
 from app.core.oauth import OAUTH_PROVIDERS
 from app.core.config import settings
 
@@ -43,7 +44,7 @@ async def get_oauth_providers():
     return {"providers": providers}
 
 @router.get("/user-data")
-async def get_frontend_user_data(
+def get_frontend_user_data(
     request: Request,
     db: Session = Depends(get_db)
 ):
@@ -73,10 +74,9 @@ async def get_frontend_user_data(
         token = auth_header.split(" ")[1]
         payload = verify_token(token)
         
-        # Get user from database
-        from app.db.models import User
+        # Get a cached snapshot of the user; only column data is needed here
         user_id = payload.get("sub")
-        user = db.query(User).filter(User.id == user_id).first()
+        user = get_user_repository(db).get_dto(int(user_id))
         
         if not user:
             raise HTTPException(
@@ -12,6 +12,7 @@ from app.db.models import User, Role
 from app.core.security import create_access_token, create_refresh_token, hash_password
 from app.core.oauth import oauth, get_oauth_user_info, OAUTH_PROVIDERS
 from app.core.config import settings
+from app.repositories import get_user_repository
 
 router = APIRouter(
     prefix="/oauth",
@@ -109,6 +110,7 @@ async def oauth_callback(request: Request, db: Session = Depends(get_db)):
         
         db.commit()
         db.refresh(existing_user)
+        get_user_repository(db).cache.delete_many([existing_user.id])
         user = existing_user
     else:
         # Create new user
@@ -144,7 +146,9 @@ async def oauth_callback(request: Request, db: Session = Depends(get_db)):
         user = new_user
     
     # Generate tokens
-    access_token = create_access_token({"sub": str(user.id)})
+    from app.core.permissions import get_permission_engine
+    permission_claims = await get_permission_engine().build_claims(user, db)
+    access_token = create_access_token({"sub": str(user.id)}, permission_claims)
     refresh_token = create_refresh_token({"sub": str(user.id)})
     
     # Record the successful OAuth login
@@ -1,35 +1,45 @@
+from anyio import from_thread
 from fastapi import APIRouter, HTTPException, status, Depends
 from typing import List
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
 from app.db.session import get_db
-from app.db.models import User, Role, Permission, RolePermission
+from app.db.models import User, Role, Permission
+from app.db.rbac import (
+    find_missing_ids, get_permission_names,
+    grant_role_permissions, revoke_role_permissions,
+    assign_user_roles, revoke_user_roles
+)
 from app.api.v1.auth.rbac_schemas import (
     RoleCreate, RoleResponse, RoleUpdate,
     PermissionCreate, PermissionResponse,
     RolePermissionRequest, UserRoleRequest,
-    UserWithRolesResponse
+    UserWithRolesResponse, BulkRoleGrantRequest, BulkRoleGrantResponse
 )
 from app.api.v1.security.auth import get_current_user
 from app.core.metrics_manager import get_metrics_manager
-from app.api.v1.security.rbac import has_permission
+from app.api.v1.security.user_permissions import has_permission
+from app.core.permissions import get_permission_engine
 
 # Get the metrics manager
 metrics = get_metrics_manager()
 
+# Get the permission engine
+permission_engine = get_permission_engine()
+
 router = APIRouter(tags=["rbac"])
 
 # Role Management
 @router.post("/roles", response_model=RoleResponse, status_code=status.HTTP_201_CREATED)
-async def create_role(
+def create_role(
     role: RoleCreate, 
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new role (admin only)."""
     # Check if user has permission to create roles
-    if not has_permission(current_user, "create_role"):
+    if not from_thread.run(has_permission, current_user, "create_role", db):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to create roles"
@@ -55,16 +65,19 @@ async def create_role(
     # Record metric for role creation
     metrics.record_rbac_operation("create_role", current_user.id)
     
+    # Recompile permission masks on every pod
+    from_thread.run(permission_engine.invalidate)
+    
     return new_role
 
 @router.get("/roles", response_model=List[RoleResponse])
-async def get_roles(
+def get_roles(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all roles (admin only)."""
     # Check if user has permission to view roles
-    if not has_permission(current_user, "view_roles"):
+    if not from_thread.run(has_permission, current_user, "view_roles", db):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to view roles"
@@ -74,14 +87,14 @@ async def get_roles(
     return roles
 
 @router.get("/roles/{role_id}", response_model=RoleResponse)
-async def get_role(
+def get_role(
     role_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific role by ID (admin only)."""
     # Check if user has permission to view roles
-    if not has_permission(current_user, "view_roles"):
+    if not from_thread.run(has_permission, current_user, "view_roles", db):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to view roles"
@@ -97,7 +110,7 @@ async def get_role(
     return role
 
 @router.put("/roles/{role_id}", response_model=RoleResponse)
-async def update_role(
+def update_role(
     role_id: int,
     role_update: RoleUpdate,
     db: Session = Depends(get_db),
@@ -105,7 +118,7 @@ async def update_role(
 ):
     """Update a role by ID (admin only)."""
     # Check if user has permission to update roles
-    if not has_permission(current_user, "update_role"):
+    if not from_thread.run(has_permission, current_user, "update_role", db):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to update roles"
@@ -139,17 +152,21 @@ async def update_role(
     # Record metric for role update
     metrics.record_rbac_operation("update_role", current_user.id)
     
+    # Recompile permission masks on every pod; tokens carry role names, so a
+    # rename must also move the permission epoch
+    from_thread.run(permission_engine.invalidate)
+    
     return role
 
 @router.delete("/roles/{role_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_role(
+def delete_role(
     role_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a role by ID (admin only)."""
     # Check if user has permission to delete roles
-    if not has_permission(current_user, "delete_role"):
+    if not from_thread.run(has_permission, current_user, "delete_role", db):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to delete roles"
@@ -177,18 +194,21 @@ async def delete_role(
     # Record metric for role deletion
     metrics.record_rbac_operation("delete_role", current_user.id)
     
+    # Recompile permission masks on every pod
+    from_thread.run(permission_engine.invalidate)
+    
     return None
 
 # Permission Management
 @router.post("/permissions", response_model=PermissionResponse, status_code=status.HTTP_201_CREATED)
-async def create_permission(
+def create_permission(
     permission: PermissionCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new permission (admin only)."""
     # Check if user has permission to create permissions
-    if not has_permission(current_user, "create_permission"):
+    if not from_thread.run(has_permission, current_user, "create_permission", db):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to create permissions"
@@ -214,16 +234,19 @@ async def create_permission(
     # Record metric for permission creation
     metrics.record_rbac_operation("create_permission", current_user.id)
     
+    # Recompile permission masks on every pod
+    from_thread.run(permission_engine.invalidate)
+    
     return new_permission
 
 @router.get("/permissions", response_model=List[PermissionResponse])
-async def get_permissions(
+def get_permissions(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all permissions (admin only)."""
     # Check if user has permission to view permissions
-    if not has_permission(current_user, "view_permissions"):
+    if not from_thread.run(has_permission, current_user, "view_permissions", db):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to view permissions"
@@ -233,14 +256,14 @@ async def get_permissions(
     return permissions
 
 @router.get("/permissions/{permission_id}", response_model=PermissionResponse)
-async def get_permission(
+def get_permission(
     permission_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific permission by ID (admin only)."""
     # Check if user has permission to view permissions
-    if not has_permission(current_user, "view_permissions"):
+    if not from_thread.run(has_permission, current_user, "view_permissions", db):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to view permissions"
@@ -256,14 +279,14 @@ async def get_permission(
     return permission
 
 @router.delete("/permissions/{permission_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_permission(
+def delete_permission(
     permission_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a permission by ID (admin only)."""
     # Check if user has permission to delete permissions
-    if not has_permission(current_user, "delete_permission"):
+    if not from_thread.run(has_permission, current_user, "delete_permission", db):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to delete permissions"
@@ -297,11 +320,14 @@ async def delete_permission(
     # Record metric for permission deletion
     metrics.record_rbac_operation("delete_permission", current_user.id)
     
+    # Recompile permission masks on every pod
+    from_thread.run(permission_engine.invalidate)
+    
     return None
 
 # Role-Permission Management
 @router.post("/roles/{role_id}/permissions", response_model=RoleResponse)
-async def assign_permissions_to_role(
+def assign_permissions_to_role(
     role_id: int,
     permission_request: RolePermissionRequest,
     db: Session = Depends(get_db),
@@ -309,7 +335,7 @@ async def assign_permissions_to_role(
 ):
     """Assign permissions to a role (admin only)."""
     # Check if user has permission to assign permissions
-    if not has_permission(current_user, "assign_permission"):
+    if not from_thread.run(has_permission, current_user, "assign_permission", db):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to assign permissions"
@@ -323,34 +349,27 @@ async def assign_permissions_to_role(
             detail=f"Role with ID {role_id} not found"
         )
     
-    # Get current role permissions
-    current_permission_ids = [p.permission_id for p in role.permissions]
-    
-    # Add new permissions
-    for permission_id in permission_request.permission_ids:
-        # Skip if already assigned
-        if permission_id in current_permission_ids:
-            continue
-        
-        # Check if permission exists
-        permission = db.query(Permission).filter(Permission.id == permission_id).first()
-        if not permission:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Permission with ID {permission_id} not found"
-            )
-        
-        # Create role-permission association
-        role_permission = RolePermission(role_id=role_id, permission_id=permission_id)
-        db.add(role_permission)
+    # Check that all permissions exist in one query
+    missing_ids = find_missing_ids(db, Permission, permission_request.permission_ids)
+    if missing_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Permission with ID {missing_ids[0]} not found"
+        )
     
     try:
+        # Add new permissions in one insert, skipping ones already assigned
+        grant_role_permissions(db, ((role_id, permission_id) for permission_id in permission_request.permission_ids))
+
         db.commit()
         db.refresh(role)
         
         # Record metric for permission assignment
         metrics.record_rbac_operation("assign_permission", current_user.id)
         
+        # Recompile permission masks on every pod
+        from_thread.run(permission_engine.invalidate)
+        
         return role
     except IntegrityError:
         db.rollback()
@@ -360,7 +379,7 @@ async def assign_permissions_to_role(
         )
 
 @router.delete("/roles/{role_id}/permissions", response_model=RoleResponse)
-async def revoke_permissions_from_role(
+def revoke_permissions_from_role(
     role_id: int,
     permission_request: RolePermissionRequest,
     db: Session = Depends(get_db),
@@ -368,7 +387,7 @@ async def revoke_permissions_from_role(
 ):
     """Revoke permissions from a role (admin only)."""
     # Check if user has permission to revoke permissions
-    if not has_permission(current_user, "revoke_permission"):
+    if not from_thread.run(has_permission, current_user, "revoke_permission", db):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to revoke permissions"
@@ -392,20 +411,16 @@ async def revoke_permissions_from_role(
         ]
         
         # Check if trying to remove protected permissions
-        for permission_id in permission_request.permission_ids:
-            permission = db.query(Permission).filter(Permission.id == permission_id).first()
-            if permission and permission.name in protected_permissions:
+        permission_names = get_permission_names(db, permission_request.permission_ids)
+        for permission_name in permission_names.values():
+            if permission_name in protected_permissions:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Cannot remove essential permission '{permission.name}' from admin role"
+                    detail=f"Cannot remove essential permission '{permission_name}' from admin role"
                 )
     
-    # Remove permissions
-    for permission_id in permission_request.permission_ids:
-        db.query(RolePermission).filter(
-            RolePermission.role_id == role_id,
-            RolePermission.permission_id == permission_id
-        ).delete()
+    # Remove permissions in one statement
+    revoke_role_permissions(db, role_id, permission_request.permission_ids)
     
     db.commit()
     db.refresh(role)
@@ -413,11 +428,68 @@ async def revoke_permissions_from_role(
     # Record metric for permission revocation
     metrics.record_rbac_operation("revoke_permission", current_user.id)
     
+    # Recompile permission masks on every pod
+    from_thread.run(permission_engine.invalidate)
+    
     return role
 
+@router.post("/roles/permissions/bulk", response_model=BulkRoleGrantResponse)
+def bulk_assign_permissions(
+    bulk_request: BulkRoleGrantRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Assign permissions to many roles in one transaction (admin only)."""
+    # Check if user has permission to assign permissions
+    if not from_thread.run(has_permission, current_user, "assign_permission", db):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to assign permissions"
+        )
+    
+    # Check that all roles and permissions exist, one query each
+    role_ids = {grant.role_id for grant in bulk_request.grants}
+    missing_ids = find_missing_ids(db, Role, role_ids)
+    if missing_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Role with ID {missing_ids[0]} not found"
+        )
+    
+    missing_ids = find_missing_ids(
+        db, Permission, {permission_id for grant in bulk_request.grants for permission_id in grant.permission_ids}
+    )
+    if missing_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Permission with ID {missing_ids[0]} not found"
+        )
+    
+    try:
+        # All grants go in one insert and one commit, so they apply together or not at all
+        granted = grant_role_permissions(
+            db,
+            ((grant.role_id, permission_id) for grant in bulk_request.grants for permission_id in grant.permission_ids)
+        )
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Error assigning permissions to roles"
+        )
+    
+    # Record metric for permission assignment
+    metrics.record_rbac_operation("bulk_assign_permission", current_user.id)
+    
+    # Recompile permission masks on every pod
+    from_thread.run(permission_engine.invalidate)
+    
+    return BulkRoleGrantResponse(granted=granted, role_ids=sorted(role_ids))
+
 # User-Role Management
 @router.post("/users/{user_id}/roles", response_model=UserWithRolesResponse)
-async def assign_roles_to_user(
+def assign_roles_to_user(
     user_id: int,
     role_request: UserRoleRequest,
     db: Session = Depends(get_db),
@@ -425,7 +497,7 @@ async def assign_roles_to_user(
 ):
     """Assign roles to a user (admin only)."""
     # Check if user has permission to assign roles
-    if not has_permission(current_user, "assign_role"):
+    if not from_thread.run(has_permission, current_user, "assign_role", db):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to assign roles"
@@ -439,25 +511,16 @@ async def assign_roles_to_user(
             detail=f"User with ID {user_id} not found"
         )
     
-    # Get current user roles
-    current_role_ids = [r.id for r in user.roles]
+    # Check that all roles exist in one query
+    missing_ids = find_missing_ids(db, Role, role_request.role_ids)
+    if missing_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Role with ID {missing_ids[0]} not found"
+        )
     
-    # Add new roles
-    for role_id in role_request.role_ids:
-        # Skip if already assigned
-        if role_id in current_role_ids:
-            continue
-        
-        # Check if role exists
-        role = db.query(Role).filter(Role.id == role_id).first()
-        if not role:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Role with ID {role_id} not found"
-            )
-        
-        # Add role to user
-        user.roles.append(role)
+    # Add new roles in one insert, skipping ones already assigned
+    assign_user_roles(db, user_id, role_request.role_ids)
     
     db.commit()
     db.refresh(user)
@@ -465,10 +528,13 @@ async def assign_roles_to_user(
     # Record metric for role assignment
     metrics.record_rbac_operation("assign_role", current_user.id)
     
+    # Bump the permission epoch so tokens issued with the old roles are re-checked
+    from_thread.run(permission_engine.invalidate)
+    
     return user
 
 @router.delete("/users/{user_id}/roles", response_model=UserWithRolesResponse)
-async def revoke_roles_from_user(
+def revoke_roles_from_user(
     user_id: int,
     role_request: UserRoleRequest,
     db: Session = Depends(get_db),
@@ -476,7 +542,7 @@ async def revoke_roles_from_user(
 ):
     """Revoke roles from a user (admin only)."""
     # Check if user has permission to revoke roles
-    if not has_permission(current_user, "revoke_role"):
+    if not from_thread.run(has_permission, current_user, "revoke_role", db):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to revoke roles"
@@ -501,11 +567,8 @@ async def revoke_roles_from_user(
                 detail="Cannot remove admin role from the last admin user"
             )
     
-    # Remove roles
-    for role_id in role_request.role_ids:
-        role = db.query(Role).filter(Role.id == role_id).first()
-        if role and role in user.roles:
-            user.roles.remove(role)
+    # Remove roles in one statement
+    revoke_user_roles(db, user_id, role_request.role_ids)
     
     db.commit()
     db.refresh(user)
@@ -513,16 +576,19 @@ async def revoke_roles_from_user(
     # Record metric for role revocation
     metrics.record_rbac_operation("revoke_role", current_user.id)
     
+    # Bump the permission epoch so tokens issued with the old roles are re-checked
+    from_thread.run(permission_engine.invalidate)
+    
     return user
 
 @router.get("/users", response_model=List[UserWithRolesResponse])
-async def get_users_with_roles(
+def get_users_with_roles(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all users with their roles (admin only)."""
     # Check if user has permission to view users
-    if not has_permission(current_user, "view_users"):
+    if not from_thread.run(has_permission, current_user, "view_users", db):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to view users"
@@ -532,14 +598,14 @@ async def get_users_with_roles(
     return users
 
 @router.get("/users/{user_id}/roles", response_model=UserWithRolesResponse)
-async def get_user_roles(
+def get_user_roles(
     user_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get roles assigned to a specific user (admin only)."""
     # Check if user has permission to view roles
-    if not has_permission(current_user, "view_roles") and current_user.id != user_id:
+    if not from_thread.run(has_permission, current_user, "view_roles", db) and current_user.id != user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to view user roles"
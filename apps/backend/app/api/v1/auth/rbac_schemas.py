@@ -38,6 +38,17 @@ class RolePermissionRequest(BaseModel):
 class UserRoleRequest(BaseModel):
     role_ids: List[int]
 
+class RoleGrant(BaseModel):
+    role_id: int
+    permission_ids: List[int]
+
+class BulkRoleGrantRequest(BaseModel):
+    grants: List[RoleGrant]
+
+class BulkRoleGrantResponse(BaseModel):
+    granted: int
+    role_ids: List[int]
+
 class UserWithRolesResponse(BaseModel):
     id: int
     email: str
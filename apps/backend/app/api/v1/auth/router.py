@@ -1,30 +1,37 @@
+from anyio import from_thread
 from fastapi import APIRouter, HTTPException, status, Depends, Request
 from app.api.v1.auth.schemas import (
     UserCreateRequest, UserResponse, TokenResponse, 
     UserProfileResponse, UserProfileUpdateRequest, UserLoginRequest
 )
+from app.core.config import settings
 from app.db.session import get_db
 from app.db.models import User, Role
 from app.core.security import hash_password, verify_token, create_access_token, create_refresh_token, verify_password
 from app.api.v1.security.auth import get_current_user
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from app.api.v1.auth.oauth import router as oauth_router
 from app.api.v1.auth.frontend_integration import router as frontend_router
 from app.api.v1.security.rbac import router as rbac_router
 from app.core.metrics_manager import get_metrics_manager
+from app.core.permissions import get_permission_engine
+from app.repositories import get_user_repository
 
 router = APIRouter()
 
 # Get metrics manager
 metrics = get_metrics_manager()
 
+# Get permission engine
+permission_engine = get_permission_engine()
+
 # Include OAuth, frontend integration, and RBAC routers
 router.include_router(oauth_router)
 router.include_router(frontend_router)
 router.include_router(rbac_router)
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register_user(user: UserCreateRequest, db: Session = Depends(get_db)):
+def register_user(user: UserCreateRequest, db: Session = Depends(get_db)):
     """Register a new user."""
     # Check if email already exists
     existing_user = db.query(User).filter(User.email == user.email).first()
@@ -58,10 +65,10 @@ async def register_user(user: UserCreateRequest, db: Session = Depends(get_db)):
     return new_user
 
 @router.post("/login", response_model=TokenResponse)
-async def login_user(user_login: UserLoginRequest, db: Session = Depends(get_db)):
+def login_user(user_login: UserLoginRequest, db: Session = Depends(get_db)):
     """Login a user and return JWT tokens."""
     # Find user by email
-    user = db.query(User).filter(User.email == user_login.email).first()
+    user = db.query(User).options(selectinload(User.roles)).filter(User.email == user_login.email).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -76,13 +83,13 @@ async def login_user(user_login: UserLoginRequest, db: Session = Depends(get_db)
         )
     
     # Generate tokens
-    access_token = create_access_token({"sub": str(user.id)})
+    access_token = create_access_token({"sub": str(user.id)}, from_thread.run(permission_engine.build_claims, user, db))
     refresh_token = create_refresh_token({"sub": str(user.id)})
     
     return {"access_token": access_token, "refresh_token": refresh_token}
 
 @router.post("/refresh", response_model=TokenResponse)
-async def refresh_token(request: Request):
+def refresh_token(request: Request, db: Session = Depends(get_db)):
     """Refresh the access token using a valid refresh token."""
     refresh_token = request.headers.get("Authorization")
     if not refresh_token or not refresh_token.startswith("Bearer "):
@@ -94,7 +101,13 @@ async def refresh_token(request: Request):
     token = refresh_token.split(" ")[1]
     try:
         payload = verify_token(token)
-        new_access_token = create_access_token({"sub": payload["sub"]})
+        permission_claims = {}
+        if settings.JWT_PERMISSION_CLAIMS:
+            # Re-issue current claims so a refresh picks up RBAC changes
+            user = db.query(User).options(selectinload(User.roles)).filter(User.id == int(payload["sub"])).first()
+            if user:
+                permission_claims = from_thread.run(permission_engine.build_claims, user, db)
+        new_access_token = create_access_token({"sub": payload["sub"]}, permission_claims)
         return {"access_token": new_access_token, "refresh_token": token}
     except ValueError as e:
         raise HTTPException(
@@ -108,7 +121,7 @@ async def get_user_profile(current_user: User = Depends(get_current_user)):
     return current_user
 
 @router.put("/me", response_model=UserProfileResponse)
-async def update_user_profile(
+def update_user_profile(
     profile_update: UserProfileUpdateRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -135,6 +148,9 @@ async def update_user_profile(
     db.commit()
     db.refresh(user)
     
+    # Drop the cached snapshot of the user on every pod
+    get_user_repository(db).cache.delete_many([user.id])
+    
     # Record metric for profile update
     metrics.record_user_activity("profile_update", str(user.id))
     
@@ -13,7 +13,7 @@ router = APIRouter(
 )
 
 @router.get("/operational-trends", response_model=Dict[str, List[AnalysisTrend]])
-async def get_operational_trends(
+def get_operational_trends(
     db: Session = Depends(get_db),
     trend_type: Optional[str] = Query(None, description="Filter by trend type (e.g., workflow_duration_anomaly, login_failures)"),
     time_period: Optional[str] = Query(None, description="Filter by time period (today, week, month)"),
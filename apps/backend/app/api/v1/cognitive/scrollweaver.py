@@ -39,7 +39,7 @@ async def generate_workflow_from_nl(
     return response
 
 @router.get("/history", response_model=Dict[str, List[Dict[str, Any]]])
-async def get_scrollweaver_history(
+def get_scrollweaver_history(
     db: Session = Depends(get_db),
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
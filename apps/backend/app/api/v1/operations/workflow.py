@@ -22,7 +22,7 @@ router = APIRouter(
 
 # Workflow Definition endpoints
 @router.post("/definitions", response_model=WorkflowDefinition, status_code=status.HTTP_201_CREATED)
-async def create_workflow_definition(
+def create_workflow_definition(
     workflow_in: WorkflowDefinitionCreate,
     db: Session = Depends(get_db),
 ):
@@ -45,28 +45,35 @@ async def create_workflow_definition(
     return workflow
 
 @router.get("/definitions", response_model=PaginatedResponse)
-async def get_workflow_definitions(
+def get_workflow_definitions(
     db: Session = Depends(get_db),
     limit: int = Query(25, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; takes precedence over offset"),
     sort_by: str = "created_at",
     sort_order: str = "desc",
 ):
     """
     Retrieve a list of workflow definitions
     """
-    # Get total count
-    total = workflow_definition_repository.count(db)
-    
     # Get data
-    workflows = workflow_definition_repository.get_multi(
-        db, skip=offset, limit=limit
-    )
+    try:
+        page = workflow_definition_repository.get_page(
+            db, limit=limit, cursor=cursor, offset=offset, sort_by=sort_by, sort_order=sort_order
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    
+    # Get total count (cached, estimated on large tables)
+    total, estimated = workflow_definition_repository.approximate_count(db)
     
     # Calculate pagination metadata
     page_size = limit
     total_pages = (total + page_size - 1) // page_size
-    current_page = (offset // page_size) + 1
+    current_page = None if cursor else (offset // page_size) + 1
     
     # Prepare response
     pagination = PaginationMeta(
@@ -74,15 +81,17 @@ async def get_workflow_definitions(
         total_pages=total_pages,
         current_page=current_page,
         page_size=page_size,
+        next_cursor=page.next_cursor,
+        total_is_estimate=estimated,
     )
     
     return PaginatedResponse(
-        data=workflows,
+        data=[WorkflowDefinition.model_validate(definition) for definition in page.items],
         pagination=pagination,
     )
 
 @router.get("/definitions/{definition_id}", response_model=WorkflowDefinition)
-async def get_workflow_definition(
+def get_workflow_definition(
     definition_id: UUID,
     db: Session = Depends(get_db),
 ):
@@ -98,7 +107,7 @@ async def get_workflow_definition(
     return workflow
 
 @router.put("/definitions/{definition_id}", response_model=WorkflowDefinition)
-async def update_workflow_definition(
+def update_workflow_definition(
     definition_id: UUID,
     workflow_in: WorkflowDefinitionUpdate,
     db: Session = Depends(get_db),
@@ -120,7 +129,7 @@ async def update_workflow_definition(
 
 # Workflow Instance endpoints
 @router.post("/instances", response_model=WorkflowInstance, status_code=status.HTTP_201_CREATED)
-async def create_workflow_instance(
+def create_workflow_instance(
     instance_in: WorkflowInstanceCreate,
     db: Session = Depends(get_db),
 ):
@@ -143,10 +152,11 @@ async def create_workflow_instance(
         )
 
 @router.get("/instances", response_model=PaginatedResponse)
-async def get_workflow_instances(
+def get_workflow_instances(
     db: Session = Depends(get_db),
     limit: int = Query(25, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; takes precedence over offset"),
     status: Optional[str] = None,
     definition_id: Optional[UUID] = None,
     sort_by: str = "created_at",
@@ -155,18 +165,25 @@ async def get_workflow_instances(
     """
     Retrieve a list of workflow instances with optional filtering
     """
-    # Get total count
-    total = workflow_instance_repository.count(
-        db, 
-        definition_id=definition_id,
-        status=status,
-    )
-    
     # Get data
-    instances = workflow_instance_repository.get_multi(
+    try:
+        page = workflow_instance_repository.get_page(
+            db, 
+            limit=limit,
+            cursor=cursor,
+            offset=offset,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            definition_id=definition_id,
+            status=status,
+        )
+    except ValueError as e:
+        # The status query parameter shadows fastapi.status here
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Get total count (cached, estimated on large tables)
+    total, estimated = workflow_instance_repository.approximate_count(
         db, 
-        skip=offset, 
-        limit=limit,
         definition_id=definition_id,
         status=status,
     )
@@ -174,7 +191,7 @@ async def get_workflow_instances(
     # Calculate pagination metadata
     page_size = limit
     total_pages = (total + page_size - 1) // page_size
-    current_page = (offset // page_size) + 1
+    current_page = None if cursor else (offset // page_size) + 1
     
     # Prepare response
     pagination = PaginationMeta(
@@ -182,15 +199,17 @@ async def get_workflow_instances(
         total_pages=total_pages,
         current_page=current_page,
         page_size=page_size,
+        next_cursor=page.next_cursor,
+        total_is_estimate=estimated,
     )
     
     return PaginatedResponse(
-        data=instances,
+        data=[WorkflowInstance.model_validate(instance) for instance in page.items],
         pagination=pagination,
     )
 
 @router.get("/instances/{instance_id}", response_model=WorkflowInstance)
-async def get_workflow_instance(
+def get_workflow_instance(
     instance_id: UUID,
     db: Session = Depends(get_db),
 ):
@@ -206,7 +225,7 @@ async def get_workflow_instance(
     return instance
 
 @router.post("/instances/{instance_id}/tasks/{task_id}/complete", response_model=WorkflowInstance)
-async def complete_task(
+def complete_task(
     instance_id: UUID,
     task_id: str,
     task_completion: TaskCompletion,
@@ -2,47 +2,174 @@
 Auth middleware for RBAC
 """
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from jwt import PyJWTError
-from sqlalchemy.orm import Session
-from typing import List, Set
+from sqlalchemy.orm import Session, selectinload
+from typing import Any, Dict, List, Optional, Union
 
+from app.core.permissions import get_permission_engine
 from app.core.security import verify_token
 from app.db.session import get_db
-from app.db.models import User, Role, Permission
+from app.db.models import User
 
 # OAuth2 scheme for token extraction from request
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    """
-    Get the current user from the JWT token.
-    
-    This dependency extracts the user ID from the JWT token and fetches the user
-    from the database, making it available to route handlers.
-    """
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    """Build the 401 raised for missing or invalid credentials."""
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _decode_token(token: str) -> Dict[str, Any]:
+    """
+    Verify a JWT and return its payload.
     
+    Args:
+        token: The encoded JWT
+    
+    Returns:
+        The decoded payload, which always has a subject
+    """
     try:
         # Verify token and extract user_id (sub)
         payload = verify_token(token)
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except PyJWTError:
-        raise credentials_exception
-    
-    # Get user from database
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
-        raise credentials_exception
+    except (PyJWTError, ValueError):
+        raise _credentials_exception()
+    
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
+
+def _load_user(user_id: Any, db: Session) -> User:
+    """
+    Get a user from the database.
     
+    Args:
+        user_id: The user ID from the token subject
+        db: Database session
+    
+    Returns:
+        The user
+    """
+    try:
+        # Token subjects are strings; bind them as the integer the column holds
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        raise _credentials_exception()
+    # Roles are loaded here, so permission checks on the event loop do not query
+    user = db.query(User).options(selectinload(User.roles)).filter(User.id == user_id).first()
+    if user is None:
+        raise _credentials_exception()
     return user
 
+class TokenUser:
+    """
+    Authenticated user described by the permission claims of its access token.
+    
+    Role names and the permission mask come from the token, so authorization
+    needs no database access. Any other attribute (email, name, ...) loads
+    the user row on first use.
+    """
+    
+    def __init__(self, user_id: int, role_names: List[str], permission_mask: int, db: Session):
+        self.id = user_id
+        self.role_names = role_names
+        self.permission_mask = permission_mask
+        self._db = db
+        self._user: Optional[User] = None
+    
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not set in __init__
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if self._user is None:
+            self._user = _load_user(self.id, self._db)
+        return getattr(self._user, name)
+
+async def _claims_user(payload: Dict[str, Any], db: Session) -> Optional[TokenUser]:
+    """
+    Build a TokenUser from token claims if they are still current.
+    
+    Args:
+        payload: The decoded token payload
+        db: Database session
+    
+    Returns:
+        The token user, or None if the token has no permission claims or they
+        predate the current permission epoch
+    """
+    epoch = payload.get("pep")
+    if epoch is None:
+        return None
+    
+    if epoch != await get_permission_engine().current_generation():
+        return None
+    
+    try:
+        return TokenUser(int(payload["sub"]), list(payload["rol"]), int(payload["prm"], 16), db)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    """
+    Get the current user from the JWT token.
+    
+    This dependency extracts the user ID from the JWT token and fetches the user
+    from the database, making it available to route handlers. It is a plain
+    function, so FastAPI runs the query in its threadpool.
+    """
+    payload = _decode_token(token)
+    return _load_user(payload["sub"], db)
+
+async def get_current_principal(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Union[User, TokenUser]:
+    """
+    Get the current user for authorization checks.
+    
+    Tokens carrying current permission claims are trusted without touching the
+    database; otherwise the user is loaded as in get_current_user.
+    """
+    payload = _decode_token(token)
+    user = await _claims_user(payload, db)
+    if user is not None:
+        return user
+    # The session is synchronous; keep its query off the event loop
+    return await run_in_threadpool(_load_user, payload["sub"], db)
+
+def get_role_names(user: Union[User, TokenUser]) -> List[str]:
+    """
+    Get the role names of a user.
+    
+    Args:
+        user: The user or token user
+    
+    Returns:
+        List of role names
+    """
+    if isinstance(user, TokenUser):
+        return user.role_names
+    return [str(role.name) for role in user.roles if role.name]
+
+async def get_permission_mask(user: Union[User, TokenUser], db: Session) -> int:
+    """
+    Get the permission mask of a user and make sure the engine is current.
+    
+    Args:
+        user: The user or token user
+        db: Database session
+    
+    Returns:
+        The user's permission mask
+    """
+    permission_engine = get_permission_engine()
+    await permission_engine.ensure_current(db)
+    if isinstance(user, TokenUser):
+        return user.permission_mask
+    return permission_engine.user_mask(role.id for role in user.roles)
+
 def has_role(required_roles: List[str]):
     """
     Dependency factory that checks if the user has any of the required roles.
@@ -52,13 +179,8 @@ def has_role(required_roles: List[str]):
         async def admin_only(user: User = Depends(has_role(["admin"]))):
             return {"message": "You are an admin!"}
     """
-    async def _has_role(current_user: User = Depends(get_current_user)):
-        # Get role names from user.roles
-        user_roles: List[str] = []
-        for role in current_user.roles:
-            role_name = str(role.name)
-            if role_name:
-                user_roles.append(role_name)
+    async def _has_role(current_user: Union[User, TokenUser] = Depends(get_current_principal)):
+        user_roles = get_role_names(current_user)
         
         if not any(role in user_roles for role in required_roles):
             raise HTTPException(
@@ -79,23 +201,14 @@ def has_permission(required_permissions: List[str]):
         async def delete_item(item_id: int, user: User = Depends(has_permission(["delete"]))):
             return {"message": "Item deleted"}
     """
-    async def _has_permission(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-        user_permissions: Set[str] = set()
-        
-        for role in current_user.roles:
-            role_perms = db.query(Permission.name).join(
-                Role.permissions
-            ).filter(
-                Role.id == role.id
-            ).all()
-            
-            for perm in role_perms:
-                perm_name = str(perm[0])
-                if perm_name:
-                    user_permissions.add(perm_name)
+    async def _has_permission(
+        current_user: Union[User, TokenUser] = Depends(get_current_principal),
+        db: Session = Depends(get_db)
+    ):
+        user_mask = await get_permission_mask(current_user, db)
         
         # Check if user has all required permissions
-        if not all(perm in user_permissions for perm in required_permissions):
+        if not get_permission_engine().has_all(user_mask, required_permissions):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"User does not have the required permission(s): {', '.join(required_permissions)}"
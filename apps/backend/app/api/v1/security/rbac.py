@@ -1,16 +1,22 @@
+from anyio import from_thread
 from fastapi import APIRouter, HTTPException, status, Depends
 from pydantic import BaseModel
 from typing import List, Optional
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
-from app.db.models import Role, User, Permission, RolePermission
+from app.db.models import Role, User, RolePermission
+from app.db.rbac import get_or_create_permissions, grant_role_permissions, replace_role_permissions
+from app.core.permissions import get_permission_engine
 
 router = APIRouter(
     prefix="/rbac",
     tags=["rbac"],
 )
 
+# Get the permission engine
+permission_engine = get_permission_engine()
+
 class RolePermissionRequest(BaseModel):
     role: str
     permissions: List[str]
@@ -35,12 +41,12 @@ class PermissionResponse(BaseModel):
         orm_mode = True
 
 @router.get("/roles", response_model=List[RoleResponse])
-async def get_roles(db: Session = Depends(get_db)):
+def get_roles(db: Session = Depends(get_db)):
     """Fetch all roles."""
     return db.query(Role).all()
 
 @router.post("/roles", status_code=status.HTTP_201_CREATED, response_model=RoleResponse)
-async def create_role(role_request: RolePermissionRequest, db: Session = Depends(get_db)):
+def create_role(role_request: RolePermissionRequest, db: Session = Depends(get_db)):
     """Create a new role with permissions."""
     # Check if role already exists
     existing_role = db.query(Role).filter(Role.name == role_request.role).first()
@@ -55,25 +61,17 @@ async def create_role(role_request: RolePermissionRequest, db: Session = Depends
     db.add(new_role)
     db.flush()
     
-    # Add permissions to role
-    for perm_name in role_request.permissions:
-        # Get or create permission
-        permission = db.query(Permission).filter(Permission.name == perm_name).first()
-        if not permission:
-            permission = Permission(name=perm_name)
-            db.add(permission)
-            db.flush()
-        
-        # Create role-permission association
-        role_perm = RolePermission(role_id=new_role.id, permission_id=permission.id)
-        db.add(role_perm)
+    # Add permissions to role, creating missing ones in one insert
+    permission_ids = get_or_create_permissions(db, role_request.permissions)
+    grant_role_permissions(db, ((new_role.id, permission_id) for permission_id in permission_ids.values()))
     
     db.commit()
     db.refresh(new_role)
+    from_thread.run(permission_engine.invalidate)
     return new_role
 
 @router.put("/roles/{role_id}", response_model=RoleResponse)
-async def update_role(role_id: int, role_request: RolePermissionRequest, db: Session = Depends(get_db)):
+def update_role(role_id: int, role_request: RolePermissionRequest, db: Session = Depends(get_db)):
     """Update permissions for an existing role."""
     # Find role by ID
     role = db.query(Role).filter(Role.id == role_id).first()
@@ -87,28 +85,17 @@ async def update_role(role_id: int, role_request: RolePermissionRequest, db: Ses
     if str(role.name) != role_request.role:
         role.name = role_request.role
     
-    # Clear existing permissions
-    db.query(RolePermission).filter(RolePermission.role_id == role.id).delete()
-    
-    # Add new permissions
-    for perm_name in role_request.permissions:
-        # Get or create permission
-        permission = db.query(Permission).filter(Permission.name == perm_name).first()
-        if not permission:
-            permission = Permission(name=perm_name)
-            db.add(permission)
-            db.flush()
-        
-        # Create role-permission association
-        role_perm = RolePermission(role_id=role.id, permission_id=permission.id)
-        db.add(role_perm)
+    # Replace permissions, creating missing ones in one insert
+    permission_ids = get_or_create_permissions(db, role_request.permissions)
+    replace_role_permissions(db, role.id, permission_ids.values())
     
     db.commit()
     db.refresh(role)
+    from_thread.run(permission_engine.invalidate)
     return role
 
 @router.delete("/roles/{role_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_role(role_id: int, db: Session = Depends(get_db)):
+def delete_role(role_id: int, db: Session = Depends(get_db)):
     """Delete a role."""
     role = db.query(Role).filter(Role.id == role_id).first()
     if not role:
@@ -123,10 +110,11 @@ async def delete_role(role_id: int, db: Session = Depends(get_db)):
     # Delete role
     db.delete(role)
     db.commit()
+    from_thread.run(permission_engine.invalidate)
     return {"message": "Role deleted successfully."}
 
 @router.post("/users/{user_id}/roles", status_code=status.HTTP_201_CREATED)
-async def assign_role_to_user(user_role: UserRoleRequest, db: Session = Depends(get_db)):
+def assign_role_to_user(user_role: UserRoleRequest, db: Session = Depends(get_db)):
     """Assign a role to a user."""
     # Check if user exists
     user = db.query(User).filter(User.id == user_role.user_id).first()
@@ -154,11 +142,12 @@ async def assign_role_to_user(user_role: UserRoleRequest, db: Session = Depends(
     # Assign role to user
     user.roles.append(role)
     db.commit()
+    from_thread.run(permission_engine.invalidate)
     
     return {"message": f"Role '{role.name}' assigned to user with ID {user.id}"}
 
 @router.delete("/users/{user_id}/roles/{role_name}", status_code=status.HTTP_204_NO_CONTENT)
-async def remove_role_from_user(user_id: int, role_name: str, db: Session = Depends(get_db)):
+def remove_role_from_user(user_id: int, role_name: str, db: Session = Depends(get_db)):
     """Remove a role from a user."""
     # Check if user exists
     user = db.query(User).filter(User.id == user_id).first()
@@ -186,11 +175,12 @@ async def remove_role_from_user(user_id: int, role_name: str, db: Session = Depe
     # Remove role from user
     user.roles.remove(role)
     db.commit()
+    from_thread.run(permission_engine.invalidate)
     
     return {"message": f"Role '{role.name}' removed from user with ID {user.id}"}
 
 @router.get("/users/{user_id}/roles", response_model=List[RoleResponse])
-async def get_user_roles(user_id: int, db: Session = Depends(get_db)):
+def get_user_roles(user_id: int, db: Session = Depends(get_db)):
     """Get all roles assigned to a user."""
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
@@ -15,10 +15,11 @@ router = APIRouter(
 )
 
 @router.get("/indicators", response_model=PaginatedResponse)
-async def get_threat_indicators(
+def get_threat_indicators(
     db: Session = Depends(get_db),
     limit: int = Query(25, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; takes precedence over offset"),
     source: Optional[str] = None,
     type: Optional[str] = None,
     severity: Optional[str] = None,
@@ -37,18 +38,24 @@ async def get_threat_indicators(
     if severity:
         filters["severity"] = severity
     
-    # Get total count
-    total = threat_indicator_repository.count(db, **filters)
-    
     # Get data
-    indicators = threat_indicator_repository.get_multi(
-        db, skip=offset, limit=limit, **filters
-    )
+    try:
+        page = threat_indicator_repository.get_page(
+            db, limit=limit, cursor=cursor, offset=offset, sort_by=sort_by, sort_order=sort_order, **filters
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    
+    # Get total count (cached, estimated on large tables)
+    total, estimated = threat_indicator_repository.approximate_count(db, **filters)
     
     # Calculate pagination metadata
     page_size = limit
     total_pages = (total + page_size - 1) // page_size
-    current_page = (offset // page_size) + 1
+    current_page = None if cursor else (offset // page_size) + 1
     
     # Prepare response
     pagination = PaginationMeta(
@@ -56,15 +63,17 @@ async def get_threat_indicators(
         total_pages=total_pages,
         current_page=current_page,
         page_size=page_size,
+        next_cursor=page.next_cursor,
+        total_is_estimate=estimated,
     )
     
     return PaginatedResponse(
-        data=indicators,
+        data=[ThreatIndicator.model_validate(indicator) for indicator in page.items],
         pagination=pagination,
     )
 
 @router.post("/ingest", status_code=201)
-async def ingest_feed(
+def ingest_feed(
     feed_url: str,
     db: Session = Depends(get_db),
 ):
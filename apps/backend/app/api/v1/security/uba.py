@@ -15,10 +15,11 @@ router = APIRouter(
 )
 
 @router.get("", response_model=PaginatedResponse)
-async def get_login_anomalies(
+def get_login_anomalies(
     db: Session = Depends(get_db),
     limit: int = Query(25, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; takes precedence over offset"),
     user_id: Optional[UUID] = None,
     alert_type: Optional[str] = None,
     status: Optional[str] = "new",
@@ -38,34 +39,27 @@ async def get_login_anomalies(
         filters["alert_type"] = alert_type
     if status:
         filters["status"] = status
-    
-    # Date filtering would require more sophisticated SQL queries
-    # For MVP, we'll handle it in memory after fetching
-    
-    # Get total count
-    total = uba_login_anomaly_repository.count(db, **filters)
+    if start_date:
+        filters["timestamp__gte"] = start_date
+    if end_date:
+        filters["timestamp__lte"] = end_date
     
     # Get data
-    anomalies = uba_login_anomaly_repository.get_multi(
-        db, skip=offset, limit=limit, **filters
-    )
+    try:
+        page = uba_login_anomaly_repository.get_page(
+            db, limit=limit, cursor=cursor, offset=offset, sort_by=sort_by, sort_order=sort_order, **filters
+        )
+    except ValueError as e:
+        # The status query parameter shadows fastapi.status here
+        raise HTTPException(status_code=400, detail=str(e))
     
-    # Filter by date if needed
-    if start_date or end_date:
-        filtered_anomalies = []
-        for anomaly in anomalies:
-            if start_date and anomaly.timestamp < start_date:
-                continue
-            if end_date and anomaly.timestamp > end_date:
-                continue
-            filtered_anomalies.append(anomaly)
-        anomalies = filtered_anomalies
-        # Note: this affects pagination accuracy, but is acceptable for MVP
+    # Get total count (cached, estimated on large tables)
+    total, estimated = uba_login_anomaly_repository.approximate_count(db, **filters)
     
     # Calculate pagination metadata
     page_size = limit
     total_pages = (total + page_size - 1) // page_size
-    current_page = (offset // page_size) + 1
+    current_page = None if cursor else (offset // page_size) + 1
     
     # Prepare response
     pagination = PaginationMeta(
@@ -73,15 +67,17 @@ async def get_login_anomalies(
         total_pages=total_pages,
         current_page=current_page,
         page_size=page_size,
+        next_cursor=page.next_cursor,
+        total_is_estimate=estimated,
     )
     
     return PaginatedResponse(
-        data=anomalies,
+        data=[UBALoginAnomalyAlert.model_validate(alert) for alert in page.items],
         pagination=pagination,
     )
 
 @router.patch("/{alert_id}", response_model=UBALoginAnomalyAlert)
-async def update_login_anomaly(
+def update_login_anomaly(
     alert_id: UUID = Path(..., description="The ID of the login anomaly alert"),
     alert_update: UBALoginAnomalyAlertUpdate = None,
     db: Session = Depends(get_db),
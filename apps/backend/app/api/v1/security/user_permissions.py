@@ -1,16 +1,24 @@
-from typing import List, Set
+from typing import List, Set, Union
 from fastapi import Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
-from app.db.models import User, Role, Permission, RolePermission
-from app.api.v1.security.auth import get_current_user
-from app.core.redis.permission_cache import get_cached_user_permissions, cache_user_permissions, invalidate_user_cache
+from app.db.models import User
+from app.api.v1.security.auth import TokenUser, get_current_principal, get_permission_mask, get_role_names
+from app.core.permissions import get_permission_engine
 
-async def get_user_permissions(user: User, db: Session) -> Set[str]:
+# Get permission engine
+permission_engine = get_permission_engine()
+
+def _is_admin(user: Union[User, TokenUser]) -> bool:
+    """Check if a user has the admin role (automatic access to everything)."""
+    return "admin" in get_role_names(user)
+
+async def get_user_permissions(user: Union[User, TokenUser], db: Session) -> Set[str]:
     """
     Get all permissions assigned to a user based on their roles.
-    First tries to retrieve from cache, then falls back to DB lookup.
+    Expanded from the compiled permission engine, which is rebuilt from the
+    database only when RBAC data changes.
     
     Args:
         user: The user for which to retrieve permissions
@@ -19,30 +27,9 @@ async def get_user_permissions(user: User, db: Session) -> Set[str]:
     Returns:
         Set of permission names the user has
     """
-    # Try to get from cache first
-    cached_permissions = await get_cached_user_permissions(user.id)
-    if cached_permissions:
-        return set(cached_permissions)
-    
-    # Cache miss, need to query the database
-    permissions = set()
-    
-    # Collect all permissions from all roles
-    for role in user.roles:
-        for role_permission in role.permissions:
-            # Get the permission name from the database
-            permission = db.query(Permission).filter(
-                Permission.id == role_permission.permission_id
-            ).first()
-            if permission:
-                permissions.add(permission.name)
-    
-    # Cache the permissions for future requests
-    await cache_user_permissions(user.id, list(permissions))
-    
-    return permissions
+    return permission_engine.permission_set(await get_permission_mask(user, db))
 
-async def has_permission(user: User, permission_name: str, db: Session) -> bool:
+async def has_permission(user: Union[User, TokenUser], permission_name: str, db: Session) -> bool:
     """
     Check if a user has a specific permission.
     
@@ -54,16 +41,12 @@ async def has_permission(user: User, permission_name: str, db: Session) -> bool:
     Returns:
         True if the user has the permission, False otherwise
     """
-    # Check if user is admin (automatic access to everything)
-    for role in user.roles:
-        if role.name == "admin":
-            return True
+    if _is_admin(user):
+        return True
     
-    # Get all user permissions and check if the specific permission is included
-    user_permissions = await get_user_permissions(user, db)
-    return permission_name in user_permissions
+    return permission_engine.has_all(await get_permission_mask(user, db), [permission_name])
 
-async def has_any_permission(user: User, permission_names: List[str], db: Session) -> bool:
+async def has_any_permission(user: Union[User, TokenUser], permission_names: List[str], db: Session) -> bool:
     """
     Check if a user has any of the specified permissions.
     
@@ -75,14 +58,10 @@ async def has_any_permission(user: User, permission_names: List[str], db: Sessio
     Returns:
         True if the user has any of the permissions, False otherwise
     """
-    # Check if user is admin (automatic access to everything)
-    for role in user.roles:
-        if role.name == "admin":
-            return True
+    if _is_admin(user):
+        return True
     
-    # Get all user permissions and check if any of the specified permissions are included
-    user_permissions = await get_user_permissions(user, db)
-    return any(permission in user_permissions for permission in permission_names)
+    return permission_engine.has_any(await get_permission_mask(user, db), permission_names)
 
 class PermissionChecker:
     """Permission checker dependency for FastAPI endpoints."""
@@ -91,7 +70,7 @@ class PermissionChecker:
         self.required_permission = required_permission
         
     async def __call__(self, 
-                 current_user: User = Depends(get_current_user),
+                 current_user: Union[User, TokenUser] = Depends(get_current_principal),
                  db: Session = Depends(get_db)):
         if not await has_permission(current_user, self.required_permission, db):
             raise HTTPException(
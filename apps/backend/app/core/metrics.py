@@ -6,6 +6,8 @@ from fastapi import FastAPI, Request, Response
 import time
 from functools import wraps
 
+from app.core.metrics_manager import get_metrics_manager, route_template
+
 # Import these conditionally to handle environments where they might not be available
 try:
     import prometheus_client as prom
@@ -30,7 +32,8 @@ if PROMETHEUS_AVAILABLE:
 
     ACTIVE_REQUESTS = prom.Gauge(
         "grimos_active_requests",
-        "Number of active requests"
+        "Number of active requests",
+        multiprocess_mode="livesum"
     )
 
     DB_QUERY_LATENCY = prom.Histogram(
@@ -92,9 +95,10 @@ def setup_metrics(app: FastAPI) -> None:
     # Add Prometheus metrics endpoint
     @app.get("/metrics")
     async def metrics():
+        content, media_type = get_metrics_manager().render()
         return Response(
-            content=prom.generate_latest(),
-            media_type="text/plain"
+            content=content,
+            media_type=media_type
         )
     
     # Add middleware to track request metrics
@@ -108,14 +112,15 @@ def setup_metrics(app: FastAPI) -> None:
             
             # Record request metrics
             request_time = time.time() - request_start_time
+            endpoint = route_template(request)
             REQUEST_COUNT.labels(
                 request.method, 
-                request.url.path, 
+                endpoint, 
                 response.status_code
             ).inc()
             REQUEST_LATENCY.labels(
                 request.method, 
-                request.url.path
+                endpoint
             ).observe(request_time)
             
             return response
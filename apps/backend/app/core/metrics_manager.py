@@ -3,15 +3,18 @@ Enhanced metrics implementation for the GrimOS API.
 This module provides a unified way to define, register, and manage Prometheus metrics.
 """
 
+import os
 import time
 import logging
-from typing import Dict, Any, Optional
+import threading
+from typing import Dict, Any, Optional, Set, Tuple
 from fastapi import FastAPI, Request
 import socket
 
 # Import prometheus conditionally to handle environments without it
 try:
     import prometheus_client as prom
+    from prometheus_client import multiprocess
     PROMETHEUS_AVAILABLE = True
 except ImportError:
     PROMETHEUS_AVAILABLE = False
@@ -19,6 +22,33 @@ except ImportError:
 # Configure logger
 logger = logging.getLogger("grimos.metrics")
 
+# With several worker processes (gunicorn, uvicorn --workers) prometheus_client
+# writes samples to per-process files in this directory, merged at scrape time
+MULTIPROCESS_MODE = PROMETHEUS_AVAILABLE and bool(
+    os.getenv("PROMETHEUS_MULTIPROC_DIR") or os.getenv("prometheus_multiproc_dir")
+)
+
+# Label value substituted once a label has seen too many distinct values
+OVERFLOW_LABEL = "__other__"
+
+# Endpoint label for requests that matched no route (404s, scanners)
+UNMATCHED_ROUTE = "__unmatched__"
+
+HTTP_METHODS = frozenset({"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"})
+
+def route_template(request: Request) -> str:
+    """
+    Get the route template a request matched, e.g. "/api/v1/users/{user_id}".
+    
+    Args:
+        request: The request, after routing
+        
+    Returns:
+        The matched route's path template, or UNMATCHED_ROUTE
+    """
+    route = request.scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or UNMATCHED_ROUTE
+
 class MetricsManager:
     """
     Manager for application metrics.
@@ -29,6 +59,12 @@ class MetricsManager:
         self.metrics: Dict[str, Any] = {}
         self.initialized = False
         self.host = socket.gethostname()
+        self.max_label_values = 200
+        # Label children by (metric name, label values), so the hot path skips .labels()
+        self._children: Dict[Tuple[str, Tuple[Any, ...]], Any] = {}
+        # Distinct values admitted per (metric name, label position)
+        self._label_values: Dict[Tuple[str, int], Set[Any]] = {}
+        self._lock = threading.Lock()
         
     def initialize(self, app: FastAPI):
         """
@@ -44,16 +80,21 @@ class MetricsManager:
         if self.initialized:
             return
             
+        from app.core.config import settings
+        self.max_label_values = settings.METRICS_MAX_LABEL_VALUES
+        
         # Register core metrics
         self.metrics["app_info"] = prom.Gauge(
             "grimos_app_info", 
             "Application information", 
-            ["version", "environment", "host"]
+            ["version", "environment", "host"],
+            multiprocess_mode="max"
         )
         
         self.metrics["startup_time"] = prom.Gauge(
             "grimos_startup_timestamp_seconds",
-            "Timestamp when the application started"
+            "Timestamp when the application started",
+            multiprocess_mode="min"
         )
         
         self.metrics["request_count"] = prom.Counter(
@@ -70,7 +111,8 @@ class MetricsManager:
         
         self.metrics["active_requests"] = prom.Gauge(
             "grimos_active_requests",
-            "Number of active requests"
+            "Number of active requests",
+            multiprocess_mode="livesum"
         )
         
         self.metrics["db_query_latency"] = prom.Histogram(
@@ -104,11 +146,11 @@ class MetricsManager:
             ["error_type"]
         )
 
-        # Add RBAC metrics
+        # Add RBAC metrics (not labelled by user, which would be unbounded)
         self.metrics["rbac_operation_count"] = prom.Counter(
             "grimos_rbac_operation_count",
             "Count of RBAC operations",
-            ["operation_type", "user_id"]
+            ["operation_type"]
         )
         
         # Set initial metric values
@@ -116,7 +158,100 @@ class MetricsManager:
         self.set_startup_time()
         
         self.initialized = True
-        logger.info("Metrics initialized")
+        logger.info(f"Metrics initialized (multiprocess: {MULTIPROCESS_MODE})")
+    
+    def _child(self, name: str, *labels: Any) -> Any:
+        """
+        Get the labelled child of a metric, creating it on first use.
+        
+        Args:
+            name: The metric key in self.metrics
+            labels: The label values
+            
+        Returns:
+            The metric child
+        """
+        child = self._children.get((name, labels))
+        if child is None:
+            child = self._create_child(name, labels)
+        return child
+    
+    def _create_child(self, name: str, labels: Tuple[Any, ...]) -> Any:
+        """
+        Create a metric child, capping each label at max_label_values distinct values.
+        
+        Children with overflowed labels are not cached, so neither Prometheus
+        series nor this cache grow with unbounded label values.
+        
+        Args:
+            name: The metric key in self.metrics
+            labels: The label values
+            
+        Returns:
+            The metric child
+        """
+        with self._lock:
+            bounded = []
+            for position, value in enumerate(labels):
+                seen = self._label_values.setdefault((name, position), set())
+                if value not in seen:
+                    if len(seen) >= self.max_label_values:
+                        value = OVERFLOW_LABEL
+                    else:
+                        seen.add(value)
+                bounded.append(value)
+            
+            child = self.metrics[name].labels(*bounded)
+            if OVERFLOW_LABEL not in bounded:
+                self._children[(name, labels)] = child
+            return child
+    
+    def start_timer(self) -> float:
+        """
+        Start timing an operation.
+        
+        Returns:
+            A start time to pass to end_timer
+        """
+        return time.perf_counter()
+    
+    def end_timer(self, start_time: float) -> float:
+        """
+        Finish timing an operation.
+        
+        Args:
+            start_time: The value returned by start_timer
+            
+        Returns:
+            The elapsed time in seconds
+        """
+        return time.perf_counter() - start_time
+    
+    def render(self) -> Tuple[bytes, str]:
+        """
+        Render all metrics in the Prometheus text format.
+        
+        In multiprocess mode the samples of every live worker are merged.
+        
+        Returns:
+            The exposition payload and its content type
+        """
+        if MULTIPROCESS_MODE:
+            registry = prom.CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = prom.REGISTRY
+        return prom.generate_latest(registry), prom.CONTENT_TYPE_LATEST
+    
+    def mark_process_dead(self, pid: int):
+        """
+        Drop the live gauges of an exited worker; call from gunicorn's child_exit hook.
+        
+        Args:
+            pid: The worker process ID
+        """
+        if MULTIPROCESS_MODE:
+            multiprocess.mark_process_dead(pid)
     
     def set_app_info(self, app: FastAPI):
         """
@@ -177,11 +312,11 @@ class MetricsManager:
             return
             
         try:
-            method = request.method
-            path = request.url.path
+            method = request.method if request.method in HTTP_METHODS else "OTHER"
+            endpoint = route_template(request)
             
-            self.metrics["request_count"].labels(method, path, status_code).inc()
-            self.metrics["request_latency"].labels(method, path).observe(duration)
+            self._child("request_count", method, endpoint, status_code).inc()
+            self._child("request_latency", method, endpoint).observe(duration)
             self.metrics["active_requests"].dec()
         except Exception as e:
             logger.error(f"Failed to record request completion: {str(e)}")
@@ -199,7 +334,7 @@ class MetricsManager:
             return
             
         try:
-            self.metrics["db_query_latency"].labels(operation, table).observe(duration)
+            self._child("db_query_latency", operation, table).observe(duration)
         except Exception as e:
             logger.error(f"Failed to record DB query: {str(e)}")
     
@@ -215,10 +350,7 @@ class MetricsManager:
             return
             
         try:
-            if hit:
-                self.metrics["cache_hits"].labels(cache_type).inc()
-            else:
-                self.metrics["cache_misses"].labels(cache_type).inc()
+            self._child("cache_hits" if hit else "cache_misses", cache_type).inc()
         except Exception as e:
             logger.error(f"Failed to record cache access: {str(e)}")
     
@@ -233,7 +365,7 @@ class MetricsManager:
             return
             
         try:
-            self.metrics["oauth_login_count"].labels(provider).inc()
+            self._child("oauth_login_count", provider).inc()
         except Exception as e:
             logger.error(f"Failed to record OAuth login: {str(e)}")
     
@@ -248,7 +380,7 @@ class MetricsManager:
             return
             
         try:
-            self.metrics["error_count"].labels(error_type).inc()
+            self._child("error_count", error_type).inc()
         except Exception as e:
             logger.error(f"Failed to record error: {str(e)}")
     
@@ -258,13 +390,13 @@ class MetricsManager:
         
         Args:
             operation_type: The type of RBAC operation
-            user_id: The ID of the user
+            user_id: The ID of the user (not used as a label)
         """
         if not PROMETHEUS_AVAILABLE or not self.initialized:
             return
             
         try:
-            self.metrics["rbac_operation_count"].labels(operation_type, user_id).inc()
+            self._child("rbac_operation_count", operation_type).inc()
         except Exception as e:
             logger.error(f"Failed to record RBAC operation: {str(e)}")
     
@@ -274,7 +406,7 @@ class MetricsManager:
         
         Args:
             activity_type: The type of user activity
-            user_id: The ID of the user
+            user_id: The ID of the user (not used as a label)
         """
         if not PROMETHEUS_AVAILABLE or not self.initialized:
             return
@@ -282,7 +414,7 @@ class MetricsManager:
         try:
             # Use the rbac_operation_count metric for now, as it has the right labels
             # In the future, we might want to create a dedicated user activity metric
-            self.metrics["rbac_operation_count"].labels(activity_type, user_id).inc()
+            self._child("rbac_operation_count", activity_type).inc()
         except Exception as e:
             logger.error(f"Failed to record user activity: {str(e)}")
 
@@ -0,0 +1,247 @@
+"""
+Precompiled permission engine for RBAC checks.
+
+Each permission is assigned a dense bit index (its position in primary key
+order) and each role's permissions are compiled into an integer bitmask, so
+masks grow with the number of permissions rather than the largest ID. A
+user's effective permissions are the OR of their roles' masks, cached per
+distinct role set, so a permission check is a single AND on an int.
+"""
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Set
+import logging
+import threading
+import time
+
+from redis.exceptions import RedisError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.redis.async_cache import get_generations, bump_generations
+from app.db.models import Permission, RolePermission, User
+
+# Configure logger
+logger = logging.getLogger("grimos.permissions")
+
+# Bumped on every RBAC mutation so all pods rebuild their engine; also the
+# permission epoch that token claims are checked against
+RBAC_GENERATION_KEY = "generation:rbac"
+
+class PermissionEngine:
+    """
+    In-process compiled view of the role/permission tables.
+    
+    The engine is rebuilt from two table scans whenever the RBAC generation
+    counter changes. The counter is read through the local cache, so checking
+    it costs no round trip while RBAC data is unchanged. The counter doubles
+    as the permission epoch embedded in access tokens.
+    
+    Bit indexes follow primary key order, so every pod compiling the same
+    tables assigns the same bits; any change to the permissions moves the
+    epoch, which retires masks built from the previous assignment.
+    """
+    
+    def __init__(self):
+        self.generation: Optional[int] = None
+        self.permission_bits: Dict[str, int] = {}
+        # Permission names by bit index
+        self.permission_names: Dict[int, str] = {}
+        self.role_masks: Dict[int, int] = {}
+        self._role_set_masks: Dict[FrozenSet[int], int] = {}
+        # Monotonic time of the last rebuild; 0 forces the next check to rebuild
+        self._rebuilt_at = 0.0
+        self._lock = threading.Lock()
+    
+    def rebuild(self, db: Session, generation: Optional[int] = None) -> None:
+        """
+        Recompile permission bits and role masks from the database.
+        
+        Args:
+            db: Database session
+            generation: The RBAC generation the rebuild reflects
+        """
+        permission_bits: Dict[str, int] = {}
+        permission_names: Dict[int, str] = {}
+        bit_indexes: Dict[int, int] = {}
+        permissions = db.query(Permission.id, Permission.name).order_by(Permission.id).all()
+        for index, (permission_id, name) in enumerate(permissions):
+            bit_indexes[permission_id] = index
+            permission_bits[name] = 1 << index
+            permission_names[index] = name
+        
+        role_masks: Dict[int, int] = {}
+        for role_id, permission_id in db.query(RolePermission.role_id, RolePermission.permission_id).all():
+            index = bit_indexes.get(permission_id)
+            if index is not None:
+                role_masks[role_id] = role_masks.get(role_id, 0) | (1 << index)
+        
+        with self._lock:
+            self.permission_bits = permission_bits
+            self.permission_names = permission_names
+            self.role_masks = role_masks
+            self._role_set_masks = {}
+            self.generation = generation
+            self._rebuilt_at = time.monotonic()
+        
+        logger.info(
+            f"Compiled {len(permission_bits)} permissions for {len(role_masks)} roles "
+            f"(generation {generation})"
+        )
+    
+    async def ensure_current(self, db: Session) -> None:
+        """
+        Rebuild the engine if RBAC data changed since it was compiled.
+        
+        Args:
+            db: Database session
+        """
+        generation = await self.current_generation()
+        if generation is None:
+            # Without Redis we cannot tell whether we are stale; keep the compiled
+            # view, refreshing it from the database at most every few seconds
+            if self.generation is not None or (
+                self._rebuilt_at and time.monotonic() - self._rebuilt_at < settings.RBAC_OFFLINE_REBUILD_SECONDS
+            ):
+                return
+            self.rebuild(db, generation)
+        elif generation != self.generation:
+            self.rebuild(db, generation)
+    
+    async def invalidate(self) -> None:
+        """Mark the compiled view stale on every pod after an RBAC mutation."""
+        with self._lock:
+            self.generation = None
+            self._rebuilt_at = 0.0
+        try:
+            await bump_generations([RBAC_GENERATION_KEY])
+        except RedisError as e:
+            logger.error(f"Failed to publish RBAC change: {str(e)}")
+    
+    def user_mask(self, role_ids: Iterable[int]) -> int:
+        """
+        Get the combined permission mask of a set of roles.
+        
+        Args:
+            role_ids: IDs of the user's roles
+        
+        Returns:
+            The OR of the roles' permission masks
+        """
+        key = frozenset(role_ids)
+        mask = self._role_set_masks.get(key)
+        if mask is None:
+            mask = 0
+            for role_id in key:
+                mask |= self.role_masks.get(role_id, 0)
+            self._role_set_masks[key] = mask
+        return mask
+    
+    def mask(self, permission_names: Iterable[str]) -> Optional[int]:
+        """
+        Compile permission names into a mask.
+        
+        Args:
+            permission_names: The permission names
+        
+        Returns:
+            The combined mask, or None if any permission does not exist
+        """
+        mask = 0
+        for name in permission_names:
+            bit = self.permission_bits.get(name)
+            if bit is None:
+                return None
+            mask |= bit
+        return mask
+    
+    def has_all(self, user_mask: int, permission_names: Iterable[str]) -> bool:
+        """
+        Check whether a permission mask grants all of the given permissions.
+        
+        Args:
+            user_mask: The user's permission mask
+            permission_names: The required permission names
+            
+        Returns:
+            True if every permission is granted, False otherwise
+        """
+        required = self.mask(permission_names)
+        return required is not None and user_mask & required == required
+    
+    def has_any(self, user_mask: int, permission_names: Iterable[str]) -> bool:
+        """
+        Check whether a permission mask grants any of the given permissions.
+        
+        Args:
+            user_mask: The user's permission mask
+            permission_names: The permission names to check for
+            
+        Returns:
+            True if at least one permission is granted, False otherwise
+        """
+        wanted = 0
+        for name in permission_names:
+            wanted |= self.permission_bits.get(name, 0)
+        return bool(user_mask & wanted)
+    
+    def permission_set(self, user_mask: int) -> Set[str]:
+        """
+        Expand a permission mask into permission names.
+        
+        Args:
+            user_mask: The user's permission mask
+            
+        Returns:
+            Names of all permissions in the mask
+        """
+        return {name for index, name in self.permission_names.items() if user_mask >> index & 1}
+    
+    async def current_generation(self) -> Optional[int]:
+        """
+        Get the current RBAC generation (the permission epoch).
+        
+        Returns:
+            The generation, or None if it cannot be read
+        """
+        try:
+            generations = await get_generations([RBAC_GENERATION_KEY])
+        except RedisError as e:
+            logger.warning(f"Could not read RBAC generation: {str(e)}")
+            return None
+        return generations[RBAC_GENERATION_KEY]
+    
+    async def build_claims(self, user: User, db: Session) -> Dict[str, Any]:
+        """
+        Build the permission claims embedded in a user's access token.
+        
+        Args:
+            user: The user the token is issued to
+            db: Database session
+            
+        Returns:
+            Role names ("rol"), hex permission mask ("prm") and permission epoch
+            ("pep"), or an empty dict if claims are disabled or the epoch is unknown
+        """
+        if not settings.JWT_PERMISSION_CLAIMS:
+            return {}
+        
+        await self.ensure_current(db)
+        if self.generation is None:
+            return {}
+        
+        return {
+            "rol": [str(role.name) for role in user.roles],
+            "prm": format(self.user_mask(role.id for role in user.roles), "x"),
+            "pep": self.generation,
+        }
+
+# Create a singleton instance
+permission_engine = PermissionEngine()
+
+def get_permission_engine() -> PermissionEngine:
+    """
+    Get the permission engine instance.
+    
+    Returns:
+        The permission engine instance
+    """
+    return permission_engine
@@ -0,0 +1,290 @@
+"""
+Asyncio Redis implementation for caching
+
+Mirrors app.core.redis.cache for async code paths, sharing its in-process L1
+cache and invalidation channel. Redis calls go through a shared connection pool
+and never block the event loop.
+"""
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from typing import Any, Dict, List, Optional, Set
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.core.redis.cache import (
+    MISSING,
+    decode_value,
+    encode_value,
+    ensure_invalidation_listener,
+    invalidation_message,
+    local_cache,
+)
+
+# Configure logger
+logger = logging.getLogger("grimos.cache")
+
+# Initialize asyncio Redis client backed by a shared connection pool
+redis_client = Redis.from_url(
+    url=settings.REDIS_URL,
+    decode_responses=True,
+    socket_timeout=5,
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+)
+
+# Keep references to background cleanup tasks so they are not garbage collected
+_cleanup_tasks: Set[asyncio.Task] = set()
+
+async def _publish_invalidation(op: str, key: Optional[str] = None) -> None:
+    """
+    Tell other pods to drop their L1 copies.
+    
+    Args:
+        op: "delete" for a single key, "pattern" for a key pattern or "clear" for everything
+        key: The cache key or pattern
+    """
+    try:
+        await redis_client.publish(settings.CACHE_INVALIDATION_CHANNEL, invalidation_message(op, key))
+    except RedisError as e:
+        # Other pods fall back to the L1 TTL
+        logger.warning(f"Failed to publish cache invalidation for '{key}': {str(e)}")
+
+async def get_cache(key: str) -> Optional[Any]:
+    """
+    Get a value from the cache.
+    
+    Args:
+        key: The cache key
+    
+    Returns:
+        The cached value if exists, None otherwise
+    """
+    return (await mget_cache([key]))[key]
+
+async def mget_cache(keys: List[str]) -> Dict[str, Optional[Any]]:
+    """
+    Get several values from the cache in a single round trip.
+    
+    Keys found in the local cache are served from memory; the rest are
+    fetched from Redis with one MGET.
+    
+    Args:
+        keys: The cache keys
+    
+    Returns:
+        Mapping of each key to its cached value, or None if not cached
+    """
+    from app.core.metrics_manager import get_metrics_manager
+    metrics = get_metrics_manager()
+    ensure_invalidation_listener()
+    
+    results: Dict[str, Optional[Any]] = {}
+    missing: List[str] = []
+    for key in keys:
+        value = local_cache.get(key)
+        if value is MISSING:
+            metrics.record_cache_access("local", False)
+            missing.append(key)
+        else:
+            # L1 holds the serialized value, so each caller decodes its own copy
+            metrics.record_cache_access("local", True)
+            results[key] = decode_value(value)
+    
+    if missing:
+        values = await redis_client.mget(missing)
+        for key, value in zip(missing, values):
+            if value:
+                metrics.record_cache_access("redis", True)
+                local_cache.set(key, value)
+                results[key] = decode_value(value)
+            else:
+                metrics.record_cache_access("redis", False)
+                results[key] = None
+    
+    return results
+
+async def set_cache(key: str, value: Any, expire: int = 3600) -> bool:
+    """
+    Set a value in the cache.
+    
+    Args:
+        key: The cache key
+        value: The value to cache
+        expire: Expiration time in seconds (default: 1 hour)
+    
+    Returns:
+        True if successful, False otherwise
+    """
+    return await mset_cache({key: value}, expire)
+
+async def mset_cache(items: Dict[str, Any], expire: int = 3600) -> bool:
+    """
+    Set several values in the cache in a single pipelined round trip.
+    
+    Args:
+        items: Mapping of cache keys to values
+        expire: Expiration time in seconds (default: 1 hour)
+    
+    Returns:
+        True if all values were stored, False otherwise
+    """
+    ensure_invalidation_listener()
+    encoded = {key: encode_value(value) for key, value in items.items()}
+    if not encoded or any(value is None for value in encoded.values()):
+        return False
+    
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for key, value_str in encoded.items():
+            pipe.setex(key, expire, value_str)
+        for key in encoded:
+            pipe.publish(settings.CACHE_INVALIDATION_CHANNEL, invalidation_message("delete", key))
+        results = await pipe.execute()
+    
+    # Store the serialized form, so later mutation of a value cannot reach other callers
+    for key, value_str in encoded.items():
+        local_cache.set(key, value_str, expire)
+    return all(results[:len(encoded)])
+
+async def delete_cache(key: str) -> bool:
+    """
+    Delete a value from the cache.
+    
+    Args:
+        key: The cache key
+    
+    Returns:
+        True if successful, False otherwise
+    """
+    deleted = bool(await redis_client.delete(key))
+    local_cache.delete(key)
+    await _publish_invalidation("delete", key)
+    return deleted
+
+async def clear_cache_pattern(pattern: str) -> int:
+    """
+    Clear all keys matching a pattern.
+    
+    Keys are found with incremental SCAN and removed with UNLINK, so Redis
+    is never blocked on a full keyspace walk.
+    
+    Args:
+        pattern: The pattern to match (e.g., "user:*")
+        
+    Returns:
+        Number of keys deleted
+    """
+    local_cache.delete_pattern(pattern)
+    await _publish_invalidation("pattern", pattern)
+    try:
+        return await _unlink_pattern(pattern)
+    finally:
+        await _invalidate_pattern_again(pattern)
+
+def schedule_cache_cleanup(pattern: str) -> asyncio.Task:
+    """
+    Clear all keys matching a pattern in a rate-limited background task.
+    
+    Local copies are dropped immediately on every pod, and again once the
+    Redis keys are removed at most CACHE_CLEANUP_MAX_KEYS_PER_SECOND at a time.
+    
+    Args:
+        pattern: The pattern to match (e.g., "user:*")
+        
+    Returns:
+        The background task, which resolves to the number of keys deleted
+    """
+    local_cache.delete_pattern(pattern)
+    
+    async def cleanup() -> int:
+        await _publish_invalidation("pattern", pattern)
+        try:
+            return await _unlink_pattern(pattern, settings.CACHE_CLEANUP_MAX_KEYS_PER_SECOND)
+        finally:
+            await _invalidate_pattern_again(pattern)
+    
+    task = asyncio.create_task(cleanup())
+    _cleanup_tasks.add(task)
+    task.add_done_callback(_cleanup_done)
+    return task
+
+async def _invalidate_pattern_again(pattern: str) -> None:
+    """
+    Drop local copies of a pattern once its Redis keys are removed.
+    
+    Pods can refill their L1 from Redis while the keys are being scanned and
+    unlinked, so the invalidation published before the removal is not enough.
+    
+    Args:
+        pattern: The pattern that was cleared
+    """
+    local_cache.delete_pattern(pattern)
+    await _publish_invalidation("pattern", pattern)
+
+def _cleanup_done(task: asyncio.Task) -> None:
+    """Release a finished cleanup task and log its outcome."""
+    _cleanup_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Background cache cleanup failed: {str(task.exception())}")
+
+async def _unlink_pattern(pattern: str, max_keys_per_second: Optional[float] = None) -> int:
+    """
+    Remove keys matching a pattern batch by batch.
+    
+    Args:
+        pattern: The pattern to match
+        max_keys_per_second: Rate limit for removals, or None to run unthrottled
+        
+    Returns:
+        Number of keys deleted
+    """
+    deleted = 0
+    cursor = 0
+    while True:
+        cursor, keys = await redis_client.scan(cursor, match=pattern, count=settings.CACHE_SCAN_BATCH_SIZE)
+        if keys:
+            deleted += await redis_client.unlink(*keys)
+            if max_keys_per_second:
+                await asyncio.sleep(len(keys) / max_keys_per_second)
+        if cursor == 0:
+            return deleted
+
+async def get_generations(keys: List[str]) -> Dict[str, int]:
+    """
+    Get the current value of several generation counters.
+    
+    Generation counters are embedded in cache keys, so bumping one makes every
+    key built from the old value unreachable without touching them. Counters are
+    read through the local cache and cost no round trip when hot. Counters that
+    were never bumped do not exist in Redis and are cached locally as 0, since
+    bump_generations drops the local copy on every pod.
+    
+    Args:
+        keys: The counter keys
+        
+    Returns:
+        Mapping of each counter key to its value (0 if never bumped)
+    """
+    values = await mget_cache(keys)
+    for key, value in values.items():
+        if value is None:
+            local_cache.set(key, "0")
+    return {key: int(value or 0) for key, value in values.items()}
+
+async def bump_generations(keys: List[str]) -> None:
+    """
+    Increment generation counters, invalidating every key built from them.
+    
+    Args:
+        keys: The counter keys
+    """
+    if not keys:
+        return
+    
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.incr(key)
+            pipe.publish(settings.CACHE_INVALIDATION_CHANNEL, invalidation_message("delete", key))
+        await pipe.execute()
+    
+    for key in keys:
+        local_cache.delete(key)
@@ -1,13 +1,25 @@
 """
 Redis implementation for caching
+
+Reads are served from a size-bounded in-process L1 cache in front of Redis (L2).
+Writes and deletes are published on a Redis pub/sub channel so that every pod
+drops its stale L1 copy.
 """
 from redis import Redis
+from redis.exceptions import RedisError
 from typing import Any, Optional, Union, Callable
 import json
+import logging
+import threading
 import time
+import uuid
 from functools import wraps
 
 from app.core.config import settings
+from app.core.redis.local_cache import LocalCache, MISSING
+
+# Configure logger
+logger = logging.getLogger("grimos.cache")
 
 # Initialize Redis client
 redis_client = Redis.from_url(
@@ -16,6 +28,138 @@ redis_client = Redis.from_url(
     socket_timeout=5,
 )
 
+# Initialize in-process L1 cache
+local_cache = LocalCache(
+    max_size=settings.LOCAL_CACHE_MAX_SIZE,
+    default_ttl=settings.LOCAL_CACHE_TTL_SECONDS,
+)
+
+# Identifies invalidations published by this process, which are already applied locally
+NODE_ID = uuid.uuid4().hex
+
+_listener_lock = threading.Lock()
+_listener_thread: Optional[threading.Thread] = None
+
+def encode_value(value: Any) -> Optional[str]:
+    """
+    Serialize a value for storage in Redis.
+    
+    Args:
+        value: The value to cache
+        
+    Returns:
+        The serialized value, or None if it is not JSON serializable
+    """
+    if isinstance(value, str):
+        return value
+    try:
+        return json.dumps(value)
+    except (TypeError, ValueError):
+        return None
+
+def decode_value(value: str) -> Any:
+    """
+    Deserialize a value read from Redis.
+    
+    Args:
+        value: The stored value
+        
+    Returns:
+        The decoded JSON value, or the raw string if it is not JSON
+    """
+    try:
+        return json.loads(value)
+    except (json.JSONDecodeError, TypeError):
+        return value
+
+def invalidation_message(op: str, key: Optional[str] = None) -> str:
+    """
+    Build an L1 invalidation message.
+    
+    Args:
+        op: "delete" for a single key, "pattern" for a key pattern or "clear" for everything
+        key: The cache key or pattern
+        
+    Returns:
+        The JSON-encoded message
+    """
+    return json.dumps({"node": NODE_ID, "op": op, "key": key})
+
+def _publish_invalidation(op: str, key: Optional[str] = None) -> None:
+    """
+    Tell other pods to drop their L1 copies.
+    
+    Args:
+        op: "delete" for a single key, "pattern" for a key pattern or "clear" for everything
+        key: The cache key or pattern
+    """
+    try:
+        redis_client.publish(settings.CACHE_INVALIDATION_CHANNEL, invalidation_message(op, key))
+    except RedisError as e:
+        # Other pods fall back to the L1 TTL
+        logger.warning(f"Failed to publish cache invalidation for '{key}': {str(e)}")
+
+def _apply_invalidation(data: str) -> None:
+    """
+    Apply an invalidation message received from another pod.
+    
+    Args:
+        data: The JSON-encoded invalidation message
+    """
+    try:
+        message = json.loads(data)
+    except (json.JSONDecodeError, TypeError):
+        logger.warning(f"Ignoring malformed cache invalidation message: {data!r}")
+        return
+    
+    if message.get("node") == NODE_ID:
+        return
+    
+    op = message.get("op")
+    if op == "delete":
+        local_cache.delete(message["key"])
+    elif op == "pattern":
+        local_cache.delete_pattern(message["key"])
+    else:
+        local_cache.clear()
+
+def _listen_for_invalidations() -> None:
+    """Consume invalidation messages, resubscribing if the connection drops."""
+    while True:
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(settings.CACHE_INVALIDATION_CHANNEL)
+            while True:
+                message = pubsub.get_message(timeout=1.0)
+                if message and message["type"] == "message":
+                    _apply_invalidation(message["data"])
+        except Exception as e:
+            logger.warning(f"Cache invalidation listener disconnected: {str(e)}")
+        finally:
+            try:
+                pubsub.close()
+            except Exception:
+                pass
+        
+        # Invalidations may have been missed while disconnected
+        local_cache.clear()
+        time.sleep(1.0)
+
+def ensure_invalidation_listener() -> None:
+    """Start the invalidation listener thread on first use of the cache."""
+    global _listener_thread
+    if _listener_thread is not None:
+        return
+    
+    with _listener_lock:
+        if _listener_thread is None:
+            _listener_thread = threading.Thread(
+                target=_listen_for_invalidations,
+                name="cache-invalidation-listener",
+                daemon=True,
+            )
+            _listener_thread.start()
+
 def get_cache(key: str) -> Optional[Any]:
     """
     Get a value from the cache.
@@ -28,15 +172,20 @@ def get_cache(key: str) -> Optional[Any]:
     """
     from app.core.metrics_manager import get_metrics_manager
     metrics = get_metrics_manager()
+    ensure_invalidation_listener()
+    
+    # L1 holds the serialized value, so each caller decodes its own copy
+    value = local_cache.get(key)
+    if value is not MISSING:
+        metrics.record_cache_access("local", True)
+        return decode_value(value)
+    metrics.record_cache_access("local", False)
     
     value = redis_client.get(key)
     if value:
-        try:
-            metrics.record_cache_access("redis", True)
-            return json.loads(value)
-        except (json.JSONDecodeError, TypeError):
-            metrics.record_cache_access("redis", True)
-            return value
+        metrics.record_cache_access("redis", True)
+        local_cache.set(key, value)
+        return decode_value(value)
     
     metrics.record_cache_access("redis", False)
     return None
@@ -53,11 +202,17 @@ def set_cache(key: str, value: Any, expire: int = 3600) -> bool:
     Returns:
         True if successful, False otherwise
     """
-    try:
-        value_str = json.dumps(value) if not isinstance(value, str) else value
-        return redis_client.setex(key, expire, value_str)
-    except (TypeError, json.JSONDecodeError):
+    ensure_invalidation_listener()
+    value_str = encode_value(value)
+    if value_str is None:
         return False
+    
+    result = redis_client.setex(key, expire, value_str)
+    
+    # Store the serialized form, so later mutation of value cannot reach other callers
+    local_cache.set(key, value_str, expire)
+    _publish_invalidation("delete", key)
+    return result
 
 def delete_cache(key: str) -> bool:
     """
@@ -69,7 +224,10 @@ def delete_cache(key: str) -> bool:
     Returns:
         True if successful, False otherwise
     """
-    return bool(redis_client.delete(key))
+    deleted = bool(redis_client.delete(key))
+    local_cache.delete(key)
+    _publish_invalidation("delete", key)
+    return deleted
 
 def clear_cache_pattern(pattern: str) -> int:
     """
@@ -81,10 +239,25 @@ def clear_cache_pattern(pattern: str) -> int:
     Returns:
         Number of keys deleted
     """
-    keys = redis_client.keys(pattern)
-    if keys:
-        return redis_client.delete(*keys)
-    return 0
+    local_cache.delete_pattern(pattern)
+    _publish_invalidation("pattern", pattern)
+    
+    # Incremental SCAN/UNLINK instead of KEYS, which blocks Redis on a full keyspace walk
+    deleted = 0
+    batch = []
+    try:
+        for key in redis_client.scan_iter(match=pattern, count=settings.CACHE_SCAN_BATCH_SIZE):
+            batch.append(key)
+            if len(batch) >= settings.CACHE_SCAN_BATCH_SIZE:
+                deleted += redis_client.unlink(*batch)
+                batch = []
+        if batch:
+            deleted += redis_client.unlink(*batch)
+    finally:
+        # Again once the keys are gone: pods may have refilled their L1 from Redis during the scan
+        local_cache.delete_pattern(pattern)
+        _publish_invalidation("pattern", pattern)
+    return deleted
 
 def cache_decorator(expire: int = 3600, key_prefix: str = ""):
     """
@@ -97,6 +270,8 @@ def cache_decorator(expire: int = 3600, key_prefix: str = ""):
     Returns:
         Decorated function
     """
+    from app.core.redis import async_cache
+    
     def decorator(func: Callable):
         @wraps(func)
         async def wrapper(*args, **kwargs):
@@ -104,7 +279,7 @@ def cache_decorator(expire: int = 3600, key_prefix: str = ""):
             cache_key = f"{key_prefix}:{func.__name__}:{str(args)}:{str(kwargs)}"
             
             # Try to get from cache first
-            cached_result = get_cache(cache_key)
+            cached_result = await async_cache.get_cache(cache_key)
             if cached_result is not None:
                 return cached_result
                 
@@ -112,7 +287,7 @@ def cache_decorator(expire: int = 3600, key_prefix: str = ""):
             result = await func(*args, **kwargs)
             
             # Cache the result
-            set_cache(cache_key, result, expire)
+            await async_cache.set_cache(cache_key, result, expire)
             
             return result
         return wrapper
@@ -0,0 +1,120 @@
+"""
+In-process L1 cache in front of Redis
+"""
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from typing import Any, Optional
+import threading
+import time
+
+# Sentinel returned on a miss, since None is a valid cached value
+MISSING = object()
+
+class LocalCacheEntry:
+    """
+    A cached value and its expiry time.
+    """
+    
+    __slots__ = ("value", "expires_at")
+    
+    def __init__(self, value: Any, expires_at: float):
+        self.value = value
+        self.expires_at = expires_at
+
+class LocalCache:
+    """
+    Size-bounded LRU cache with per-entry TTL.
+    
+    Hits cost no network round trip. Stored values are handed to every caller
+    as is, so they must be immutable: the cache modules store serialized
+    strings and decode them per hit, and repository DTOs are frozen.
+    """
+    
+    def __init__(self, max_size: int = 10000, default_ttl: float = 30.0):
+        """
+        Initialize a new LocalCache.
+        
+        Args:
+            max_size: Maximum number of entries; the least recently used entry is evicted first
+            default_ttl: Maximum time in seconds an entry is served before going back to Redis
+        """
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[str, LocalCacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Any:
+        """
+        Get a value from the cache.
+        
+        Args:
+            key: The cache key
+        
+        Returns:
+            The cached value, or MISSING if the key is absent or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            if entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return entry.value
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Set a value in the cache.
+        
+        Args:
+            key: The cache key
+            value: The value to cache
+            ttl: Time to live in seconds, capped at the default TTL
+        """
+        ttl = self.default_ttl if ttl is None else min(ttl, self.default_ttl)
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        
+        with self._lock:
+            self._entries[key] = LocalCacheEntry(value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def delete(self, key: str) -> bool:
+        """
+        Delete a value from the cache.
+        
+        Args:
+            key: The cache key
+        
+        Returns:
+            True if the key was cached, False otherwise
+        """
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+    
+    def delete_pattern(self, pattern: str) -> int:
+        """
+        Delete all keys matching a glob-style pattern.
+        
+        Args:
+            pattern: The pattern to match (e.g., "user:*")
+        
+        Returns:
+            Number of keys deleted
+        """
+        with self._lock:
+            keys = [key for key in self._entries if fnmatchcase(key, pattern)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+    
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
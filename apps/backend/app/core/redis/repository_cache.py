@@ -0,0 +1,270 @@
+"""
+Typed repository cache
+
+Caches database rows as frozen Pydantic DTOs encoded with msgpack, so a cached
+read returns the same type as an uncached one. DTOs are kept decoded in the
+shared L1 cache and invalidated across pods through the cache invalidation
+channel.
+"""
+from functools import lru_cache
+from typing import Any, Dict, Generic, Iterable, Optional, Type, TypeVar
+import logging
+
+import msgpack
+from pydantic import BaseModel, ConfigDict, ValidationError, create_model
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis.cache import MISSING, ensure_invalidation_listener, invalidation_message, local_cache
+
+# Configure logger
+logger = logging.getLogger("grimos.repository_cache")
+
+# msgpack payloads are binary, so these clients do not decode responses
+binary_client = Redis.from_url(url=settings.REDIS_URL, socket_timeout=5)
+async_binary_client = AsyncRedis.from_url(
+    url=settings.REDIS_URL,
+    socket_timeout=5,
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+)
+
+DTO = TypeVar("DTO", bound=BaseModel)
+
+@lru_cache(maxsize=None)
+def dto_schema(model: Type[Any]) -> Type[BaseModel]:
+    """
+    Build a read-only DTO schema from a model's table columns.
+    
+    Columns marked sensitive (Column(..., info={"sensitive": True})) are left
+    out, so secrets such as password hashes never reach Redis or the L1 cache.
+    
+    Args:
+        model: The SQLAlchemy model class
+        
+    Returns:
+        A frozen Pydantic model with one optional field per non-sensitive column
+    """
+    fields: Dict[str, Any] = {}
+    for column in model.__table__.columns:
+        if column.info.get("sensitive"):
+            continue
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            python_type = Any
+        fields[column.key] = (Optional[python_type], None)
+        
+    return create_model(
+        f"{model.__name__}DTO",
+        __config__=ConfigDict(from_attributes=True, frozen=True),
+        **fields,
+    )
+
+class RepositoryCache(Generic[DTO]):
+    """
+    Cache of DTOs keyed by primary key.
+    
+    Keys embed the DTO schema name, so entries written by a different schema
+    are never decoded as this one. Entries that fail to decode are treated as
+    misses.
+    """
+    
+    def __init__(self, prefix: str, schema: Type[DTO], expire: int = 3600):
+        """
+        Initialize a new RepositoryCache.
+        
+        Args:
+            prefix: Prefix for cache keys (e.g., the table name)
+            schema: The DTO schema; must support from_attributes
+            expire: Expiration time in seconds (default: 1 hour)
+        """
+        self.prefix = prefix
+        self.schema = schema
+        self.expire = expire
+    
+    def key(self, id: Any) -> str:
+        """
+        Build the cache key of a record.
+        
+        Args:
+            id: The record ID
+            
+        Returns:
+            The cache key
+        """
+        return f"{self.prefix}:{self.schema.__name__}:{id}"
+    
+    def to_dto(self, record: Any) -> DTO:
+        """
+        Convert an ORM object into a DTO.
+        
+        Args:
+            record: The ORM object
+            
+        Returns:
+            The DTO
+        """
+        return self.schema.model_validate(record)
+    
+    def _encode(self, dto: DTO) -> bytes:
+        """Serialize a DTO to msgpack."""
+        return msgpack.packb(dto.model_dump(mode="json"), use_bin_type=True)
+    
+    def _decode(self, raw: bytes) -> Optional[DTO]:
+        """Deserialize a DTO, or return None if the entry is unusable."""
+        try:
+            return self.schema.model_validate(msgpack.unpackb(raw, raw=False))
+        except (ValueError, ValidationError, msgpack.UnpackException) as e:
+            logger.warning(f"Discarding undecodable cache entry for {self.prefix}: {str(e)}")
+            return None
+    
+    def _local_hits(self, ids: Iterable[Any]) -> Dict[Any, DTO]:
+        """Split off the IDs already in the local cache."""
+        hits: Dict[Any, DTO] = {}
+        for id in ids:
+            value = local_cache.get(self.key(id))
+            if value is not MISSING:
+                hits[id] = value
+        return hits
+    
+    def _remote_hits(self, ids: list, values: list) -> Dict[Any, DTO]:
+        """Decode Redis values and promote them to the local cache."""
+        hits: Dict[Any, DTO] = {}
+        for id, raw in zip(ids, values):
+            if raw is None:
+                continue
+            dto = self._decode(raw)
+            if dto is not None:
+                local_cache.set(self.key(id), dto, self.expire)
+                hits[id] = dto
+        return hits
+    
+    def get_many(self, ids: Iterable[Any]) -> Dict[Any, DTO]:
+        """
+        Get cached DTOs in at most one round trip.
+        
+        Args:
+            ids: The record IDs
+            
+        Returns:
+            Mapping of ID to DTO for the IDs that are cached
+        """
+        ensure_invalidation_listener()
+        ids = list(ids)
+        hits = self._local_hits(ids)
+        missing = [id for id in ids if id not in hits]
+        if missing:
+            try:
+                values = binary_client.mget([self.key(id) for id in missing])
+            except RedisError as e:
+                logger.warning(f"Repository cache read failed for {self.prefix}: {str(e)}")
+                return hits
+            hits.update(self._remote_hits(missing, values))
+        return hits
+    
+    async def aget_many(self, ids: Iterable[Any]) -> Dict[Any, DTO]:
+        """
+        Get cached DTOs in at most one round trip, without blocking the event loop.
+        
+        Args:
+            ids: The record IDs
+            
+        Returns:
+            Mapping of ID to DTO for the IDs that are cached
+        """
+        ensure_invalidation_listener()
+        ids = list(ids)
+        hits = self._local_hits(ids)
+        missing = [id for id in ids if id not in hits]
+        if missing:
+            try:
+                values = await async_binary_client.mget([self.key(id) for id in missing])
+            except RedisError as e:
+                logger.warning(f"Repository cache read failed for {self.prefix}: {str(e)}")
+                return hits
+            hits.update(self._remote_hits(missing, values))
+        return hits
+    
+    def set_many(self, dtos: Dict[Any, DTO]) -> None:
+        """
+        Cache DTOs in one pipelined round trip.
+        
+        Args:
+            dtos: Mapping of ID to DTO
+        """
+        if not dtos:
+            return
+        try:
+            with binary_client.pipeline(transaction=False) as pipe:
+                for id, dto in dtos.items():
+                    pipe.setex(self.key(id), self.expire, self._encode(dto))
+                pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Repository cache write failed for {self.prefix}: {str(e)}")
+            return
+        for id, dto in dtos.items():
+            local_cache.set(self.key(id), dto, self.expire)
+    
+    async def aset_many(self, dtos: Dict[Any, DTO]) -> None:
+        """
+        Cache DTOs in one pipelined round trip, without blocking the event loop.
+        
+        Args:
+            dtos: Mapping of ID to DTO
+        """
+        if not dtos:
+            return
+        try:
+            async with async_binary_client.pipeline(transaction=False) as pipe:
+                for id, dto in dtos.items():
+                    pipe.setex(self.key(id), self.expire, self._encode(dto))
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Repository cache write failed for {self.prefix}: {str(e)}")
+            return
+        for id, dto in dtos.items():
+            local_cache.set(self.key(id), dto, self.expire)
+    
+    def delete_many(self, ids: Iterable[Any]) -> None:
+        """
+        Drop cached DTOs on every pod.
+        
+        Args:
+            ids: The record IDs
+        """
+        keys = [self.key(id) for id in ids]
+        for key in keys:
+            local_cache.delete(key)
+        if not keys:
+            return
+        try:
+            with binary_client.pipeline(transaction=False) as pipe:
+                pipe.delete(*keys)
+                for key in keys:
+                    pipe.publish(settings.CACHE_INVALIDATION_CHANNEL, invalidation_message("delete", key))
+                pipe.execute()
+        except RedisError as e:
+            logger.error(f"Repository cache invalidation failed for {self.prefix}: {str(e)}")
+    
+    async def adelete_many(self, ids: Iterable[Any]) -> None:
+        """
+        Drop cached DTOs on every pod, without blocking the event loop.
+        
+        Args:
+            ids: The record IDs
+        """
+        keys = [self.key(id) for id in ids]
+        for key in keys:
+            local_cache.delete(key)
+        if not keys:
+            return
+        try:
+            async with async_binary_client.pipeline(transaction=False) as pipe:
+                pipe.delete(*keys)
+                for key in keys:
+                    pipe.publish(settings.CACHE_INVALIDATION_CHANNEL, invalidation_message("delete", key))
+                await pipe.execute()
+        except RedisError as e:
+            logger.error(f"Repository cache invalidation failed for {self.prefix}: {str(e)}")
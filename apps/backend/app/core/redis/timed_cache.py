@@ -1,13 +1,17 @@
 """
 TimedCache implementation for caching with automatic refresh
 """
-from typing import Any, Optional, Callable, Dict, Union
+from typing import Any, Optional, Callable, Dict, Tuple, Union
 import asyncio
-import time
+import inspect
 import logging
+import math
+import random
+import time
 from functools import wraps
 
-from app.core.redis.cache import get_cache, set_cache, delete_cache
+from app.core.redis import async_cache
+from app.core.redis.cache import delete_cache
 from app.core.metrics_manager import get_metrics_manager
 
 # Configure logger
@@ -16,6 +20,15 @@ logger = logging.getLogger("grimos.timed_cache")
 # Get metrics manager
 metrics = get_metrics_manager()
 
+# Field names of a cached entry
+ENTRY_VALUE = "value"
+ENTRY_REFRESHED_AT = "refreshed_at"
+ENTRY_DURATION = "duration"
+
+# In-flight refreshes by full cache key, shared by every TimedCache instance
+# and every caller of that key in this process
+_refreshes: Dict[str, asyncio.Task] = {}
+
 class TimedCache:
     """
     A class for managing cached values with automatic refresh.
@@ -23,15 +36,24 @@ class TimedCache:
     This is useful for data that needs to be frequently accessed but is
     relatively expensive to compute or fetch from the database.
     
-    The cache will automatically refresh in the background after a specified 
-    refresh interval, ensuring the cached data stays relatively fresh while 
-    still providing fast access.
+    Each key is stored with its own refresh time and refresh duration. Once a
+    key is older than the refresh interval, callers keep getting the stale value
+    while a single background task recomputes it (stale-while-revalidate).
+    Concurrent misses on the same key share one computation, and keys are
+    refreshed slightly early at random (probabilistic early expiration), so
+    pods sharing the cache do not all refresh a hot key at the same moment.
+    
+    In-flight refreshes are tracked per process rather than per instance, so
+    create instances once at module level and reuse them across requests.
+    Refresh functions may outlive the request that triggered them and must
+    not capture request-scoped resources such as database sessions.
     """
     
     def __init__(self, 
                  name: str, 
                  refresh_seconds: int = 300,
-                 expire_seconds: int = 3600):
+                 expire_seconds: int = 3600,
+                 beta: float = 1.0):
         """
         Initialize a new TimedCache.
         
@@ -39,12 +61,13 @@ class TimedCache:
             name: A unique name for this cache instance
             refresh_seconds: How often to refresh the cache in seconds (default: 5 minutes)
             expire_seconds: When the cache should expire if refresh fails (default: 1 hour)
+            beta: How eagerly keys are refreshed before the refresh interval;
+                0 disables early refresh (default: 1.0)
         """
         self.name = name
         self.refresh_seconds = refresh_seconds
         self.expire_seconds = expire_seconds
-        self.is_refreshing = False
-        self.last_refresh_time = 0
+        self.beta = beta
     
     async def get_or_set(self, 
                     key: str, 
@@ -63,55 +86,102 @@ class TimedCache:
         """
         cache_key = f"{self.name}:{key}"
         
-        # Try to get from cache first
-        cached_value = get_cache(cache_key)
-        
-        # If we have a cached value and don't need to refresh yet
-        current_time = time.time()
-        needs_refresh = (
-            force_refresh or 
-            cached_value is None or 
-            current_time - self.last_refresh_time > self.refresh_seconds
-        )
-        
-        if cached_value is not None and not needs_refresh:
-            metrics.record_cache_access("timed_cache", True)
-            return cached_value
-        
-        # If cache is empty or stale, but someone else is already refreshing
-        if self.is_refreshing and cached_value is not None:
-            metrics.record_cache_access("timed_cache", True)
-            return cached_value
-        
-        # We need to refresh the cache
-        try:
-            self.is_refreshing = True
+        entry = None if force_refresh else _unwrap(await async_cache.get_cache(cache_key))
+        if entry is None:
+            # Nothing to serve; wait for the (possibly shared) refresh
             metrics.record_cache_access("timed_cache", False)
+            while True:
+                task = self._refresh(cache_key, refresh_func)
+                try:
+                    return await asyncio.shield(task)
+                except asyncio.CancelledError:
+                    # An invalidation cancelled the shared refresh; start over
+                    # unless this caller is the one being cancelled
+                    if task.cancelled() and not asyncio.current_task().cancelling():
+                        continue
+                    raise
+        
+        value, refreshed_at, duration = entry
+        metrics.record_cache_access("timed_cache", True)
+        
+        if self._needs_refresh(refreshed_at, duration):
+            # Serve the stale value and refresh in the background
+            self._refresh(cache_key, refresh_func)
+        
+        return value
+        
+    def _needs_refresh(self, refreshed_at: float, duration: float) -> bool:
+        """
+        Decide whether a cached value should be refreshed now.
+        
+        Args:
+            refreshed_at: When the value was computed (epoch seconds)
+            duration: How long computing it took in seconds
             
-            # Get new value
-            new_value = await refresh_func() if asyncio.iscoroutinefunction(refresh_func) else refresh_func()
+        Returns:
+            True if the value is due, or randomly selected for early refresh
+        """
+        age = time.time() - refreshed_at
+        if age >= self.refresh_seconds:
+            return True
             
-            # Cache the new value
-            set_cache(cache_key, new_value, self.expire_seconds)
+        # XFetch: the closer to the deadline and the slower the refresh, the
+        # likelier an early refresh; 1 - random() keeps log() away from 0
+        return age - duration * self.beta * math.log(1.0 - random.random()) >= self.refresh_seconds
+    
+    def _refresh(self, cache_key: str, refresh_func: Callable[[], Any]) -> asyncio.Task:
+        """
+        Start refreshing a key unless a refresh is already in flight.
+        
+        Args:
+            cache_key: The full cache key
+            refresh_func: Function to call to compute/fetch the value
             
-            # Update last refresh time
-            self.last_refresh_time = current_time
+        Returns:
+            The task computing the value
+        """
+        task = _refreshes.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(self._compute(cache_key, refresh_func))
+            _refreshes[cache_key] = task
+            task.add_done_callback(lambda done: _refresh_done(cache_key, done))
+        return task
+    
+    async def _compute(self, cache_key: str, refresh_func: Callable[[], Any]) -> Any:
+        """
+        Compute a value and store it with its refresh time.
+        
+        Args:
+            cache_key: The full cache key
+            refresh_func: Function to call to compute/fetch the value
             
-            return new_value
-        except Exception as e:
-            logger.error(f"Error refreshing timed cache '{self.name}:{key}': {str(e)}")
-            # If we have a cached value, return it even though it's stale
-            if cached_value is not None:
-                metrics.record_cache_access("timed_cache", True)
-                return cached_value
-            # Otherwise, raise the error
-            raise
-        finally:
-            self.is_refreshing = False
+        Returns:
+            The computed value
+        """
+        started = time.time()
+        
+        # Get new value
+        new_value = refresh_func()
+        if inspect.isawaitable(new_value):
+            new_value = await new_value
+        
+        # Cache the new value alongside when and how fast it was computed
+        refreshed_at = time.time()
+        entry = {
+            ENTRY_VALUE: new_value,
+            ENTRY_REFRESHED_AT: refreshed_at,
+            ENTRY_DURATION: refreshed_at - started,
+        }
+        if _refreshes.get(cache_key) is asyncio.current_task():
+            # Skipped if the key was invalidated while computing, since the
+            # value may predate the change that invalidated it
+            await async_cache.set_cache(cache_key, entry, self.expire_seconds)
+        
+        return new_value
     
     def invalidate(self, key: str) -> bool:
         """
-        Invalidate a cache entry.
+        Invalidate a cache entry and cancel any refresh of it in flight.
         
         Args:
             key: The cache key
@@ -120,13 +190,65 @@ class TimedCache:
             True if successful, False otherwise
         """
         cache_key = f"{self.name}:{key}"
+        _cancel_refresh(cache_key)
         return delete_cache(cache_key)
 
 
+def _refresh_done(cache_key: str, task: asyncio.Task) -> None:
+    """Forget a finished refresh and log its failure, if any."""
+    if _refreshes.get(cache_key) is task:
+        del _refreshes[cache_key]
+    if not task.cancelled() and task.exception() is not None:
+        # Callers with a stale value keep serving it until the key expires
+        logger.error(f"Error refreshing timed cache '{cache_key}': {str(task.exception())}")
+
+
+def _cancel_refresh(cache_key: str) -> None:
+    """
+    Cancel the in-flight refresh of a key, if any.
+    
+    Safe to call from synchronous code running in a worker thread: the task is
+    forgotten immediately, so it no longer writes its result, and cancelled on
+    its own event loop.
+    
+    Args:
+        cache_key: The full cache key
+    """
+    task = _refreshes.pop(cache_key, None)
+    if task is None or task.done():
+        return
+    loop = task.get_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        task.cancel()
+    elif not loop.is_closed():
+        loop.call_soon_threadsafe(task.cancel)
+
+
+def _unwrap(cached: Any) -> Optional[Tuple[Any, float, float]]:
+    """
+    Split a cached entry into its value, refresh time and refresh duration.
+    
+    Args:
+        cached: The raw cached entry
+        
+    Returns:
+        (value, refreshed_at, duration), or None if nothing usable is cached
+    """
+    if not isinstance(cached, dict) or ENTRY_REFRESHED_AT not in cached:
+        # Missing, or written before entries carried refresh metadata
+        return None
+    return cached.get(ENTRY_VALUE), float(cached[ENTRY_REFRESHED_AT]), float(cached.get(ENTRY_DURATION, 0.0))
+
+
 def timed_cache_decorator(name: str,
                           refresh_seconds: int = 300,
                           expire_seconds: int = 3600,
-                          key_builder: Optional[Callable] = None):
+                          key_builder: Optional[Callable] = None,
+                          beta: float = 1.0):
     """
     Decorator for functions that should use timed cache.
     
@@ -135,11 +257,12 @@ def timed_cache_decorator(name: str,
         refresh_seconds: How often to refresh the cache (default: 5 minutes)
         expire_seconds: When the cache should expire (default: 1 hour)
         key_builder: Function to build cache key from function args
+        beta: How eagerly keys are refreshed early (default: 1.0)
         
     Returns:
         Decorated function
     """
-    cache = TimedCache(name, refresh_seconds, expire_seconds)
+    cache = TimedCache(name, refresh_seconds, expire_seconds, beta)
     
     def decorator(func):
         @wraps(func)
@@ -1,7 +1,7 @@
 from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
 import jwt
-from typing import Dict
+from typing import Any, Dict, Optional
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -18,18 +18,30 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
     return pwd_context.verify(plain_password, hashed_password)
 
-def create_access_token(data: Dict[str, str]) -> str:
-    """Create a JWT access token."""
+def create_access_token(data: Dict[str, str], permission_claims: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Create a JWT access token.
+    
+    Args:
+        data: Claims to encode, including the subject
+        permission_claims: Role/permission digest and permission epoch from
+            PermissionEngine.build_claims, embedded in "fat token" mode
+        
+    Returns:
+        The encoded token
+    """
     to_encode = data.copy()
+    if permission_claims:
+        to_encode.update(permission_claims)
     expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire.isoformat()})
+    to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 def create_refresh_token(data: Dict[str, str]) -> str:
     """Create a JWT refresh token."""
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire.isoformat()})
+    to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 def verify_token(token: str) -> Dict[str, str]:
@@ -17,7 +17,7 @@ class User(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
-    hashed_password = Column(String, nullable=True)  # Can be null for OAuth users
+    hashed_password = Column(String, nullable=True, info={"sensitive": True})  # Can be null for OAuth users
     first_name = Column(String, nullable=False)
     last_name = Column(String, nullable=False)
     active = Column(Boolean, default=True)
@@ -0,0 +1,236 @@
+"""
+Set-based RBAC statements.
+
+Each helper resolves or mutates any number of rows in a constant number of
+statements (one IN query, one multi-row insert or one delete), so provisioning
+a role with hundreds of permissions costs a handful of round trips. Helpers
+only flush; callers own the transaction.
+"""
+from typing import Dict, Iterable, List, Set, Tuple
+
+from sqlalchemy import UniqueConstraint, delete, insert, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.db.models import Permission, RolePermission, user_role
+
+def _unique_key(table, column_names: Iterable[str]) -> List:
+    """
+    Find a unique key of a table made up of the given columns.
+    
+    Args:
+        table: The table
+        column_names: Names of the columns the rows provide
+    
+    Returns:
+        The columns of the primary key if the rows provide it, else of the first unique constraint they do
+    """
+    names = set(column_names)
+    constraints = [table.primary_key] + [
+        constraint for constraint in table.constraints if isinstance(constraint, UniqueConstraint)
+    ]
+    for constraint in constraints:
+        columns = list(constraint.columns)
+        if columns and all(column.key in names for column in columns):
+            return columns
+    raise ValueError(f"Rows for {table.name} do not cover any of its unique keys")
+
+def _new_rows(db: Session, table, rows: List[Dict]) -> List[Dict]:
+    """
+    Drop rows whose unique key already exists, in one query.
+    
+    Args:
+        db: Database session
+        table: The table the rows are for
+        rows: Column values of the rows to insert
+    
+    Returns:
+        The rows that do not exist yet
+    """
+    key = _unique_key(table, rows[0].keys())
+    values = [tuple(row[column.key] for column in key) for row in rows]
+    if len(key) == 1:
+        condition = key[0].in_([value for value, in values])
+    else:
+        condition = tuple_(*key).in_(values)
+    existing = {tuple(row) for row in db.execute(select(*key).where(condition))}
+    return [row for row, value in zip(rows, values) if value not in existing]
+
+def _insert_ignore(db: Session, table, rows: List[Dict]) -> int:
+    """
+    Insert rows in one statement, skipping rows that violate a unique key.
+    
+    PostgreSQL and SQLite skip them with ON CONFLICT DO NOTHING. Other dialects
+    filter out existing rows first, so a row inserted concurrently between the
+    two statements can still fail.
+    
+    Args:
+        db: Database session
+        table: The table to insert into
+        rows: Column values of the rows to insert
+    
+    Returns:
+        Number of rows inserted
+    """
+    if not rows:
+        return 0
+    
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        statement = postgresql.insert(table).values(rows).on_conflict_do_nothing()
+    elif dialect == "sqlite":
+        statement = sqlite.insert(table).values(rows).on_conflict_do_nothing()
+    else:
+        rows = _new_rows(db, table, rows)
+        if not rows:
+            return 0
+        statement = insert(table).values(rows)
+    
+    return db.execute(statement).rowcount
+
+def find_missing_ids(db: Session, model, ids: Iterable[int]) -> List[int]:
+    """
+    Find which of the given primary keys do not exist.
+    
+    Args:
+        db: Database session
+        model: The model to look up (e.g., Role)
+        ids: The IDs to check
+    
+    Returns:
+        Sorted list of IDs with no matching row
+    """
+    wanted = set(ids)
+    if not wanted:
+        return []
+    found = set(db.execute(select(model.id).where(model.id.in_(wanted))).scalars())
+    return sorted(wanted - found)
+
+def get_permission_names(db: Session, permission_ids: Iterable[int]) -> Dict[int, str]:
+    """
+    Get permission names by ID in one query.
+    
+    Args:
+        db: Database session
+        permission_ids: The permission IDs
+    
+    Returns:
+        Mapping of permission ID to name for the permissions that exist
+    """
+    ids = set(permission_ids)
+    if not ids:
+        return {}
+    rows = db.execute(select(Permission.id, Permission.name).where(Permission.id.in_(ids)))
+    return {permission_id: name for permission_id, name in rows}
+
+def get_or_create_permissions(db: Session, names: Iterable[str]) -> Dict[str, int]:
+    """
+    Resolve permission names to IDs, creating the ones that do not exist.
+    
+    Args:
+        db: Database session
+        names: The permission names
+    
+    Returns:
+        Mapping of permission name to ID
+    """
+    wanted = set(names)
+    if not wanted:
+        return {}
+    
+    query = select(Permission.name, Permission.id).where(Permission.name.in_(wanted))
+    permission_ids = dict(db.execute(query).all())
+    
+    missing = wanted - permission_ids.keys()
+    if missing:
+        _insert_ignore(db, Permission.__table__, [{"name": name} for name in sorted(missing)])
+        # Re-read instead of relying on RETURNING, which skips rows a concurrent request inserted
+        permission_ids.update(db.execute(query.where(Permission.name.in_(missing))).all())
+    
+    return permission_ids
+
+def grant_role_permissions(db: Session, grants: Iterable[Tuple[int, int]]) -> int:
+    """
+    Grant permissions to roles, ignoring grants that already exist.
+    
+    Args:
+        db: Database session
+        grants: (role_id, permission_id) pairs
+    
+    Returns:
+        Number of new grants
+    """
+    rows = [{"role_id": role_id, "permission_id": permission_id} for role_id, permission_id in set(grants)]
+    return _insert_ignore(db, RolePermission.__table__, rows)
+
+def revoke_role_permissions(db: Session, role_id: int, permission_ids: Iterable[int]) -> int:
+    """
+    Revoke permissions from a role.
+    
+    Args:
+        db: Database session
+        role_id: The role ID
+        permission_ids: The permission IDs to revoke
+    
+    Returns:
+        Number of grants removed
+    """
+    ids = set(permission_ids)
+    if not ids:
+        return 0
+    return db.execute(
+        delete(RolePermission).where(
+            RolePermission.role_id == role_id,
+            RolePermission.permission_id.in_(ids),
+        )
+    ).rowcount
+
+def replace_role_permissions(db: Session, role_id: int, permission_ids: Iterable[int]) -> None:
+    """
+    Make a role's permissions exactly the given set.
+    
+    Args:
+        db: Database session
+        role_id: The role ID
+        permission_ids: The permission IDs the role should have
+    """
+    ids: Set[int] = set(permission_ids)
+    statement = delete(RolePermission).where(RolePermission.role_id == role_id)
+    if ids:
+        statement = statement.where(RolePermission.permission_id.not_in(ids))
+    db.execute(statement)
+    grant_role_permissions(db, ((role_id, permission_id) for permission_id in ids))
+
+def assign_user_roles(db: Session, user_id: int, role_ids: Iterable[int]) -> int:
+    """
+    Assign roles to a user, ignoring roles the user already has.
+    
+    Args:
+        db: Database session
+        user_id: The user ID
+        role_ids: The role IDs to assign
+    
+    Returns:
+        Number of roles newly assigned
+    """
+    rows = [{"user_id": user_id, "role_id": role_id} for role_id in set(role_ids)]
+    return _insert_ignore(db, user_role, rows)
+
+def revoke_user_roles(db: Session, user_id: int, role_ids: Iterable[int]) -> int:
+    """
+    Revoke roles from a user.
+    
+    Args:
+        db: Database session
+        user_id: The user ID
+        role_ids: The role IDs to revoke
+    
+    Returns:
+        Number of roles removed
+    """
+    ids = set(role_ids)
+    if not ids:
+        return 0
+    return db.execute(
+        delete(user_role).where(user_role.c.user_id == user_id, user_role.c.role_id.in_(ids))
+    ).rowcount
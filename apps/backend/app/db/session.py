@@ -1,14 +1,57 @@
+from typing import Any, AsyncGenerator, Dict
+
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 
+def _engine_options(url: str) -> Dict[str, Any]:
+    """
+    Build engine keyword arguments from the pool settings.
+    
+    Args:
+        url: The database URL
+    
+    Returns:
+        Keyword arguments for create_engine / create_async_engine
+    """
+    options: Dict[str, Any] = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "query_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
+    # SQLite uses a single-connection pool without sizing options
+    if not url.startswith("sqlite"):
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    if url.startswith("postgresql+psycopg"):
+        # Server-side prepared statements after this many executions of a query
+        options["connect_args"] = {"prepare_threshold": settings.DB_PREPARE_THRESHOLD}
+    return options
+
 engine = create_engine(
     settings.DATABASE_URL,
+    **_engine_options(settings.DATABASE_URL),
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine; queries awaited on it release the event loop while in flight
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    **_engine_options(settings.ASYNC_DATABASE_URL),
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 Base = declarative_base()
 
 # Dependency
@@ -18,3 +61,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Async dependency
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
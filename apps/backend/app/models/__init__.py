@@ -1,5 +1,4 @@
 # Import all models here so they can be imported from app.models
 from app.models.threat_indicator import ThreatIndicator
 from app.models.uba_login_anomaly import UBALoginAnomalyAlert
-from app.models.workflow import WorkflowDefinition, WorkflowInstance
-from app.models.rune import Rune
+from app.models.workflow import Rune, WorkflowDefinition, WorkflowInstance
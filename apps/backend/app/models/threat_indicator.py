@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ARRAY, DateTime
+from sqlalchemy import Column, String, ARRAY, DateTime, Index
 from sqlalchemy.dialects.postgresql import JSONB
 
 from app.models.base import BaseModel
@@ -6,6 +6,9 @@ from app.models.base import BaseModel
 
 class ThreatIndicator(BaseModel):
     __tablename__ = "threat_indicators"
+    __table_args__ = (
+        Index("ix_threat_indicators_last_seen_id", "last_seen", "id"),
+    )
 
     # Core indicator data
     indicator_value = Column(String, nullable=False, index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 
 from app.models.base import BaseModel
@@ -6,6 +6,12 @@ from app.models.base import BaseModel
 
 class UBALoginAnomalyAlert(BaseModel):
     __tablename__ = "uba_login_anomaly_alerts"
+    __table_args__ = (
+        # Triage lists filter on one column and page by (timestamp, id)
+        Index("ix_uba_login_anomaly_alerts_status_timestamp", "status", "timestamp", "id"),
+        Index("ix_uba_login_anomaly_alerts_user_id_timestamp", "user_id", "timestamp", "id"),
+        Index("ix_uba_login_anomaly_alerts_alert_type_timestamp", "alert_type", "timestamp", "id"),
+    )
 
     # Core alert data
     user_id = Column(UUID(as_uuid=True), nullable=False, index=True)
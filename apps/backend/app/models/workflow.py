@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
 
@@ -7,6 +7,9 @@ from app.models.base import BaseModel
 
 class WorkflowDefinition(BaseModel):
     __tablename__ = "workflow_definitions"
+    __table_args__ = (
+        Index("ix_workflow_definitions_created_at_id", "created_at", "id"),
+    )
 
     # Basic workflow info
     name = Column(String, nullable=False, index=True)
@@ -43,6 +46,10 @@ class Rune(BaseModel):
 
 class WorkflowInstance(BaseModel):
     __tablename__ = "workflow_instances"
+    __table_args__ = (
+        Index("ix_workflow_instances_status_created_at", "status", "created_at", "id"),
+        Index("ix_workflow_instances_definition_id_created_at", "definition_id", "created_at", "id"),
+    )
 
     # Instance identification
     definition_id = Column(UUID(as_uuid=True), ForeignKey("workflow_definitions.id"), nullable=False, index=True)
@@ -66,3 +73,8 @@ class WorkflowInstance(BaseModel):
     
     # Relationship to workflow definition
     definition = relationship("WorkflowDefinition", back_populates="instances")
+    
+    @property
+    def definition_name(self) -> str:
+        """Name of the definition, as exposed by the WorkflowInstance schema."""
+        return self.definition.name
@@ -1,38 +1,238 @@
-from typing import Generic, TypeVar, Type, List, Dict, Any, Optional, Union
+from typing import Callable, Generic, NamedTuple, Sequence, Tuple, TypeVar, Type, List, Dict, Any, Optional, Union
+from datetime import datetime
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy import func, literal, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from uuid import UUID
+import base64
+import json
+import operator
 
+from app.core.config import settings
+from app.core.redis import async_cache
+from app.core.redis.cache import get_cache, set_cache
 from app.models.base import BaseModel as DBBaseModel
 
 ModelType = TypeVar("ModelType", bound=DBBaseModel)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+# Planner row estimate for a table; -1 (or 0 on older servers) until it is analyzed
+ROW_ESTIMATE_SQL = text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)")
+
+
+class Page(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(sort_by: str, sort_order: str, value: Any, id: Any) -> str:
+    """
+    Build an opaque cursor pointing just past the given row.
+    """
+    payload = json.dumps([sort_by, sort_order, jsonable_encoder(value), str(id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str, Any, str]:
+    """
+    Unpack a cursor built by encode_cursor. Raises ValueError if it is malformed.
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_by, sort_order, value, id = json.loads(payload)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+    return sort_by, sort_order, value, id
+
+
+def _cursor_value(value: Any, column) -> Any:
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    try:
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type is UUID:
+            return UUID(value)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+    return value
+
+
+def keyset_statement(
+    model, statement, *, limit: int, cursor: Optional[str] = None, offset: int = 0,
+    sort_by: str = "created_at", sort_order: str = "desc"
+):
+    """
+    Order a select by (sort_by, id) and seek past the cursor.
+
+    The seek predicate is a row comparison, so it is served by a composite
+    (sort_by, id) index no matter how deep the page is. Without a cursor the
+    offset is applied instead, for clients that still page by offset. One
+    extra row is fetched so keyset_page can tell whether another page exists.
+    Raises ValueError for unknown or nullable sort columns and bad cursors.
+    """
+    if sort_order not in ("asc", "desc"):
+        raise ValueError(f"Invalid sort order '{sort_order}'")
+    column = model.__table__.columns.get(sort_by)
+    if column is None:
+        raise ValueError(f"Cannot sort by '{sort_by}'")
+    if column.nullable:
+        raise ValueError(f"Cannot paginate by nullable column '{sort_by}'")
+
+    sort_column = getattr(model, column.key)
+    descending = sort_order == "desc"
+    if cursor:
+        cursor_sort_by, cursor_sort_order, value, last_id = decode_cursor(cursor)
+        if (cursor_sort_by, cursor_sort_order) != (sort_by, sort_order):
+            raise ValueError("Pagination cursor does not match the requested sort")
+        key = tuple_(sort_column, model.id)
+        bound = tuple_(
+            literal(_cursor_value(value, column), column.type),
+            literal(_cursor_value(last_id, model.__table__.c.id), model.__table__.c.id.type),
+        )
+        statement = statement.where(key < bound if descending else key > bound)
+    elif offset:
+        statement = statement.offset(offset)
+
+    if descending:
+        statement = statement.order_by(sort_column.desc(), model.id.desc())
+    else:
+        statement = statement.order_by(sort_column.asc(), model.id.asc())
+    return statement.limit(limit + 1)
+
+
+def keyset_page(rows: List[Any], limit: int, sort_by: str, sort_order: str) -> Page:
+    """
+    Trim the look-ahead row fetched by keyset_statement and build the next cursor.
+    """
+    items = list(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(sort_by, sort_order, getattr(last, sort_by), last.id)
+    return Page(items, next_cursor)
+
+
+def _count_cache_key(model, filters: Dict[str, Any]) -> str:
+    parts = ",".join(f"{field}={value}" for field, value in sorted(filters.items()))
+    return f"count:{model.__tablename__}:{parts}"
+
+
+# Lookups accepted as "<field>__<lookup>" filter keywords; a bare field name means "eq"
+FILTER_LOOKUPS: Dict[str, Callable[[Any, Any], Any]] = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "in": lambda column, value: column.in_(list(value)),
+    "startswith": lambda column, value: column.startswith(value, autoescape=True),
+}
+
+
+def _active_filters(model, filters: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        key: value for key, value in filters.items()
+        if hasattr(model, key.partition("__")[0]) and value is not None
+    }
+
+
+def filter_clauses(model, filters: Dict[str, Any]) -> List[Any]:
+    """
+    Compile filter keywords into SQLAlchemy predicates.
+
+    Keys are a column name, optionally followed by "__" and a lookup from
+    FILTER_LOOKUPS (e.g. timestamp__gte=start, status__in=["new", "reviewed"],
+    username__startswith="adm"). None values and unknown fields are skipped;
+    unknown lookups raise ValueError.
+    """
+    clauses = []
+    for key, value in _active_filters(model, filters).items():
+        field, _, lookup = key.partition("__")
+        compile_lookup = FILTER_LOOKUPS.get(lookup or "eq")
+        if compile_lookup is None:
+            raise ValueError(f"Unsupported filter lookup '{lookup}' on '{field}'")
+        clauses.append(compile_lookup(getattr(model, field), value))
+    return clauses
+
+
+def order_clauses(model, order_by: Optional[Sequence[str]]) -> List[Any]:
+    """
+    Compile field names into ORDER BY clauses; a leading "-" sorts descending.
+    """
+    clauses = []
+    for name in order_by or ():
+        field = name.lstrip("-")
+        if field not in model.__table__.columns:
+            raise ValueError(f"Cannot sort by '{field}'")
+        column = getattr(model, field)
+        clauses.append(column.desc() if name.startswith("-") else column.asc())
+    return clauses
+
 
 class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
         self.model = model
 
+    def _filtered(self, statement, filters: Dict[str, Any]):
+        return statement.where(*filter_clauses(self.model, filters))
+
     def get(self, db: Session, id: UUID) -> Optional[ModelType]:
         return db.query(self.model).filter(self.model.id == id).first()
 
     def get_multi(
-        self, db: Session, *, skip: int = 0, limit: int = 100, **filters
+        self, db: Session, *, skip: int = 0, limit: int = 100,
+        order_by: Optional[Sequence[str]] = None, **filters
     ) -> List[ModelType]:
-        query = db.query(self.model)
-        for field, value in filters.items():
-            if hasattr(self.model, field) and value is not None:
-                query = query.filter(getattr(self.model, field) == value)
-        return query.offset(skip).limit(limit).all()
+        query = db.query(self.model).filter(*filter_clauses(self.model, filters))
+        return query.order_by(*order_clauses(self.model, order_by)).offset(skip).limit(limit).all()
     
     def count(self, db: Session, **filters) -> int:
-        query = db.query(self.model)
-        for field, value in filters.items():
-            if hasattr(self.model, field) and value is not None:
-                query = query.filter(getattr(self.model, field) == value)
-        return query.count()
+        return db.query(self.model).filter(*filter_clauses(self.model, filters)).count()
+
+    def get_page(
+        self, db: Session, *, limit: int = 25, cursor: Optional[str] = None, offset: int = 0,
+        sort_by: str = "created_at", sort_order: str = "desc", **filters
+    ) -> Page:
+        """
+        Retrieve one page of records using keyset pagination (see keyset_statement).
+        """
+        statement = keyset_statement(
+            self.model, self._filtered(select(self.model), filters),
+            limit=limit, cursor=cursor, offset=offset, sort_by=sort_by, sort_order=sort_order,
+        )
+        return keyset_page(db.execute(statement).scalars().all(), limit, sort_by, sort_order)
+
+    def approximate_count(self, db: Session, **filters) -> Tuple[int, bool]:
+        """
+        Count records for list totals, cached for COUNT_CACHE_TTL_SECONDS.
+
+        Unfiltered counts of PostgreSQL tables with at least COUNT_ESTIMATE_MIN_ROWS
+        rows use the planner's estimate instead of a full scan. Returns the count
+        and whether it is an estimate.
+        """
+        filters = _active_filters(self.model, filters)
+        key = _count_cache_key(self.model, filters)
+        cached = get_cache(key)
+        if cached is not None:
+            return cached[0], cached[1]
+
+        total, estimated = None, False
+        if not filters and db.get_bind().dialect.name == "postgresql":
+            estimate = db.execute(ROW_ESTIMATE_SQL, {"table": self.model.__tablename__}).scalar()
+            if estimate is not None and estimate >= settings.COUNT_ESTIMATE_MIN_ROWS:
+                total, estimated = int(estimate), True
+        if total is None:
+            total = self.count(db, **filters)
+
+        set_cache(key, [total, estimated], settings.COUNT_CACHE_TTL_SECONDS)
+        return total, estimated
 
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in)
@@ -71,3 +271,104 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         if hasattr(self.model, field):
             return db.query(self.model).filter(getattr(self.model, field) == value).first()
         return None
+
+
+class AsyncBaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    """Async counterpart of BaseRepository for use with get_async_db."""
+
+    def __init__(self, model: Type[ModelType]):
+        self.model = model
+
+    def _filtered(self, statement, filters: Dict[str, Any]):
+        return statement.where(*filter_clauses(self.model, filters))
+
+    async def get(self, db: AsyncSession, id: UUID) -> Optional[ModelType]:
+        return await db.get(self.model, id)
+
+    async def get_multi(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100,
+        order_by: Optional[Sequence[str]] = None, **filters
+    ) -> List[ModelType]:
+        statement = self._filtered(select(self.model), filters).order_by(*order_clauses(self.model, order_by))
+        statement = statement.offset(skip).limit(limit)
+        return list((await db.execute(statement)).scalars().all())
+
+    async def count(self, db: AsyncSession, **filters) -> int:
+        statement = self._filtered(select(func.count()).select_from(self.model), filters)
+        return (await db.execute(statement)).scalar_one()
+
+    async def get_page(
+        self, db: AsyncSession, *, limit: int = 25, cursor: Optional[str] = None, offset: int = 0,
+        sort_by: str = "created_at", sort_order: str = "desc", **filters
+    ) -> Page:
+        """
+        Retrieve one page of records using keyset pagination (see keyset_statement).
+        """
+        statement = keyset_statement(
+            self.model, self._filtered(select(self.model), filters),
+            limit=limit, cursor=cursor, offset=offset, sort_by=sort_by, sort_order=sort_order,
+        )
+        rows = (await db.execute(statement)).scalars().all()
+        return keyset_page(rows, limit, sort_by, sort_order)
+
+    async def approximate_count(self, db: AsyncSession, **filters) -> Tuple[int, bool]:
+        """
+        Count records for list totals; see BaseRepository.approximate_count.
+        """
+        filters = _active_filters(self.model, filters)
+        key = _count_cache_key(self.model, filters)
+        cached = await async_cache.get_cache(key)
+        if cached is not None:
+            return cached[0], cached[1]
+
+        total, estimated = None, False
+        if not filters and db.get_bind().dialect.name == "postgresql":
+            result = await db.execute(ROW_ESTIMATE_SQL, {"table": self.model.__tablename__})
+            estimate = result.scalar()
+            if estimate is not None and estimate >= settings.COUNT_ESTIMATE_MIN_ROWS:
+                total, estimated = int(estimate), True
+        if total is None:
+            total = await self.count(db, **filters)
+
+        await async_cache.set_cache(key, [total, estimated], settings.COUNT_CACHE_TTL_SECONDS)
+        return total, estimated
+
+    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
+        obj_in_data = jsonable_encoder(obj_in)
+        db_obj = self.model(**obj_in_data)
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def update(
+        self, db: AsyncSession, *, db_obj: ModelType, obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+    ) -> ModelType:
+        obj_data = jsonable_encoder(db_obj)
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        for field in obj_data:
+            if field in update_data:
+                setattr(db_obj, field, update_data[field])
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def remove(self, db: AsyncSession, *, id: UUID) -> Optional[ModelType]:
+        obj = await db.get(self.model, id)
+        if obj is not None:
+            await db.delete(obj)
+            await db.commit()
+        return obj
+
+    async def get_by_field(self, db: AsyncSession, field: str, value: Any) -> Optional[ModelType]:
+        """
+        Retrieve a single record by a specific field and value.
+        """
+        if hasattr(self.model, field):
+            statement = select(self.model).where(getattr(self.model, field) == value).limit(1)
+            return (await db.execute(statement)).scalars().first()
+        return None
@@ -4,12 +4,16 @@ This provides a structured way to access data with optional caching.
 """
 from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
 from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 
 from app.db.models import Base
-from app.core.redis.cache import get_cache, set_cache, delete_cache
+from app.core.redis import async_cache
+from app.core.redis.cache import delete_cache
+from app.core.redis.repository_cache import RepositoryCache, dto_schema
 
 # Create a TypeVar for SQLAlchemy model
 T = TypeVar('T', bound=Base)
@@ -22,7 +26,8 @@ class BaseRepository(Generic[T]):
     Base repository for data access operations with caching support.
     """
     
-    def __init__(self, model: Type[T], db: Session, use_cache: bool = True, cache_prefix: str = None):
+    def __init__(self, model: Type[T], db: Session, use_cache: bool = True, cache_prefix: str = None,
+                 schema: Optional[Type[BaseModel]] = None):
         """
         Initialize the repository.
         
@@ -31,15 +36,20 @@ class BaseRepository(Generic[T]):
             db: Database session
             use_cache: Whether to use caching (default: True)
             cache_prefix: Prefix for cache keys (default: model.__tablename__)
+            schema: Read-only DTO schema for cached reads (default: built from the model's columns)
         """
         self.model = model
         self.db = db
         self.use_cache = use_cache
         self.cache_prefix = cache_prefix or model.__tablename__
+        self.cache = RepositoryCache(self.cache_prefix, schema or dto_schema(model))
     
     def get_by_id(self, id: Any) -> Optional[T]:
         """
-        Get a record by ID, with caching.
+        Get a record by ID.
+        
+        Always returns a session-bound model instance; use get_dto or get_many
+        for cached reads.
         
         Args:
             id: The record ID
@@ -47,24 +57,45 @@ class BaseRepository(Generic[T]):
         Returns:
             The record if found, None otherwise
         """
-        # Check cache first if caching is enabled
-        if self.use_cache:
-            cache_key = f"{self.cache_prefix}:{id}"
-            cached_record = get_cache(cache_key)
-            if cached_record:
-                # Note: This returns a dict, not a model instance
-                # This is a limitation of the current caching system
-                return cached_record
+        return self.db.query(self.model).filter(self.model.id == id).first()
+        
+    def get_dto(self, id: Any) -> Optional[BaseModel]:
+        """
+        Get a read-only snapshot of a record by ID, with caching.
+        
+        Args:
+            id: The record ID
+        
+        Returns:
+            The record's DTO if found, None otherwise
+        """
+        return self.get_many([id]).get(id)
+    
+    def get_many(self, ids: List[Any]) -> Dict[Any, BaseModel]:
+        """
+        Get read-only snapshots of several records, with caching.
         
-        # Query the database
-        record = self.db.query(self.model).filter(self.model.id == id).first()
+        Cached records come from one multi-get; the rest are loaded with a
+        single IN query and cached. Hits and misses return the same DTO type.
         
-        # Cache the result if found and caching is enabled
-        if record and self.use_cache:
-            cache_key = f"{self.cache_prefix}:{id}"
-            set_cache(cache_key, record.__dict__, 3600)
+        Args:
+            ids: The record IDs
+            
+        Returns:
+            Mapping of ID to DTO for the records that exist, in the order of ids
+        """
+        ids = list(dict.fromkeys(ids))
+        found = self.cache.get_many(ids) if self.use_cache else {}
         
-        return record
+        missing = [id for id in ids if id not in found]
+        if missing:
+            records = self.db.query(self.model).filter(self.model.id.in_(missing)).all()
+            loaded = {record.id: self.cache.to_dto(record) for record in records}
+            if self.use_cache:
+                self.cache.set_many(loaded)
+            found.update(loaded)
+            
+        return {id: found[id] for id in ids if id in found}
     
     def get_all(self, skip: int = 0, limit: int = 100) -> List[T]:
         """
@@ -145,8 +176,7 @@ class BaseRepository(Generic[T]):
             
             # Invalidate caches
             if self.use_cache:
-                cache_key = f"{self.cache_prefix}:{id}"
-                delete_cache(cache_key)
+                self.cache.delete_many([id])
                 self._invalidate_collection_caches()
                 
             return record
@@ -175,8 +205,7 @@ class BaseRepository(Generic[T]):
             
             # Invalidate caches
             if self.use_cache:
-                cache_key = f"{self.cache_prefix}:{id}"
-                delete_cache(cache_key)
+                self.cache.delete_many([id])
                 self._invalidate_collection_caches()
                 
             return True
@@ -191,3 +220,203 @@ class BaseRepository(Generic[T]):
         # This is a simplified implementation
         delete_cache(f"{self.cache_prefix}:all")
         delete_cache(f"{self.cache_prefix}:count")
+
+class AsyncBaseRepository(Generic[T]):
+    """
+    Async base repository for data access operations with caching support.
+    
+    Mirrors BaseRepository on an AsyncSession, so queries and cache round
+    trips are awaited instead of blocking the event loop.
+    """
+    
+    def __init__(self, model: Type[T], db: AsyncSession, use_cache: bool = True, cache_prefix: str = None,
+                 schema: Optional[Type[BaseModel]] = None):
+        """
+        Initialize the repository.
+        
+        Args:
+            model: The SQLAlchemy model class
+            db: Async database session
+            use_cache: Whether to use caching (default: True)
+            cache_prefix: Prefix for cache keys (default: model.__tablename__)
+            schema: Read-only DTO schema for cached reads (default: built from the model's columns)
+        """
+        self.model = model
+        self.db = db
+        self.use_cache = use_cache
+        self.cache_prefix = cache_prefix or model.__tablename__
+        self.cache = RepositoryCache(self.cache_prefix, schema or dto_schema(model))
+    
+    async def get_by_id(self, id: Any) -> Optional[T]:
+        """
+        Get a record by ID.
+        
+        Always returns a session-bound model instance; use get_dto or get_many
+        for cached reads.
+        
+        Args:
+            id: The record ID
+            
+        Returns:
+            The record if found, None otherwise
+        """
+        return await self.db.get(self.model, id)
+                
+    async def get_dto(self, id: Any) -> Optional[BaseModel]:
+        """
+        Get a read-only snapshot of a record by ID, with caching.
+        
+        Args:
+            id: The record ID
+            
+        Returns:
+            The record's DTO if found, None otherwise
+        """
+        return (await self.get_many([id])).get(id)
+    
+    async def get_many(self, ids: List[Any]) -> Dict[Any, BaseModel]:
+        """
+        Get read-only snapshots of several records, with caching.
+        
+        Args:
+            ids: The record IDs
+            
+        Returns:
+            Mapping of ID to DTO for the records that exist, in the order of ids
+        """
+        ids = list(dict.fromkeys(ids))
+        found = await self.cache.aget_many(ids) if self.use_cache else {}
+        
+        missing = [id for id in ids if id not in found]
+        if missing:
+            result = await self.db.execute(select(self.model).where(self.model.id.in_(missing)))
+            loaded = {record.id: self.cache.to_dto(record) for record in result.scalars()}
+            if self.use_cache:
+                await self.cache.aset_many(loaded)
+            found.update(loaded)
+            
+        return {id: found[id] for id in ids if id in found}
+    
+    async def get_all(self, skip: int = 0, limit: int = 100) -> List[T]:
+        """
+        Get all records with pagination.
+        
+        Args:
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+            
+        Returns:
+            List of records
+        """
+        result = await self.db.execute(select(self.model).offset(skip).limit(limit))
+        return list(result.scalars().all())
+    
+    async def get_filtered(self, filter_dict: Dict[str, Any]) -> List[T]:
+        """
+        Get records filtered by attribute values.
+        
+        Args:
+            filter_dict: Dictionary of attribute-value pairs to filter by
+            
+        Returns:
+            List of matching records
+        """
+        statement = select(self.model)
+        for attr, value in filter_dict.items():
+            statement = statement.where(getattr(self.model, attr) == value)
+        result = await self.db.execute(statement)
+        return list(result.scalars().all())
+    
+    async def create(self, data: Dict[str, Any]) -> T:
+        """
+        Create a new record.
+        
+        Args:
+            data: Dictionary of attribute-value pairs
+            
+        Returns:
+            The created record
+        """
+        try:
+            record = self.model(**data)
+            self.db.add(record)
+            await self.db.commit()
+            await self.db.refresh(record)
+            
+            # Invalidate any relevant caches
+            if self.use_cache:
+                await self._invalidate_collection_caches()
+                
+            return record
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.error(f"Error creating {self.model.__name__}: {str(e)}")
+            raise
+    
+    async def update(self, id: Any, data: Dict[str, Any]) -> Optional[T]:
+        """
+        Update a record by ID.
+        
+        Args:
+            id: The record ID
+            data: Dictionary of attribute-value pairs to update
+            
+        Returns:
+            The updated record if found, None otherwise
+        """
+        try:
+            record = await self.db.get(self.model, id)
+            if not record:
+                return None
+                
+            # Update attributes
+            for key, value in data.items():
+                setattr(record, key, value)
+                
+            await self.db.commit()
+            await self.db.refresh(record)
+            
+            # Invalidate caches
+            if self.use_cache:
+                await self.cache.adelete_many([id])
+                await self._invalidate_collection_caches()
+                
+            return record
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.error(f"Error updating {self.model.__name__} with ID {id}: {str(e)}")
+            raise
+    
+    async def delete(self, id: Any) -> bool:
+        """
+        Delete a record by ID.
+        
+        Args:
+            id: The record ID
+            
+        Returns:
+            True if deleted, False if not found
+        """
+        try:
+            record = await self.db.get(self.model, id)
+            if not record:
+                return False
+                
+            await self.db.delete(record)
+            await self.db.commit()
+            
+            # Invalidate caches
+            if self.use_cache:
+                await self.cache.adelete_many([id])
+                await self._invalidate_collection_caches()
+                
+            return True
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.error(f"Error deleting {self.model.__name__} with ID {id}: {str(e)}")
+            raise
+    
+    async def _invalidate_collection_caches(self):
+        """Invalidate any collection caches for this model."""
+        await async_cache.delete_cache(f"{self.cache_prefix}:all")
+        await async_cache.delete_cache(f"{self.cache_prefix}:count")
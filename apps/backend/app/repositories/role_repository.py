@@ -2,10 +2,12 @@
 Role repository implementation.
 """
 from typing import Dict, List, Optional, Any
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 import logging
 
 from app.db.models import Role, Permission, RolePermission
+from app.db.session import AsyncSessionLocal
 from app.repositories.base_repository import BaseRepository
 from app.core.metrics_manager import get_metrics_manager
 from app.core.redis.timed_cache import TimedCache
@@ -16,6 +18,9 @@ logger = logging.getLogger("grimos.role_repository")
 # Get metrics manager
 metrics = get_metrics_manager()
 
+# Shared by every repository instance so concurrent requests share refreshes
+permissions_cache = TimedCache("role_permissions", 300, 3600)
+
 class RoleRepository(BaseRepository[Role]):
     """
     Repository for Role model operations.
@@ -30,7 +35,7 @@ class RoleRepository(BaseRepository[Role]):
             use_cache: Whether to use caching
         """
         super().__init__(Role, db, use_cache, "role")
-        self.permissions_cache = TimedCache("role_permissions", 300, 3600)
+        self.permissions_cache = permissions_cache
     
     def get_by_name(self, name: str) -> Optional[Role]:
         """
@@ -52,31 +57,28 @@ class RoleRepository(BaseRepository[Role]):
             metrics.record_error("database_error")
             return None
     
-    async def get_role_permissions(self, role_id: int) -> List[Permission]:
+    async def get_role_permissions(self, role_id: int) -> List[str]:
         """
-        Get permissions for a role.
+        Get the names of the permissions of a role.
         
         Args:
             role_id: The role ID
             
         Returns:
-            List of permissions
+            List of permission names
         """
         try:
             async def fetch_permissions():
-                role = self.get_by_id(role_id)
-                if not role:
-                    return []
-                    
-                permissions = []
-                for role_permission in role.permissions:
-                    permission = self.db.query(Permission).filter(
-                        Permission.id == role_permission.permission_id
-                    ).first()
-                    if permission:
-                        permissions.append(permission)
-                        
-                return permissions
+                # May run after the request has closed self.db, so it opens its own session.
+                # Names rather than ORM rows, which cannot be cached and would be detached
+                async with AsyncSessionLocal() as db:
+                    result = await db.execute(
+                        select(Permission.name)
+                        .join(RolePermission, RolePermission.permission_id == Permission.id)
+                        .where(RolePermission.role_id == role_id)
+                        .order_by(Permission.name)
+                    )
+                    return list(result.scalars().all())
             
             # Use timed cache to avoid frequent database queries
             return await self.permissions_cache.get_or_set(
@@ -2,10 +2,12 @@
 User repository implementation.
 """
 from typing import Dict, List, Optional, Any
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 import logging
 
 from app.db.models import User, Role
+from app.db.session import AsyncSessionLocal
 from app.repositories.base_repository import BaseRepository
 from app.core.metrics_manager import get_metrics_manager
 from app.core.redis.timed_cache import TimedCache
@@ -16,6 +18,9 @@ logger = logging.getLogger("grimos.user_repository")
 # Get metrics manager
 metrics = get_metrics_manager()
 
+# Shared by every repository instance so concurrent requests share refreshes
+role_cache = TimedCache("role", 300, 3600)
+
 class UserRepository(BaseRepository[User]):
     """
     Repository for User model operations.
@@ -30,7 +35,7 @@ class UserRepository(BaseRepository[User]):
             use_cache: Whether to use caching
         """
         super().__init__(User, db, use_cache, "user")
-        self.role_cache = TimedCache("role", 300, 3600)
+        self.role_cache = role_cache
     
     def get_by_email(self, email: str) -> Optional[User]:
         """
@@ -72,24 +77,25 @@ class UserRepository(BaseRepository[User]):
             metrics.record_error("database_error")
             return []
     
-    def get_users_with_role(self, role_name: str) -> List[User]:
+    async def get_users_with_role(self, role_name: str) -> List[int]:
         """
-        Get all users with a specific role.
+        Get the IDs of all users with a specific role.
         
         Args:
             role_name: The role name
             
         Returns:
-            List of users with the role
+            List of IDs of users with the role
         """
         try:
             async def get_users():
-                role = self.db.query(Role).filter(Role.name == role_name).first()
-                if not role:
-                    return []
-                
-                users = self.db.query(User).filter(User.roles.contains(role)).all()
-                return users
+                # May run after the request has closed self.db, so it opens its own session.
+                # IDs rather than ORM rows, which cannot be cached and would be detached
+                async with AsyncSessionLocal() as db:
+                    result = await db.execute(
+                        select(User.id).join(User.roles).where(Role.name == role_name).order_by(User.id)
+                    )
+                    return list(result.scalars().all())
             
             # Use the timed cache to avoid frequent database queries
             return await self.role_cache.get_or_set(f"users_with_role:{role_name}", get_users)
@@ -1,10 +1,11 @@
 from typing import List, Optional, Dict, Any
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from uuid import UUID
 
 from app.repositories.base import BaseRepository
 from app.models.workflow import WorkflowDefinition, Rune, WorkflowInstance
-from app.schemas.workflow import WorkflowDefinitionCreate, WorkflowDefinitionUpdate
+from app.schemas.workflow import WorkflowDefinitionCreate, WorkflowDefinitionUpdate, WorkflowInstanceCreate
 
 
 class WorkflowDefinitionRepository(BaseRepository[WorkflowDefinition, WorkflowDefinitionCreate, WorkflowDefinitionUpdate]):
@@ -13,7 +14,7 @@ class WorkflowDefinitionRepository(BaseRepository[WorkflowDefinition, WorkflowDe
         return db.query(WorkflowDefinition).filter(WorkflowDefinition.id == id).first()
 
 
-class WorkflowInstanceRepository:
+class WorkflowInstanceRepository(BaseRepository[WorkflowInstance, WorkflowInstanceCreate, BaseModel]):
     def create(self, db: Session, *, definition_id: UUID, name: Optional[str] = None, initial_payload: Optional[Dict[str, Any]] = None) -> WorkflowInstance:
         """Create a new workflow instance"""
         # Get the workflow definition to get its name
@@ -93,4 +94,4 @@ class WorkflowInstanceRepository:
 
 
 workflow_definition_repository = WorkflowDefinitionRepository(WorkflowDefinition)
-workflow_instance_repository = WorkflowInstanceRepository()
+workflow_instance_repository = WorkflowInstanceRepository(WorkflowInstance)
@@ -7,10 +7,12 @@ from pydantic import BaseModel, Field
 class PaginationMeta(BaseModel):
     total_items: int
     total_pages: int
-    current_page: int
+    current_page: Optional[int] = None  # unknown when paging by cursor
     page_size: int
     next_page: Optional[str] = None
     prev_page: Optional[str] = None
+    next_cursor: Optional[str] = None
+    total_is_estimate: bool = False
 
 class PaginatedResponse(BaseModel):
     data: List[Any]
@@ -30,8 +30,15 @@ class WorkflowDefinitionUpdate(BaseModel):
     description: Optional[str] = None
     runes: Optional[List[RuneBase]] = None
 
+class Rune(RuneBase):
+    id: UUID  # Stored runes are keyed by their database id
+
+    class Config:
+        from_attributes = True
+
 class WorkflowDefinition(WorkflowDefinitionBase):
     id: UUID
+    runes: List[Rune]
     version: int
     created_at: datetime
     updated_at: datetime
@@ -0,0 +1,127 @@
+"""
+Fixtures for the backend benchmark suite.
+
+The suite runs against a throwaway SQLite database by default, or against the
+database in BENCH_DATABASE_URL (e.g. the docker-compose Postgres). Redis is
+replaced by an in-process fakeredis server so timings do not include network
+latency. The environment is set before any app module is imported, since
+settings and engines are created at import time.
+"""
+import asyncio
+import os
+import tempfile
+
+_workdir = tempfile.mkdtemp(prefix="grimos-bench-")
+BENCH_DATABASE_URL = os.environ.get("BENCH_DATABASE_URL", f"sqlite:///{_workdir}/bench.db")
+os.environ["DATABASE_URL"] = BENCH_DATABASE_URL
+os.environ["ASYNC_DATABASE_URL"] = (
+    BENCH_DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    if BENCH_DATABASE_URL.startswith("sqlite")
+    else BENCH_DATABASE_URL
+)
+
+import fakeredis
+import pytest
+
+from app.core import permissions
+from app.core.redis import async_cache, cache, repository_cache
+from app.core.security import create_access_token
+from app.db.models import Base, Permission, Role, RolePermission, User, user_role
+from app.db.session import SessionLocal, engine
+
+# Size of the RBAC fixture: permissions granted to the benchmark user's role
+PERMISSION_COUNT = 64
+
+IS_POSTGRES = engine.dialect.name == "postgresql"
+
+@pytest.fixture(scope="session", autouse=True)
+def fake_redis():
+    """Point every Redis client at one in-process fakeredis server."""
+    server = fakeredis.FakeServer()
+    originals = (
+        cache.redis_client,
+        async_cache.redis_client,
+        repository_cache.binary_client,
+        repository_cache.async_binary_client,
+    )
+    cache.redis_client = fakeredis.FakeRedis(server=server, decode_responses=True)
+    async_cache.redis_client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    repository_cache.binary_client = fakeredis.FakeRedis(server=server)
+    repository_cache.async_binary_client = fakeredis.FakeAsyncRedis(server=server)
+    yield server
+    (
+        cache.redis_client,
+        async_cache.redis_client,
+        repository_cache.binary_client,
+        repository_cache.async_binary_client,
+    ) = originals
+
+@pytest.fixture(scope="session")
+def loop():
+    """A long-lived event loop, so benchmarks do not time loop creation."""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+@pytest.fixture(scope="session")
+def tables():
+    """Create the auth/RBAC tables once per run."""
+    Base.metadata.create_all(
+        engine,
+        tables=[User.__table__, Role.__table__, Permission.__table__, RolePermission.__table__, user_role],
+    )
+    yield
+    if not IS_POSTGRES:
+        Base.metadata.drop_all(engine, tables=[user_role, RolePermission.__table__, Permission.__table__,
+                                               Role.__table__, User.__table__])
+
+@pytest.fixture
+def db(tables):
+    session = SessionLocal()
+    yield session
+    session.close()
+
+@pytest.fixture(scope="session")
+def bench_user(tables):
+    """A user whose single role grants PERMISSION_COUNT permissions."""
+    session = SessionLocal()
+    user = session.query(User).filter(User.email == "bench@grimos.local").first()
+    if user is None:
+        role = Role(name="bench_analyst", description="Benchmark role")
+        permissions_ = [Permission(name=f"bench:perm:{index}") for index in range(PERMISSION_COUNT)]
+        session.add(role)
+        session.add_all(permissions_)
+        session.flush()
+        session.add_all(RolePermission(role_id=role.id, permission_id=permission.id) for permission in permissions_)
+        user = User(
+            email="bench@grimos.local",
+            # Tokens are minted directly, so the user never logs in
+            hashed_password="!",
+            first_name="Bench",
+            last_name="User",
+            roles=[role],
+        )
+        session.add(user)
+        session.commit()
+    user_id = user.id
+    session.close()
+    return user_id
+
+@pytest.fixture(scope="session")
+def access_token(bench_user):
+    """A plain access token; authorization loads the user from the database."""
+    return create_access_token({"sub": str(bench_user)})
+
+@pytest.fixture(scope="session")
+def claims_token(bench_user, loop):
+    """An access token carrying role/permission claims for the current RBAC epoch."""
+    session = SessionLocal()
+    user = session.get(User, bench_user)
+    previous = permissions.settings.JWT_PERMISSION_CLAIMS
+    permissions.settings.JWT_PERMISSION_CLAIMS = True
+    try:
+        claims = loop.run_until_complete(permissions.permission_engine.build_claims(user, session))
+    finally:
+        permissions.settings.JWT_PERMISSION_CLAIMS = previous
+        session.close()
+    return create_access_token({"sub": str(bench_user)}, claims)
@@ -0,0 +1,98 @@
+"""
+Compare two Locust runs and fail on latency or throughput regressions.
+
+Usage:
+    python benchmarks/load/check_regression.py BASELINE_stats.csv CURRENT_stats.csv \
+        [--max-p95-increase 0.2] [--max-rps-decrease 0.2]
+
+Both files are the *_stats.csv written by `locust --csv`. Every endpoint in the
+baseline must be present in the current run; the exit status is 1 if any
+endpoint's p95 latency grew or its throughput or success rate fell by more
+than the allowed fraction.
+"""
+import argparse
+import csv
+import sys
+from typing import Dict, List
+
+def read_stats(path: str) -> Dict[str, Dict[str, float]]:
+    """
+    Read per-endpoint stats from a Locust stats CSV.
+
+    Args:
+        path: Path to the *_stats.csv file
+
+    Returns:
+        Mapping of "METHOD name" to p95 latency (ms), requests/s and error rate
+    """
+    stats: Dict[str, Dict[str, float]] = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            if row["Name"] == "Aggregated":
+                continue
+            requests = float(row["Request Count"])
+            stats[f"{row['Type']} {row['Name']}"] = {
+                "p95": float(row["95%"]),
+                "rps": float(row["Requests/s"]),
+                "error_rate": float(row["Failure Count"]) / requests if requests else 0.0,
+            }
+    return stats
+
+def compare(
+    baseline: Dict[str, Dict[str, float]],
+    current: Dict[str, Dict[str, float]],
+    max_p95_increase: float,
+    max_rps_decrease: float,
+    max_error_rate_increase: float,
+) -> List[str]:
+    """
+    Compare a run against its baseline.
+
+    Args:
+        baseline: Stats of the baseline run
+        current: Stats of the current run
+        max_p95_increase: Allowed relative p95 growth (0.2 = 20%)
+        max_rps_decrease: Allowed relative requests/s drop
+        max_error_rate_increase: Allowed absolute error rate growth
+
+    Returns:
+        Human-readable descriptions of the regressions found
+    """
+    regressions: List[str] = []
+    for endpoint, before in sorted(baseline.items()):
+        after = current.get(endpoint)
+        if after is None:
+            regressions.append(f"{endpoint}: missing from current run")
+            continue
+        if after["p95"] > before["p95"] * (1 + max_p95_increase):
+            regressions.append(f"{endpoint}: p95 {before['p95']:.0f}ms -> {after['p95']:.0f}ms")
+        if after["rps"] < before["rps"] * (1 - max_rps_decrease):
+            regressions.append(f"{endpoint}: {before['rps']:.1f} -> {after['rps']:.1f} requests/s")
+        if after["error_rate"] > before["error_rate"] + max_error_rate_increase:
+            regressions.append(f"{endpoint}: error rate {before['error_rate']:.2%} -> {after['error_rate']:.2%}")
+    return regressions
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("baseline", help="Baseline *_stats.csv")
+    parser.add_argument("current", help="Current *_stats.csv")
+    parser.add_argument("--max-p95-increase", type=float, default=0.2)
+    parser.add_argument("--max-rps-decrease", type=float, default=0.2)
+    parser.add_argument("--max-error-rate-increase", type=float, default=0.01)
+    args = parser.parse_args()
+
+    regressions = compare(
+        read_stats(args.baseline),
+        read_stats(args.current),
+        args.max_p95_increase,
+        args.max_rps_decrease,
+        args.max_error_rate_increase,
+    )
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print("No regressions")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Locust load profile for the backend API hot paths.
+
+Run against a live stack (see benchmarks/README.md):
+
+    BENCH_DEFINITION_ID=<workflow definition uuid> BENCH_TOKEN=<access token> \
+        locust -f benchmarks/load/locustfile.py --host http://localhost:8000 \
+        --headless -u 50 -r 10 -t 2m --csv benchmarks/results/load
+
+BENCH_TOKEN may be replaced by BENCH_EMAIL/BENCH_PASSWORD to log in instead.
+"""
+import os
+
+from locust import HttpUser, between, task
+
+API_PREFIX = "/api/v1"
+PAGE_SIZE = int(os.environ.get("BENCH_PAGE_SIZE", "25"))
+# Pages followed by next_cursor per list task, so deep pages are exercised too
+PAGES_PER_LIST = int(os.environ.get("BENCH_PAGES_PER_LIST", "3"))
+
+class ApiUser(HttpUser):
+    """An analyst browsing workflow instances and threat indicators."""
+
+    wait_time = between(0.1, 0.5)
+
+    def on_start(self):
+        token = os.environ.get("BENCH_TOKEN")
+        if not token:
+            response = self.client.post(
+                f"{API_PREFIX}/auth/login",
+                json={"email": os.environ["BENCH_EMAIL"], "password": os.environ["BENCH_PASSWORD"]},
+                name="auth/login",
+            )
+            response.raise_for_status()
+            token = response.json()["access_token"]
+        self.client.headers["Authorization"] = f"Bearer {token}"
+        self.definition_id = os.environ.get("BENCH_DEFINITION_ID")
+
+    def _walk(self, path: str, name: str, **params):
+        """GET up to PAGES_PER_LIST pages of a list endpoint."""
+        params["limit"] = PAGE_SIZE
+        for _ in range(PAGES_PER_LIST):
+            with self.client.get(path, params=params, name=name, catch_response=True) as response:
+                if response.status_code != 200:
+                    response.failure(f"HTTP {response.status_code}")
+                    return
+                cursor = response.json()["pagination"].get("next_cursor")
+            if not cursor:
+                return
+            params["cursor"] = cursor
+
+    @task(5)
+    def list_workflow_instances(self):
+        self._walk(f"{API_PREFIX}/operations/workflows/instances", "workflows/instances [list]")
+
+    @task(3)
+    def list_threat_indicators(self):
+        self._walk(f"{API_PREFIX}/security/threat-intelligence/indicators", "threat-intelligence/indicators [list]")
+
+    @task(1)
+    def create_workflow_instance(self):
+        if not self.definition_id:
+            return
+        self.client.post(
+            f"{API_PREFIX}/operations/workflows/instances",
+            json={"definition_id": self.definition_id, "initial_payload": {"source": "loadtest"}},
+            name="workflows/instances [create]",
+        )
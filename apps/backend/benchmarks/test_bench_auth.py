@@ -0,0 +1,63 @@
+"""
+Microbenchmarks for the per-request authentication and authorization path.
+"""
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.security.auth import get_current_principal, get_current_user
+from app.api.v1.security.user_permissions import PermissionChecker
+from app.core.permissions import permission_engine
+from app.core.redis.cache import local_cache
+from app.core.security import verify_token
+
+REQUIRED_PERMISSION = "bench:perm:42"
+
+def test_verify_token(benchmark, access_token):
+    payload = benchmark(verify_token, access_token)
+    assert payload["sub"]
+
+def test_get_current_user(benchmark, db, access_token):
+    user = benchmark(get_current_user, access_token, db)
+    assert user.email == "bench@grimos.local"
+
+def test_get_current_principal_from_claims(benchmark, loop, db, claims_token):
+    principal = benchmark(lambda: loop.run_until_complete(get_current_principal(claims_token, db)))
+    assert principal.permission_mask
+
+def test_permission_checker_database_user(benchmark, loop, db, access_token):
+    checker = PermissionChecker(REQUIRED_PERMISSION)
+    user = get_current_user(access_token, db)
+    assert benchmark(lambda: loop.run_until_complete(checker(user, db))) is user
+
+def test_permission_checker_claims_user(benchmark, loop, db, claims_token):
+    checker = PermissionChecker(REQUIRED_PERMISSION)
+    principal = loop.run_until_complete(get_current_principal(claims_token, db))
+    assert benchmark(lambda: loop.run_until_complete(checker(principal, db))) is principal
+
+def test_permission_mask_check(benchmark, loop, db, claims_token):
+    principal = loop.run_until_complete(get_current_principal(claims_token, db))
+    required = [REQUIRED_PERMISSION, "bench:perm:7"]
+    assert benchmark(permission_engine.has_all, principal.permission_mask, required)
+
+def test_local_cache_hit(benchmark):
+    local_cache.set("bench:local", {"value": 1}, 60)
+    assert benchmark(local_cache.get, "bench:local") == {"value": 1}
+
+@pytest.fixture(scope="module")
+def protected_client(tables):
+    """A minimal app with one endpoint behind PermissionChecker."""
+    app = FastAPI()
+
+    @app.get("/protected")
+    async def protected(user=Depends(PermissionChecker(REQUIRED_PERMISSION))):
+        return {"id": user.id}
+
+    with TestClient(app) as client:
+        yield client
+
+@pytest.mark.parametrize("token_fixture", ["access_token", "claims_token"])
+def test_protected_request(benchmark, request, protected_client, token_fixture):
+    headers = {"Authorization": f"Bearer {request.getfixturevalue(token_fixture)}"}
+    response = benchmark(protected_client.get, "/protected", headers=headers)
+    assert response.status_code == 200
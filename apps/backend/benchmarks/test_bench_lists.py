@@ -0,0 +1,110 @@
+"""
+Benchmarks for the workflow instance and threat indicator list/create paths.
+
+These tables use PostgreSQL column types (UUID, JSONB, ARRAY), so the module
+only runs with BENCH_DATABASE_URL pointing at PostgreSQL.
+"""
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from conftest import IS_POSTGRES
+
+if not IS_POSTGRES:
+    pytest.skip("list benchmarks need BENCH_DATABASE_URL to point at PostgreSQL", allow_module_level=True)
+
+workflow = pytest.importorskip("app.repositories.workflow")
+threat_indicator = pytest.importorskip("app.repositories.threat_indicator")
+
+from app.db.session import Base, SessionLocal, engine
+from app.models.threat_indicator import ThreatIndicator
+from app.models.workflow import WorkflowDefinition, WorkflowInstance
+
+# Rows seeded per table; deep enough that OFFSET pagination shows its cost
+SEED_ROWS = 20000
+PAGE_SIZE = 25
+DEEP_OFFSET = SEED_ROWS - 100
+
+@pytest.fixture(scope="module")
+def seeded():
+    """Seed one workflow definition, its instances and threat indicators."""
+    tables = [WorkflowDefinition.__table__, WorkflowInstance.__table__, ThreatIndicator.__table__]
+    Base.metadata.create_all(engine, tables=tables)
+
+    definition_id = uuid.uuid4()
+    start = datetime.utcnow() - timedelta(days=30)
+    with engine.begin() as connection:
+        connection.execute(insert(WorkflowDefinition.__table__).values(
+            id=definition_id, name="bench", version=1, created_by=uuid.uuid4(),
+            created_at=start, updated_at=start,
+        ))
+        connection.execute(insert(WorkflowInstance.__table__), [
+            {
+                "id": uuid.uuid4(), "definition_id": definition_id, "status": ("pending", "running", "completed")[index % 3],
+                "payload": {}, "execution_log": [],
+                "created_at": start + timedelta(seconds=index), "updated_at": start + timedelta(seconds=index),
+            }
+            for index in range(SEED_ROWS)
+        ])
+        connection.execute(insert(ThreatIndicator.__table__), [
+            {
+                "id": uuid.uuid4(), "indicator_value": f"10.0.{index // 256 % 256}.{index % 256}",
+                "indicator_type": "ip", "source": "bench", "severity": "medium",
+                "last_seen": start + timedelta(seconds=index),
+                "created_at": start, "updated_at": start,
+            }
+            for index in range(SEED_ROWS)
+        ])
+
+    yield definition_id
+
+    Base.metadata.drop_all(engine, tables=list(reversed(tables)))
+
+@pytest.fixture
+def session(seeded):
+    session = SessionLocal()
+    yield session
+    session.close()
+
+def _deep_cursor(session, repository, **kwargs):
+    """Walk to a page near the end of the table and return its cursor."""
+    page = repository.get_page(session, limit=PAGE_SIZE, offset=DEEP_OFFSET - PAGE_SIZE, **kwargs)
+    return page.next_cursor
+
+def test_workflow_instance_create(benchmark, seeded, session):
+    repository = workflow.workflow_instance_repository
+    instance = benchmark(repository.create, session, definition_id=seeded, initial_payload={"bench": True})
+    assert instance.status == "pending"
+
+def test_workflow_instances_first_page(benchmark, seeded, session):
+    page = benchmark(workflow.workflow_instance_repository.get_page, session, limit=PAGE_SIZE)
+    assert len(page.items) == PAGE_SIZE
+
+def test_workflow_instances_deep_cursor(benchmark, seeded, session):
+    repository = workflow.workflow_instance_repository
+    cursor = _deep_cursor(session, repository)
+    page = benchmark(repository.get_page, session, limit=PAGE_SIZE, cursor=cursor)
+    assert len(page.items) == PAGE_SIZE
+
+def test_workflow_instances_deep_offset(benchmark, seeded, session):
+    repository = workflow.workflow_instance_repository
+    page = benchmark(repository.get_page, session, limit=PAGE_SIZE, offset=DEEP_OFFSET)
+    assert len(page.items) == PAGE_SIZE
+
+def test_workflow_instances_filtered_page(benchmark, seeded, session):
+    repository = workflow.workflow_instance_repository
+    page = benchmark(repository.get_page, session, limit=PAGE_SIZE, status="running")
+    assert all(item.status == "running" for item in page.items)
+
+def test_threat_indicators_deep_cursor(benchmark, seeded, session):
+    repository = threat_indicator.threat_indicator_repository
+    cursor = _deep_cursor(session, repository, sort_by="last_seen")
+    page = benchmark(repository.get_page, session, limit=PAGE_SIZE, cursor=cursor, sort_by="last_seen")
+    assert len(page.items) == PAGE_SIZE
+
+def test_threat_indicators_count(benchmark, seeded, session):
+    repository = threat_indicator.threat_indicator_repository
+    total, _ = benchmark(repository.approximate_count, session)
+    assert total >= SEED_ROWS
@@ -0,0 +1,7 @@
+"""
+Fixtures for the backend unit tests.
+
+Reuses the benchmark suite's setup: a throwaway SQLite database (or the one in
+BENCH_DATABASE_URL), an in-process fakeredis server and the RBAC fixture user.
+"""
+from benchmarks.conftest import *  # noqa: F401,F403
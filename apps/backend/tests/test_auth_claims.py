@@ -0,0 +1,80 @@
+"""
+Tests for authorization from the permission claims of access tokens.
+"""
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.security.auth import TokenUser, get_current_principal
+from app.api.v1.security.user_permissions import PermissionChecker
+from app.core import permissions
+from app.core.security import create_access_token, verify_token
+from app.db.models import Permission, Role, RolePermission, User
+
+PERMISSION = "claims:test:read"
+
+@pytest.fixture
+def claims_user(loop, db, monkeypatch):
+    """A user whose only role grants PERMISSION; removed afterwards."""
+    monkeypatch.setattr(permissions.settings, "JWT_PERMISSION_CLAIMS", True)
+    role = Role(name="claims_test_role")
+    permission = Permission(name=PERMISSION)
+    user = User(email="claims@grimos.local", hashed_password="!", first_name="Claims", last_name="User", roles=[role])
+    db.add_all([role, permission, user])
+    db.flush()
+    db.add(RolePermission(role_id=role.id, permission_id=permission.id))
+    db.commit()
+    # As after any RBAC mutation
+    loop.run_until_complete(permissions.permission_engine.invalidate())
+    yield user
+    db.query(RolePermission).filter(RolePermission.role_id == role.id).delete()
+    db.delete(user)
+    db.delete(permission)
+    db.delete(role)
+    db.commit()
+    loop.run_until_complete(permissions.permission_engine.invalidate())
+
+def _token(loop, db, user):
+    claims = loop.run_until_complete(permissions.permission_engine.build_claims(user, db))
+    return create_access_token({"sub": str(user.id)}, claims)
+
+def _check(loop, db, token):
+    principal = loop.run_until_complete(get_current_principal(token, db))
+    return loop.run_until_complete(PermissionChecker(PERMISSION)(principal, db))
+
+def test_current_claims_grant_permission_without_user_lookup(loop, db, claims_user):
+    token = _token(loop, db, claims_user)
+
+    principal = _check(loop, db, token)
+
+    assert isinstance(principal, TokenUser)
+    assert principal.role_names == ["claims_test_role"]
+    assert verify_token(token)["pep"] == permissions.permission_engine.generation
+
+def test_bumped_epoch_ignores_old_claims(loop, db, claims_user):
+    token = _token(loop, db, claims_user)
+
+    loop.run_until_complete(permissions.permission_engine.invalidate())
+
+    principal = loop.run_until_complete(get_current_principal(token, db))
+    assert isinstance(principal, User)
+    assert principal.id == claims_user.id
+
+def test_revoked_permission_rejects_old_token(loop, db, claims_user):
+    token = _token(loop, db, claims_user)
+    assert isinstance(_check(loop, db, token), TokenUser)
+
+    db.query(RolePermission).filter(RolePermission.role_id == claims_user.roles[0].id).delete()
+    db.commit()
+    loop.run_until_complete(permissions.permission_engine.invalidate())
+
+    with pytest.raises(HTTPException) as error:
+        _check(loop, db, token)
+    assert error.value.status_code == 403
+
+def test_tampered_or_partial_claims_are_not_trusted(loop, db, claims_user):
+    generation = loop.run_until_complete(permissions.permission_engine.current_generation())
+    # No epoch, and an epoch with a malformed mask, both fall back to the database
+    for claims in ({"rol": ["admin"], "prm": "ff"}, {"rol": ["admin"], "prm": "zz", "pep": generation}):
+        token = create_access_token({"sub": str(claims_user.id)}, claims)
+        principal = loop.run_until_complete(get_current_principal(token, db))
+        assert isinstance(principal, User)
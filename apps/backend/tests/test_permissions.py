@@ -0,0 +1,70 @@
+"""
+Tests for the compiled permission engine.
+"""
+import pytest
+
+from app.core.permissions import PermissionEngine
+from app.db.models import Permission, Role, RolePermission
+
+@pytest.fixture
+def rbac(db):
+    """A role granted two of three permissions; removed afterwards."""
+    role = Role(name="engine_test_role")
+    permissions = [Permission(name=f"engine:test:{index}") for index in range(3)]
+    db.add(role)
+    db.add_all(permissions)
+    db.flush()
+    db.add_all(RolePermission(role_id=role.id, permission_id=permission.id) for permission in permissions[:2])
+    db.commit()
+    yield role, permissions
+    db.query(RolePermission).filter(RolePermission.role_id == role.id).delete()
+    db.query(Permission).filter(Permission.id.in_([permission.id for permission in permissions])).delete()
+    db.delete(role)
+    db.commit()
+
+def test_granted_permissions_pass(db, rbac):
+    role, permissions = rbac
+    engine = PermissionEngine()
+    engine.rebuild(db, 1)
+    mask = engine.user_mask([role.id])
+
+    assert engine.has_all(mask, ["engine:test:0", "engine:test:1"])
+    assert engine.has_any(mask, ["engine:test:2", "engine:test:1"])
+    assert {"engine:test:0", "engine:test:1"} <= engine.permission_set(mask)
+
+def test_missing_and_unknown_permissions_fail(db, rbac):
+    role, permissions = rbac
+    engine = PermissionEngine()
+    engine.rebuild(db, 1)
+    mask = engine.user_mask([role.id])
+
+    assert not engine.has_all(mask, ["engine:test:0", "engine:test:2"])
+    assert not engine.has_any(mask, ["engine:test:2"])
+    assert not engine.has_all(mask, ["engine:test:unknown"])
+    assert engine.user_mask([]) == 0
+
+def test_revoked_permission_fails_after_invalidate(loop, db, rbac):
+    role, permissions = rbac
+    engine = PermissionEngine()
+    loop.run_until_complete(engine.ensure_current(db))
+    assert engine.has_all(engine.user_mask([role.id]), ["engine:test:1"])
+
+    db.query(RolePermission).filter(
+        RolePermission.role_id == role.id, RolePermission.permission_id == permissions[1].id
+    ).delete()
+    db.commit()
+    loop.run_until_complete(engine.invalidate())
+    loop.run_until_complete(engine.ensure_current(db))
+
+    mask = engine.user_mask([role.id])
+    assert not engine.has_all(mask, ["engine:test:1"])
+    assert engine.has_all(mask, ["engine:test:0"])
+
+def test_engines_compile_the_same_bits(db, rbac):
+    # Pods compiling the same tables must agree on bits, since masks travel in tokens
+    first, second = PermissionEngine(), PermissionEngine()
+    first.rebuild(db, 1)
+    second.rebuild(db, 1)
+
+    assert first.permission_bits == second.permission_bits
+    assert sorted(first.permission_bits.values()) == [1 << index for index in range(len(first.permission_bits))]
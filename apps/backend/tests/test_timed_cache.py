@@ -0,0 +1,43 @@
+"""
+Tests for the timed cache and the repositories that use it.
+"""
+from app.core.redis.timed_cache import TimedCache
+from app.db.models import User
+from app.repositories import role_repository, user_repository
+from app.repositories.role_repository import RoleRepository
+from app.repositories.user_repository import UserRepository
+
+def test_get_or_set_calls_loader_once(loop):
+    cache = TimedCache("test_loader_once", 300, 3600)
+    calls = []
+
+    def load():
+        calls.append(1)
+        return ["a", "b"]
+
+    assert loop.run_until_complete(cache.get_or_set("key", load)) == ["a", "b"]
+    assert loop.run_until_complete(cache.get_or_set("key", load)) == ["a", "b"]
+    assert len(calls) == 1
+
+def _no_session():
+    raise AssertionError("served from the database instead of the cache")
+
+def test_role_permissions_are_cached(loop, db, bench_user, monkeypatch):
+    role_id = db.get(User, bench_user).roles[0].id
+    repository = RoleRepository(db)
+    repository.permissions_cache.invalidate(f"role:{role_id}:permissions")
+
+    names = loop.run_until_complete(repository.get_role_permissions(role_id))
+    assert "bench:perm:42" in names
+
+    monkeypatch.setattr(role_repository, "AsyncSessionLocal", _no_session)
+    assert loop.run_until_complete(repository.get_role_permissions(role_id)) == names
+
+def test_users_with_role_are_cached(loop, db, bench_user, monkeypatch):
+    repository = UserRepository(db)
+    repository.role_cache.invalidate("users_with_role:bench_analyst")
+
+    assert loop.run_until_complete(repository.get_users_with_role("bench_analyst")) == [bench_user]
+
+    monkeypatch.setattr(user_repository, "AsyncSessionLocal", _no_session)
+    assert loop.run_until_complete(repository.get_users_with_role("bench_analyst")) == [bench_user]
@@ -1,5 +1,4 @@
 """Async Kafka producer using aiokafka."""
-import json
 import logging
 import asyncio
 from datetime import datetime
@@ -9,6 +8,7 @@ from aiokafka import AIOKafkaProducer
 from aiokafka.errors import KafkaError
 from pydantic import BaseModel
 
+from app.core.avro import serialize_event
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -36,7 +36,6 @@ async def get_producer() -> AIOKafkaProducer:
                 max_batch_size=16384,     # 16KB batch size
                 linger_ms=5,              # 5ms linger
                 compression_type="gzip",  # Compress messages
-                value_serializer=lambda v: json.dumps(v).encode('utf-8'),
                 key_serializer=lambda k: k.encode('utf-8') if k else None,
                 retry_backoff_ms=100,     # 100ms between retries
                 delivery_timeout_ms=30000, # 30s timeout
@@ -66,7 +65,8 @@ async def publish_event(
     topic: str, 
     key: str, 
     data: Dict[str, Any] | BaseModel, 
-    headers: Optional[List[tuple]] = None
+    headers: Optional[List[tuple]] = None,
+    schema: Optional[str] = None
 ) -> bool:
     """Publish an event to Kafka.
     
@@ -75,6 +75,7 @@ async def publish_event(
         key: Message key
         data: Message data (dict or Pydantic model)
         headers: Optional message headers
+        schema: Avro schema subject used when KAFKA_EVENT_ENCODING is "avro"
         
     Returns:
         bool: True if message was published, False otherwise
@@ -92,7 +93,7 @@ async def publish_event(
         
         # Convert data to dict if it's a Pydantic model
         if isinstance(data, BaseModel):
-            value = data.model_dump()
+            value = data.model_dump(mode="json")
         else:
             value = data
         
@@ -100,7 +101,7 @@ async def publish_event(
         await producer.send_and_wait(
             topic=topic,
             key=key,
-            value=value,
+            value=serialize_event(value, schema),
             headers=headers
         )
         
@@ -153,7 +154,8 @@ async def publish_user_event(
         topic=settings.KAFKA_USER_EVENTS_TOPIC,
         key=user_id,
         data=event,
-        headers=headers
+        headers=headers,
+        schema="user_event"
     )
 
 
@@ -0,0 +1,103 @@
+"""Avro binary encoding for Kafka events with schema-registry-style IDs."""
+import io
+import json
+import logging
+import os
+import struct
+from typing import Any, Dict, Optional, Tuple
+
+import fastavro
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Local registry; a copy of the event consumer's app/schemas registry and must stay in sync
+AVRO_SCHEMAS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "schemas", "avro")
+REGISTRY_FILE = os.path.join(AVRO_SCHEMAS_DIR, "registry.json")
+
+# Avro wire format: magic byte, big-endian schema ID, then the Avro binary body
+AVRO_MAGIC_BYTE = 0
+AVRO_HEADER = struct.Struct(">bI")
+
+
+class SchemaRegistry:
+    """Local, file-backed registry of Avro schemas used to encode events.
+    
+    ``registry.json`` lists every schema version as ``{"id", "subject", "file"}``;
+    events are always written with the highest ID of their subject.
+    """
+    
+    def __init__(self, registry_file: str = REGISTRY_FILE):
+        """Initialize schema registry.
+        
+        Args:
+            registry_file: Path to the registry file
+        """
+        self._latest: Dict[str, Tuple[int, Any]] = {}
+        self._load(registry_file)
+    
+    def _load(self, registry_file: str) -> None:
+        """Load and parse the latest schema of every subject in the registry file."""
+        if not os.path.exists(registry_file):
+            logger.warning(f"Schema registry file not found: {registry_file}")
+            return
+        
+        with open(registry_file, "r") as f:
+            entries = json.load(f)["schemas"]
+        
+        for entry in entries:
+            schema_id = int(entry["id"])
+            subject = entry["subject"]
+            if schema_id <= self._latest.get(subject, (-1, None))[0]:
+                continue
+            
+            with open(os.path.join(AVRO_SCHEMAS_DIR, entry["file"]), "r") as f:
+                self._latest[subject] = (schema_id, fastavro.parse_schema(json.load(f)))
+    
+    def encode(self, subject: str, record: Dict[str, Any]) -> bytes:
+        """Encode a record with the latest schema of its subject.
+        
+        Args:
+            subject: Schema subject, e.g. "user_event"
+            record: Record to encode
+        
+        Returns:
+            bytes: Header with the schema ID followed by the Avro binary body
+        
+        Raises:
+            KeyError: If the subject is not registered
+            ValueError: If the record does not match the schema
+        """
+        schema_id, schema = self._latest[subject]
+        buffer = io.BytesIO()
+        buffer.write(AVRO_HEADER.pack(AVRO_MAGIC_BYTE, schema_id))
+        fastavro.schemaless_writer(buffer, schema, record)
+        return buffer.getvalue()
+
+
+# Global schema registry instance
+registry = SchemaRegistry()
+
+
+def serialize_event(data: Dict[str, Any], schema: Optional[str] = None) -> bytes:
+    """Serialize an event in the configured wire format.
+    
+    Events are Avro-encoded when KAFKA_EVENT_ENCODING is "avro" and a schema subject
+    is given. Anything that cannot be encoded falls back to JSON, which consumers
+    keep accepting during the rollout.
+    
+    Args:
+        data: Event payload
+        schema: Schema subject of the event, or None for schemaless events
+    
+    Returns:
+        bytes: Serialized event
+    """
+    if schema and settings.KAFKA_EVENT_ENCODING == "avro":
+        try:
+            return registry.encode(schema, data)
+        except Exception as e:
+            logger.warning(f"Failed to Avro-encode {schema} event, falling back to JSON: {e}")
+    
+    return json.dumps(data).encode('utf-8')
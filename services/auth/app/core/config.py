@@ -51,6 +51,8 @@ class Settings(BaseSettings):
     KAFKA_BOOTSTRAP_SERVERS: str = "kafka:9092"
     KAFKA_USER_EVENTS_TOPIC: str = "user-events"
     KAFKA_ENABLED: bool = True
+    # Wire format for events with a registered Avro schema; consumers accept both
+    KAFKA_EVENT_ENCODING: Literal["json", "avro"] = "json"
     
     # gRPC settings
     GRPC_SERVER_HOST: str = "0.0.0.0"
@@ -1,5 +1,4 @@
 """Kafka producer for auth service."""
-import json
 import logging
 import time
 from datetime import datetime
@@ -8,6 +7,7 @@ from typing import Any, Dict, Optional, Union, List
 from confluent_kafka import Producer, KafkaError, KafkaException
 from pydantic import BaseModel, ValidationError
 
+from app.core.avro import serialize_event
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -120,7 +120,7 @@ def validate_message(event_type: str, data: Dict[str, Any]) -> None:
 
 
 def publish_event(topic: str, key: str, data: Dict[str, Any] | BaseModel, 
-                  max_retries: int = 3, validation: bool = True) -> bool:
+                  max_retries: int = 3, validation: bool = True, schema: Optional[str] = None) -> bool:
     """Publish an event to Kafka with retry logic.
     
     Args:
@@ -129,6 +129,7 @@ def publish_event(topic: str, key: str, data: Dict[str, Any] | BaseModel,
         data: Message data (dict or Pydantic model)
         max_retries: Maximum number of retries
         validation: Whether to validate the message against its schema
+        schema: Avro schema subject used when KAFKA_EVENT_ENCODING is "avro"
         
     Returns:
         bool: True if message was published, False otherwise
@@ -143,11 +144,10 @@ def publish_event(topic: str, key: str, data: Dict[str, Any] | BaseModel,
     
     # Extract data from Pydantic model if needed
     if isinstance(data, BaseModel):
-        data_dict = data.model_dump()
-        value = data.model_dump_json()
+        data_dict = data.model_dump(mode="json")
     else:
         data_dict = data
-        value = json.dumps(data)
+    value = serialize_event(data_dict, schema)
     
     # Validate message against schema if requested
     if validation:
@@ -167,7 +167,7 @@ def publish_event(topic: str, key: str, data: Dict[str, Any] | BaseModel,
             producer.produce(
                 topic=topic,
                 key=key.encode('utf-8') if key else None,
-                value=value.encode('utf-8'),
+                value=value,
                 timestamp=int(datetime.now().timestamp() * 1000),  # Add timestamp in milliseconds
                 callback=delivery_report
             )
@@ -229,5 +229,6 @@ def publish_user_event(event_type: str, user_id: str, user_data: Dict[str, Any]
     return publish_event(
         topic=settings.KAFKA_USER_EVENTS_TOPIC,
         key=user_id,
-        data=event
+        data=event,
+        schema="user_event"
     )
\ No newline at end of file
@@ -19,6 +19,36 @@ class Settings(BaseSettings):
     KAFKA_GROUP_ID: str = "user-events-consumer"
     KAFKA_AUTO_OFFSET_RESET: str = "earliest"
     
+    # Batch processing settings
+    CONSUMER_BATCH_MODE: bool = False
+    CONSUMER_BATCH_SIZE: int = 500
+    CONSUMER_BATCH_LINGER_MS: int = 100
+    CONSUMER_COMMIT_INTERVAL_MS: int = 1000
+    
+    # Validate raw message bytes in a single pass with a compiled Pydantic validator
+    # instead of json.loads + Avro check + model construction
+    CONSUMER_FAST_VALIDATION: bool = True
+    
+    # Worker pool settings; 0 threads runs handlers inline on the poll thread
+    CONSUMER_WORKER_THREADS: int = 0
+    CONSUMER_WORKER_QUEUE_SIZE: int = 1000
+    
+    # Retry settings; each distinct backoff gets its own <topic>.retry.<delay> topic
+    CONSUMER_RETRY_MAX_RETRIES: int = 3
+    CONSUMER_RETRY_INITIAL_BACKOFF_MS: int = 1000
+    CONSUMER_RETRY_MAX_BACKOFF_MS: int = 60000
+    CONSUMER_RETRY_BACKOFF_MULTIPLIER: float = 10.0
+    
+    # Statistics settings
+    STATS_WINDOW_SECONDS: float = 60.0
+    STATS_RESERVOIR_SIZE: int = 4096
+    LAG_REFRESH_INTERVAL_MS: int = 5000
+    
+    # Dead letter queue settings; an empty storage dir keeps entries in memory only
+    DLQ_MAX_SIZE: int = 1000
+    DLQ_STORAGE_DIR: str = ""
+    DLQ_REPLAY_MAX_RATE: float = 50.0
+    
     # Service settings
     LOG_LEVEL: str = "INFO"
     ENVIRONMENT: Literal["local", "staging", "production"] = "local"
@@ -2,67 +2,48 @@
 import json
 import logging
 import time
-import threading
+from collections import deque
 from datetime import datetime, timedelta
 from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
-from confluent_kafka import Consumer, KafkaError, KafkaException
+from confluent_kafka import Consumer, KafkaError, KafkaException, Producer, TopicPartition
 from pydantic import ValidationError
 
 from app.config import settings
+from app.dead_letter import DeadLetterQueue, ReplayMessage
+from app.dispatch import KeyedWorkerPool, OffsetTracker
 from app.schemas import EventProcessingResult, EventProcessingStatistics, EventType, UserEvent
-from app.schema_validator import validator
+from app.schema_validator import registry, validator
+from app.statistics import RollingWindow
 import app.metrics as metrics
 
 logger = logging.getLogger(__name__)
 
+USER_EVENT_SCHEMA = "user_event"
 
-class DeadLetterQueue:
-    """Simple in-memory dead letter queue for failed messages."""
-    
-    def __init__(self, max_size: int = 1000):
-        """Initialize dead letter queue.
-        
-        Args:
-            max_size: Maximum size of the queue
-        """
-        self.queue = []
-        self.max_size = max_size
-        self.lock = threading.Lock()
-      def add(self, message: Dict[str, Any], error: str):
-        """Add a message to the dead letter queue.
-        
-        Args:
-            message: Message to add
-            error: Error message
-        """
-        with self.lock:
-            self.queue.append({
-                "message": message,
-                "error": error,
-                "timestamp": datetime.now().isoformat()
-            })
-            
-            # Trim queue if it exceeds max size
-            if len(self.queue) > self.max_size:
-                self.queue = self.queue[-self.max_size:]
-            
-            # Update metrics
-            metrics.update_dlq_size(len(self.queue))
+# Headers carried by messages re-produced to retry and dead letter topics
+RETRY_COUNT_HEADER = "x-retry-count"
+RETRY_DUE_HEADER = "x-retry-due-ms"
+ORIGINAL_TOPIC_HEADER = "x-original-topic"
+ORIGINAL_PARTITION_HEADER = "x-original-partition"
+ORIGINAL_OFFSET_HEADER = "x-original-offset"
+ERROR_HEADER = "x-error"
+
+
+def get_header(msg, name: str) -> Optional[str]:
+    """Get a decoded header value from a Kafka message.
     
-    def get_all(self) -> List[Dict[str, Any]]:
-        """Get all messages in the queue.
+    Args:
+        msg: Kafka message
+        name: Header name
         
-        Returns:
-            List of messages
-        """
-        with self.lock:
-            return list(self.queue)
-    
-    def clear(self):
-        """Clear the queue."""
-        with self.lock:
-            self.queue = []
+    Returns:
+        Optional[str]: Header value or None if not present
+    """
+    for key, value in msg.headers() or []:
+        if key == name and value is not None:
+            return value.decode('utf-8')
+    return None
 
 
 class RetryPolicy:
@@ -97,28 +78,113 @@ class RetryPolicy:
             self.max_backoff_ms
         )
         return backoff_ms / 1000  # Convert to seconds
+    
+    def get_retry_topic(self, topic: str, retry_count: int) -> str:
+        """Get the retry tier topic for a retry attempt.
+        
+        Each distinct backoff time maps to its own topic, e.g. ``user-events.retry.1s``,
+        so messages within a tier become due in the order they were produced.
+        
+        Args:
+            topic: Original topic of the message
+            retry_count: Retry attempt count (0-based)
+            
+        Returns:
+            Retry topic name
+        """
+        backoff_ms = int(round(self.get_backoff_time(retry_count) * 1000))
+        if backoff_ms % 1000 == 0:
+            return f"{topic}.retry.{backoff_ms // 1000}s"
+        return f"{topic}.retry.{backoff_ms}ms"
+    
+    def get_retry_topics(self, topic: str) -> List[str]:
+        """Get all retry tier topics for a topic.
+        
+        Args:
+            topic: Original topic
+            
+        Returns:
+            Retry topic names in tier order
+        """
+        topics = []
+        for retry_count in range(self.max_retries):
+            retry_topic = self.get_retry_topic(topic, retry_count)
+            if retry_topic not in topics:
+                topics.append(retry_topic)
+        return topics
+    
+    def get_dead_letter_topic(self, topic: str) -> str:
+        """Get the dead letter topic for a topic.
+        
+        Args:
+            topic: Original topic
+            
+        Returns:
+            Dead letter topic name
+        """
+        return f"{topic}.dlq"
 
 
 class KafkaEventConsumer:
     """Kafka consumer for processing events."""
     
-    def __init__(self, topics: List[str], group_id: str):
+    def __init__(self, topics: List[str], group_id: str, batch_mode: Optional[bool] = None):
         """Initialize Kafka consumer.
         
         Args:
             topics: List of topics to subscribe to
             group_id: Consumer group ID
+            batch_mode: Consume messages in batches instead of one at a time.
+                Defaults to the CONSUMER_BATCH_MODE setting.
         """
         self.topics = topics
         self.group_id = group_id
         self.running = False
         self.consumer = None
         self.event_handlers = {}
-        self.retry_policy = RetryPolicy()
-        self.dead_letter_queue = DeadLetterQueue()
+        self.retry_policy = RetryPolicy(
+            max_retries=settings.CONSUMER_RETRY_MAX_RETRIES,
+            initial_backoff_ms=settings.CONSUMER_RETRY_INITIAL_BACKOFF_MS,
+            max_backoff_ms=settings.CONSUMER_RETRY_MAX_BACKOFF_MS,
+            backoff_multiplier=settings.CONSUMER_RETRY_BACKOFF_MULTIPLIER,
+        )
+        self.producer = None  # Re-produces failed messages to retry and dead letter topics
+        self.dead_letter_queue = DeadLetterQueue(
+            max_size=settings.DLQ_MAX_SIZE,
+            storage_dir=settings.DLQ_STORAGE_DIR or None,
+        )
         self.stats = EventProcessingStatistics()
         self.processing_errors: Set[str] = set()  # Track message IDs with errors
         
+        # Rolling-window latency statistics and partition lag
+        self.processing_window = RollingWindow(settings.STATS_WINDOW_SECONDS, settings.STATS_RESERVOIR_SIZE)
+        self.commit_window = RollingWindow(settings.STATS_WINDOW_SECONDS, settings.STATS_RESERVOIR_SIZE)
+        self.lag_refresh_interval = settings.LAG_REFRESH_INTERVAL_MS / 1000
+        self._partition_lag: Dict[Tuple[str, int], int] = {}
+        self._last_lag_refresh = 0.0
+        # Start times of asynchronous commits awaiting their on_commit callback, oldest first
+        self._async_commit_starts: deque = deque()
+        
+        # Single-pass validation of the raw message bytes with a compiled validator
+        self.fast_validation = settings.CONSUMER_FAST_VALIDATION
+        validator.register_model(USER_EVENT_SCHEMA, UserEvent)
+        
+        # Batch processing settings
+        self.batch_mode = settings.CONSUMER_BATCH_MODE if batch_mode is None else batch_mode
+        self.batch_size = settings.CONSUMER_BATCH_SIZE
+        self.batch_linger = settings.CONSUMER_BATCH_LINGER_MS / 1000
+        self.commit_interval = settings.CONSUMER_COMMIT_INTERVAL_MS / 1000
+        self._pending_offsets: Dict[Tuple[str, int], int] = {}  # Next offset to commit per partition
+        self._last_commit_time = time.monotonic()
+        
+        # Concurrent dispatch; handlers run inline on the poll thread when disabled
+        self.worker_pool: Optional[KeyedWorkerPool] = None
+        self.offset_tracker = OffsetTracker()
+        if settings.CONSUMER_WORKER_THREADS > 0:
+            self.worker_pool = KeyedWorkerPool(
+                settings.CONSUMER_WORKER_THREADS, settings.CONSUMER_WORKER_QUEUE_SIZE
+            )
+        
         # Configure consumer
         self.config = {
             'bootstrap.servers': settings.KAFKA_BOOTSTRAP_SERVERS,
@@ -130,14 +196,15 @@ class KafkaEventConsumer:
             'max.poll.interval.ms': 300000,  # 5 minutes
             'fetch.min.bytes': 1,          # Get messages as soon as they're available
             'fetch.max.wait.ms': 500,      # Wait up to 500ms for min.bytes
+            'on_commit': self._on_commit,  # Completes asynchronous commits; timed for commit latency
         }
         
-    def register_handler(self, event_type: str, handler: Callable[[Dict[str, Any]], EventProcessingResult]):
+    def register_handler(self, event_type: str, handler: Callable[[UserEvent], EventProcessingResult]):
         """Register a handler for a specific event type.
         
         Args:
             event_type: Event type to handle
-            handler: Handler function
+            handler: Handler function, called with the validated event
         """
         self.event_handlers[event_type] = handler
         logger.info(f"Registered handler for event type: {event_type}")
@@ -148,108 +215,437 @@ class KafkaEventConsumer:
         Returns:
             EventProcessingStatistics: Event processing statistics
         """
+        processing = self.processing_window.snapshot()
+        commits = self.commit_window.snapshot()
+        metrics.update_processing_window(processing)
+        
+        self.stats.window_seconds = self.processing_window.window_seconds
+        self.stats.processing_time_ms_avg = processing["avg"]
+        self.stats.processing_time_ms_p50 = processing["p50"]
+        self.stats.processing_time_ms_p95 = processing["p95"]
+        self.stats.processing_time_ms_p99 = processing["p99"]
+        self.stats.processing_time_ms_max = processing["max"]
+        self.stats.commit_latency_ms_p50 = commits["p50"]
+        self.stats.commit_latency_ms_p99 = commits["p99"]
+        self.stats.partition_lag = {
+            f"{topic}/{partition}": lag for (topic, partition), lag in self._partition_lag.items()
+        }
         return self.stats
     
-    def get_dead_letter_queue(self) -> List[Dict[str, Any]]:
-        """Get messages in the dead letter queue.
+    def get_dead_letter_queue(self, after_id: int = 0,
+                              limit: int = 100) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Get a page of messages in the dead letter queue.
+        
+        Args:
+            after_id: Only return messages with an id greater than this
+            limit: Maximum number of messages to return
+            
+        Returns:
+            List of messages and the cursor for the next page
+        """
+        return self.dead_letter_queue.get_page(after_id, limit)
+    
+    def replay_dead_letters(self, entries: List[Dict[str, Any]], max_rate: float,
+                            remove: bool = True) -> int:
+        """Re-inject dead letter entries into the handler pipeline at a bounded rate.
         
+        Replayed messages go through the same decoding, validation and dispatch as
+        consumed messages. An entry that fails again is kept and its error and attempt
+        count are updated; one that is scheduled for retry is handed to the retry topic,
+        which dead-letters it again if the retries fail.
+        
+        Args:
+            entries: Dead letter queue entries to replay
+            max_rate: Maximum number of messages replayed per second
+            remove: Remove entries from the dead letter queue once they are replayed successfully
+                or handed to a retry topic
+            
         Returns:
-            List of messages
+            int: Number of messages handled successfully
         """
-        return self.dead_letter_queue.get_all()
-      def start(self):
+        interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        next_send = time.monotonic()
+        succeeded = 0
+        handled: List[int] = []
+        
+        try:
+            for entry in entries:
+                delay = next_send - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                next_send = max(next_send, time.monotonic() - interval) + interval
+                
+                message = ReplayMessage(entry)
+                if self._process_message(message):
+                    succeeded += 1
+                    handled.append(entry["id"])
+                elif message.retry_scheduled:
+                    handled.append(entry["id"])
+        finally:
+            # Also runs if the replay is interrupted, so replayed entries are not replayed twice
+            if remove:
+                self.dead_letter_queue.remove(handled)
+            self.flush_producer()
+        
+        logger.info(f"Replayed {len(entries)} dead letter messages, {succeeded} succeeded")
+        return succeeded
+    
+    def get_producer(self) -> Producer:
+        """Get the producer used for retry and dead letter topics, creating it if needed.
+        
+        Returns:
+            Producer: Kafka producer
+        """
+        if self.producer is None:
+            self.producer = Producer({
+                'bootstrap.servers': settings.KAFKA_BOOTSTRAP_SERVERS,
+                'enable.idempotence': True,
+                'linger.ms': 5,
+            })
+        return self.producer
+    
+    def start(self):
         """Start consuming messages."""
         try:
             # Initialize consumer
+            self.get_producer()
             self.consumer = Consumer(self.config)
-            self.consumer.subscribe(self.topics)
+            self.consumer.subscribe(self.topics, on_revoke=self._on_revoke)
             logger.info(f"Subscribed to topics: {self.topics}")
             
             self.running = True
             # Update metrics
             metrics.set_consumer_status(True)
-            logger.info("Kafka consumer started")
+            logger.info(f"Kafka consumer started ({'batch' if self.batch_mode else 'single message'} mode)")
             
-            # Track processing time
-            processing_start = None
-            
-            while self.running:
-                try:
-                    # Poll for messages
-                    msg = self.consumer.poll(timeout=1.0)
-                    
-                    if msg is None:
-                        continue
-                    
-                    if msg.error():
-                        if msg.error().code() == KafkaError._PARTITION_EOF:
-                            # End of partition event - not an error
-                            logger.debug(f"Reached end of partition: {msg.topic()}/{msg.partition()}")
-                        else:
-                            # Error
-                            logger.error(f"Consumer error: {msg.error()}")
-                        continue
-                      # Start timing message processing
-                    processing_start = time.time()
-                    
-                    # Process message
-                    result = self._process_message(msg)
-                    
-                    # Update processing time statistics
-                    if processing_start:
-                        processing_time_ms = (time.time() - processing_start) * 1000
-                        # Update average processing time
-                        if self.stats.total_processed > 0:
-                            self.stats.processing_time_ms_avg = (
-                                (self.stats.processing_time_ms_avg * (self.stats.total_processed - 1) + processing_time_ms) 
-                                / self.stats.total_processed
-                            )
-                        else:
-                            self.stats.processing_time_ms_avg = processing_time_ms
-                    
-                    # Only commit offset if processing was successful or we've decided not to retry
-                    if result or not getattr(msg, '_should_retry', False):
-                        self.consumer.commit(msg)
-                
-                except KafkaException as e:
-                    logger.error(f"Kafka exception: {e}")
-                except Exception as e:
-                    logger.exception(f"Unexpected error while consuming messages: {e}")
-                    
-                # Brief pause to prevent CPU spinning in case of continuous errors
-                if len(self.processing_errors) > 10:
-                    logger.warning(f"High error rate detected ({len(self.processing_errors)} errors), pausing briefly")
-                    time.sleep(0.5)
-                    self.processing_errors.clear()
+            # Handlers complete asynchronously in the worker pool, so offsets are
+            # committed on the batch commit interval rather than per message
+            if self.worker_pool is not None:
+                self.worker_pool.start()
+                self._consume_batches()
+            elif self.batch_mode:
+                self._consume_batches()
+            else:
+                self._consume_messages()
         
         except Exception as e:
             logger.exception(f"Failed to start consumer: {e}")
         finally:
             self.stop()
-      def stop(self):
+    
+    def _consume_messages(self):
+        """Poll and process messages one at a time, committing after each."""
+        # Track processing time
+        processing_start = None
+        
+        while self.running:
+            try:
+                # Poll for messages
+                msg = self.consumer.poll(timeout=1.0)
+                
+                # Refreshed on empty polls too, so lag stays current while idle
+                self._maybe_refresh_lag()
+                
+                if msg is None:
+                    continue
+                
+                if msg.error():
+                    self._log_message_error(msg)
+                    continue
+                
+                # Start timing message processing
+                processing_start = time.perf_counter()
+                
+                # Process message
+                self._process_message(msg)
+                
+                # Update processing time statistics
+                if processing_start:
+                    self._update_processing_time((time.perf_counter() - processing_start) * 1000)
+                
+                # Failed messages have been handed to a retry or dead letter topic,
+                # so the offset can be committed either way
+                self.flush_producer()
+                self._async_commit_starts.append(time.perf_counter())
+                self.consumer.commit(msg)
+            
+            except KafkaException as e:
+                logger.error(f"Kafka exception: {e}")
+            except Exception as e:
+                logger.exception(f"Unexpected error while consuming messages: {e}")
+                
+            self._throttle_on_errors()
+    
+    def _consume_batches(self):
+        """Consume messages in batches, committing offsets once per interval per partition."""
+        while self.running:
+            try:
+                # Wait up to the linger time for a full batch
+                msgs = self.consumer.consume(num_messages=self.batch_size, timeout=self.batch_linger)
+                
+                if msgs:
+                    self._process_batch(msgs)
+                
+                if time.monotonic() - self._last_commit_time >= self.commit_interval:
+                    self._commit_pending_offsets()
+                
+                self._maybe_refresh_lag()
+            
+            except KafkaException as e:
+                logger.error(f"Kafka exception: {e}")
+            except Exception as e:
+                logger.exception(f"Unexpected error while consuming messages: {e}")
+            
+            self._throttle_on_errors()
+    
+    def _process_batch(self, msgs: List[Any]):
+        """Decode, validate and dispatch a batch of messages.
+        
+        Args:
+            msgs: Messages returned by Consumer.consume()
+        """
+        batch_start = time.perf_counter()
+        
+        # Decode and validate the whole batch before running any handler
+        decoded = []
+        for msg in msgs:
+            if msg.error():
+                self._log_message_error(msg)
+                continue
+            
+            decoded.append((msg, self._decode_message(msg)))
+        
+        # Each message's processing time is its share of decoding plus its own dispatch
+        decode_ms = (time.perf_counter() - batch_start) * 1000 / len(decoded) if decoded else 0.0
+        
+        for msg, event in decoded:
+            if self.worker_pool is not None:
+                self._submit_event(msg, event)
+                continue
+            
+            if event is not None:
+                dispatch_start = time.perf_counter()
+                event_type, parsed_event, value = event
+                self._dispatch_event(msg, event_type, parsed_event, value)
+                self._update_processing_time(decode_ms + (time.perf_counter() - dispatch_start) * 1000)
+            
+            # Failed messages have already been dead-lettered, so the offset advances either way
+            self._pending_offsets[(msg.topic(), msg.partition())] = msg.offset() + 1
+        
+        metrics.record_batch(len(decoded), time.perf_counter() - batch_start)
+    
+    def _submit_event(self, msg, event: Optional[Tuple[str, UserEvent, Optional[Dict[str, Any]]]]):
+        """Hand a decoded message to the worker pool, keyed by user so per-user order is kept.
+        
+        Args:
+            msg: Kafka message
+            event: Result of _decode_message, or None if the message was rejected
+        """
+        self.offset_tracker.track(msg.topic(), msg.partition(), msg.offset())
+        if event is None:
+            self.offset_tracker.complete(msg.topic(), msg.partition(), msg.offset())
+            return
+        
+        key = msg.key() or event[1].user_id
+        self.worker_pool.submit(key, self._run_event, msg, event)
+    
+    def _run_event(self, msg, event: Tuple[str, UserEvent, Optional[Dict[str, Any]]]):
+        """Dispatch an event on a worker thread and mark its offset complete.
+        
+        Args:
+            msg: Kafka message
+            event: Event type, parsed event and raw value
+        """
+        start = time.perf_counter()
+        try:
+            event_type, parsed_event, value = event
+            self._dispatch_event(msg, event_type, parsed_event, value)
+        finally:
+            self.offset_tracker.complete(msg.topic(), msg.partition(), msg.offset())
+            self._update_processing_time((time.perf_counter() - start) * 1000)
+    
+    def _commit_pending_offsets(self):
+        """Commit the highest processed offset of every partition touched since the last commit."""
+        self._last_commit_time = time.monotonic()
+        if self.worker_pool is not None:
+            # Only offsets below the lowest in-flight message of each partition are safe
+            self._pending_offsets.update(self.offset_tracker.pop_committable())
+        if not self._pending_offsets or not self.consumer:
+            return
+        
+        # Retried messages must be durable before the offsets that skip them are committed
+        self.flush_producer()
+        
+        offsets = [
+            TopicPartition(topic, partition, offset)
+            for (topic, partition), offset in self._pending_offsets.items()
+        ]
+        commit_start = time.perf_counter()
+        self.consumer.commit(offsets=offsets, asynchronous=False)
+        commit_duration = time.perf_counter() - commit_start
+        self.commit_window.record(commit_duration * 1000)
+        metrics.observe_commit_latency(commit_duration)
+        self._pending_offsets.clear()
+        logger.debug(f"Committed offsets for {len(offsets)} partitions")
+    
+    def _on_commit(self, err, partitions):
+        """Record the latency of an asynchronous commit when the broker acknowledges it.
+        
+        Called from poll() on the consuming thread. Commits complete in the order
+        they were issued; synchronous commits are timed where they are made and
+        have no start time queued here.
+        
+        Args:
+            err: Commit error, or None on success
+            partitions: Partitions whose offsets were committed
+        """
+        if not self._async_commit_starts:
+            return
+        commit_duration = time.perf_counter() - self._async_commit_starts.popleft()
+        if err is not None:
+            logger.warning(f"Offset commit failed: {err}")
+            return
+        self.commit_window.record(commit_duration * 1000)
+        metrics.observe_commit_latency(commit_duration)
+    
+    def _maybe_refresh_lag(self):
+        """Recompute per-partition lag and window percentile gauges once per refresh interval.
+        
+        Uses the watermarks cached from fetch responses, so no broker request is made.
+        """
+        now = time.monotonic()
+        if now - self._last_lag_refresh < self.lag_refresh_interval:
+            return
+        self._last_lag_refresh = now
+        metrics.update_processing_window(self.processing_window.snapshot())
+        
+        for partition in self.consumer.position(self.consumer.assignment()):
+            if partition.offset < 0:
+                # No position yet (OFFSET_INVALID)
+                continue
+            
+            low, high = self.consumer.get_watermark_offsets(partition, cached=True)
+            if high < 0:
+                continue
+            
+            lag = max(high - partition.offset, 0)
+            self._partition_lag[(partition.topic, partition.partition)] = lag
+            metrics.update_partition_lag(partition.topic, partition.partition, lag)
+    
+    def _on_revoke(self, consumer, partitions):
+        """Flush pending offsets before partitions are reassigned.
+        
+        Args:
+            consumer: Kafka consumer
+            partitions: Partitions being revoked
+        """
+        revoked = [(partition.topic, partition.partition) for partition in partitions]
+        for topic, partition in revoked:
+            self._partition_lag.pop((topic, partition), None)
+            metrics.remove_partition_lag(topic, partition)
+        
+        if self.batch_mode or self.worker_pool is not None:
+            try:
+                if self.worker_pool is not None:
+                    # Let in-flight handlers finish so their offsets can be committed
+                    self.worker_pool.join()
+                self._commit_pending_offsets()
+            except KafkaException as e:
+                logger.error(f"Failed to commit offsets on partition revoke: {e}")
+        
+        # Offsets left uncommitted must not be committed later over the new owner's progress
+        self.offset_tracker.reset(revoked)
+        for key in revoked:
+            self._pending_offsets.pop(key, None)
+    
+    def flush_producer(self):
+        """Wait until all re-produced retry and dead letter messages are delivered."""
+        if self.producer is not None and len(self.producer) > 0:
+            remaining = self.producer.flush(10.0)
+            if remaining:
+                logger.error(f"{remaining} retry/dead letter messages still undelivered after flush")
+    
+    def _log_message_error(self, msg):
+        """Log an error carried by a consumed message.
+        
+        Args:
+            msg: Kafka message with an error set
+        """
+        if msg.error().code() == KafkaError._PARTITION_EOF:
+            # End of partition event - not an error
+            logger.debug(f"Reached end of partition: {msg.topic()}/{msg.partition()}")
+        else:
+            # Error
+            logger.error(f"Consumer error: {msg.error()}")
+    
+    def _update_processing_time(self, processing_time_ms: float):
+        """Record a message processing time in the rolling statistics window.
+        
+        Args:
+            processing_time_ms: Processing time in milliseconds
+        """
+        self.processing_window.record(processing_time_ms)
+    
+    def _throttle_on_errors(self):
+        """Pause briefly to prevent CPU spinning in case of continuous errors."""
+        if len(self.processing_errors) > 10:
+            logger.warning(f"High error rate detected ({len(self.processing_errors)} errors), pausing briefly")
+            time.sleep(0.5)
+            self.processing_errors.clear()
+    
+    def stop(self):
         """Stop consuming messages."""
         self.running = False
+        if self.worker_pool is not None:
+            self.worker_pool.stop()
         if self.consumer:
+            if self.batch_mode or self.worker_pool is not None:
+                try:
+                    self._commit_pending_offsets()
+                except KafkaException as e:
+                    logger.error(f"Failed to commit offsets on shutdown: {e}")
             self.consumer.close()
+            self.consumer = None
+            self.flush_producer()
+            self.dead_letter_queue.close()
             # Update metrics
             metrics.set_consumer_status(False)
             logger.info("Kafka consumer stopped")
     
-    def _process_message(self, msg, retry_count: int = 0) -> bool:
+    def _process_message(self, msg) -> bool:
         """Process a Kafka message.
         
         Args:
             msg: Kafka message
-            retry_count: Retry attempt count
             
         Returns:
             bool: True if message was successfully processed, False otherwise
         """
+        event = self._decode_message(msg)
+        if event is None:
+            return False
+        
+        event_type, parsed_event, value = event
+        return self._dispatch_event(msg, event_type, parsed_event, value)
+    
+    def _decode_message(self, msg) -> Optional[Tuple[str, UserEvent, Optional[Dict[str, Any]]]]:
+        """Decode and validate a Kafka message.
+        
+        Args:
+            msg: Kafka message
+            
+        Returns:
+            Tuple of event type, parsed event and raw value (None on the fast path), or
+            None if the message was rejected
+        """
+        if self.fast_validation:
+            return self._decode_message_fast(msg)
+        
         message_id = f"{msg.topic()}-{msg.partition()}-{msg.offset()}"
         
         try:
             # Parse message value
-            value = json.loads(msg.value().decode('utf-8'))
+            value = self._load_value(msg.value())
             logger.debug(f"Processing message: {message_id}")
             
             # Extract event type
@@ -257,20 +653,20 @@ class KafkaEventConsumer:
             if not event_type:
                 logger.warning(f"Message missing event_type: {value}")
                 self.stats.failed += 1
-                self.dead_letter_queue.add(value, "Missing event_type field")
-                return False
-              # Update event type stats
+                self._add_dead_letter(msg, value, "Missing event_type field")
+                return None
+            
+            # Update event type stats
             if event_type in self.stats.event_types:
                 self.stats.event_types[event_type] += 1
             else:
                 self.stats.event_types[event_type] = 1
             
             # Find handler for event type
-            handler = self.event_handlers.get(event_type)
-            if not handler:
+            if event_type not in self.event_handlers:
                 logger.warning(f"No handler registered for event type: {event_type}")
                 self.stats.failed += 1
-                return False
+                return None
             
             # Parse event
             try:
@@ -282,7 +678,7 @@ class KafkaEventConsumer:
                         value['event_type'] = event_type_enum
                 
                 # Validate against Avro schema if available
-                schema_name = "user_event"
+                schema_name = USER_EVENT_SCHEMA
                 if not validator.validate(schema_name, value):
                     logger.warning(f"Message failed Avro schema validation for {schema_name}")
                     # We'll still try to process it with our Pydantic model
@@ -293,69 +689,276 @@ class KafkaEventConsumer:
                 logger.error(f"Failed to parse event: {e}")
                 self.processing_errors.add(message_id)
                 self.stats.failed += 1
-                self.dead_letter_queue.add(value, f"Validation error: {e}")
-                return False
-              # Process event
-            try:
-                # Start timing the processing
-                with metrics.observe_processing_time(event_type):
-                    result = handler(event.model_dump())
-                
-                self.stats.total_processed += 1
-                
-                if result.success:
-                    logger.info(f"Successfully processed {event_type} event: {result.message}")
-                    self.stats.successful += 1
-                    metrics.record_event_processed(event_type, success=True)
-                    return True
-                else:
-                    logger.error(f"Failed to process {event_type} event: {result.error}")
-                    self.processing_errors.add(message_id)
-                    self.stats.failed += 1
-                    metrics.record_event_processed(event_type, success=False)
-                    
-                    # Check if we should retry
-                    if result.retry_recommended and retry_count < self.retry_policy.max_retries:
-                        backoff = self.retry_policy.get_backoff_time(retry_count)
-                        logger.info(f"Retrying message {message_id} in {backoff:.2f}s (attempt {retry_count+1}/{self.retry_policy.max_retries})")
-                        
-                        # Set retry flag on message
-                        setattr(msg, '_should_retry', True)
-                        
-                        # Wait for backoff time
-                        time.sleep(backoff)
-                        
-                        # Increment retry stats
-                        self.stats.retried += 1
-                        
-                        # Retry processing
-                        return self._process_message(msg, retry_count + 1)
-                    
-                    # No more retries
-                    self.dead_letter_queue.add(value, result.error or "Unknown error")
-                    return False
+                self._add_dead_letter(msg, value, f"Validation error: {e}")
+                return None
             
-            except Exception as e:
-                logger.exception(f"Error processing event: {e}")
-                self.processing_errors.add(message_id)
-                self.stats.failed += 1
-                self.dead_letter_queue.add(value, str(e))
-                return False
+            return event_type, event, value
         
-        except json.JSONDecodeError as e:
+        except ValueError as e:
+            # Invalid JSON or malformed Avro payload
             logger.error(f"Failed to decode message: {e}")
             self.processing_errors.add(message_id)
             self.stats.failed += 1
-            return False
+            return None
         except Exception as e:
             logger.exception(f"Error processing message: {e}")
             self.processing_errors.add(message_id)
             self.stats.failed += 1
+            return None
+    
+    def _decode_message_fast(self, msg) -> Optional[Tuple[str, UserEvent, None]]:
+        """Decode and validate a Kafka message in a single pass over the raw bytes.
+        
+        Skips the intermediate dict and the advisory Avro check; the Pydantic model is
+        the authoritative validation either way.
+        
+        Args:
+            msg: Kafka message
+            
+        Returns:
+            Tuple of event type, parsed event and None, or None if the message was rejected
+        """
+        message_id = f"{msg.topic()}-{msg.partition()}-{msg.offset()}"
+        payload = msg.value()
+        
+        try:
+            if registry.is_avro(payload):
+                # Avro payloads are structurally valid once decoded
+                _, record = registry.decode(payload)
+                event = validator.validate_python(USER_EVENT_SCHEMA, record)
+            else:
+                event = validator.validate_json(USER_EVENT_SCHEMA, payload)
+        except ValueError as e:
+            # Includes pydantic ValidationError and malformed Avro payloads
+            logger.error(f"Failed to parse event: {e}")
+            self.processing_errors.add(message_id)
+            self.stats.failed += 1
+            self._add_dead_letter(msg, self._raw_value(msg), f"Validation error: {e}")
+            return None
+        
+        # Update event type stats
+        event_type = event.event_type.value
+        self.stats.event_types[event_type] = self.stats.event_types.get(event_type, 0) + 1
+        
+        # Find handler for event type
+        if event_type not in self.event_handlers:
+            logger.warning(f"No handler registered for event type: {event_type}")
+            self.stats.failed += 1
+            return None
+        
+        self.stats.last_event_timestamp = event.timestamp
+        return event_type, event, None
+    
+    def _dispatch_event(self, msg, event_type: str, event: UserEvent, value: Optional[Dict[str, Any]],
+                        retry_count: int = 0) -> bool:
+        """Run the registered handler for a decoded event.
+        
+        Args:
+            msg: Kafka message the event was decoded from
+            event_type: Event type
+            event: Parsed event
+            value: Raw message value, stored in the dead letter queue on failure;
+                decoded from the message when None
+            retry_count: Retry attempt count
+            
+        Returns:
+            bool: True if the event was successfully handled, False otherwise
+        """
+        message_id = f"{msg.topic()}-{msg.partition()}-{msg.offset()}"
+        handler = self.event_handlers[event_type]
+        
+        try:
+            # Start timing the processing
+            with metrics.observe_processing_time(event_type):
+                result = handler(event)
+            
+            self.stats.total_processed += 1
+            
+            if result.success:
+                logger.info(f"Successfully processed {event_type} event: {result.message}")
+                self.stats.successful += 1
+                metrics.record_event_processed(event_type, success=True)
+                return True
+            else:
+                logger.error(f"Failed to process {event_type} event: {result.error}")
+                self.processing_errors.add(message_id)
+                self.stats.failed += 1
+                metrics.record_event_processed(event_type, success=False)
+                
+                # Check if we should retry
+                if result.retry_recommended and retry_count < self.retry_policy.max_retries:
+                    self._schedule_retry(msg, retry_count, result.error or "Unknown error")
+                    return False
+                
+                # No more retries
+                self._dead_letter(msg, value, retry_count, result.error or "Unknown error")
+                return False
+        
+        except Exception as e:
+            logger.exception(f"Error processing event: {e}")
+            self.processing_errors.add(message_id)
+            self.stats.failed += 1
+            self._dead_letter(msg, value, retry_count, str(e))
             return False
+    
+    def _schedule_retry(self, msg, retry_count: int, error: str):
+        """Re-produce a failed message to the retry tier topic for its attempt.
+        
+        The message is picked up by RetryTopicConsumer once its due time has passed,
+        so the source partition keeps moving while the retry waits.
+        
+        Args:
+            msg: Kafka message that failed
+            retry_count: Retry attempt count of the failed delivery (0-based)
+            error: Error message
+        """
+        original_topic = get_header(msg, ORIGINAL_TOPIC_HEADER) or msg.topic()
+        retry_topic = self.retry_policy.get_retry_topic(original_topic, retry_count)
+        backoff = self.retry_policy.get_backoff_time(retry_count)
+        due_ms = int((time.time() + backoff) * 1000)
+        
+        logger.info(
+            f"Scheduling retry of {msg.topic()}-{msg.partition()}-{msg.offset()} on {retry_topic} "
+            f"in {backoff:.2f}s (attempt {retry_count+1}/{self.retry_policy.max_retries})"
+        )
+        self._produce_copy(msg, retry_topic, {
+            RETRY_COUNT_HEADER: str(retry_count + 1),
+            RETRY_DUE_HEADER: str(due_ms),
+            ERROR_HEADER: error,
+        })
+        
+        # The retry topic owns a replayed message from here on
+        if isinstance(msg, ReplayMessage):
+            msg.retry_scheduled = True
+        
+        # Increment retry stats
+        self.stats.retried += 1
+        metrics.record_retry_scheduled(retry_topic)
+    
+    def _dead_letter(self, msg, value: Optional[Dict[str, Any]], retry_count: int, error: str):
+        """Record a message that will not be retried in the dead letter queue and topic.
+        
+        Args:
+            msg: Kafka message that failed
+            value: Decoded message value, or None to decode it from the message
+            retry_count: Number of retries already attempted
+            error: Error message
+        """
+        if value is None:
+            value = self._raw_value(msg)
+        self._add_dead_letter(msg, value, error)
+        
+        original_topic = get_header(msg, ORIGINAL_TOPIC_HEADER) or msg.topic()
+        self._produce_copy(msg, self.retry_policy.get_dead_letter_topic(original_topic), {
+            RETRY_COUNT_HEADER: str(retry_count),
+            ERROR_HEADER: error,
+        })
+    
+    def _add_dead_letter(self, msg, value: Dict[str, Any], error: str):
+        """Store a failed message in the dead letter queue.
+        
+        A replayed dead letter entry that fails again is updated in place, so
+        replaying it does not duplicate it. Messages that are not in the queue
+        (any more) are added.
+        
+        Args:
+            msg: Kafka message that failed
+            value: Decoded message value
+            error: Error message
+        """
+        entry_id = getattr(msg, "dead_letter_id", None)
+        if entry_id is None or not self.dead_letter_queue.update(entry_id, error):
+            self.dead_letter_queue.add(value, error, self._message_source(msg))
+    
+    def _produce_copy(self, msg, topic: str, headers: Dict[str, str]):
+        """Produce a copy of a message, preserving its key and original position.
+        
+        Args:
+            msg: Kafka message to copy
+            topic: Destination topic
+            headers: Additional headers to set
+        """
+        copy_headers = {
+            ORIGINAL_TOPIC_HEADER: get_header(msg, ORIGINAL_TOPIC_HEADER) or msg.topic(),
+            ORIGINAL_PARTITION_HEADER: get_header(msg, ORIGINAL_PARTITION_HEADER) or str(msg.partition()),
+            ORIGINAL_OFFSET_HEADER: get_header(msg, ORIGINAL_OFFSET_HEADER) or str(msg.offset()),
+        }
+        copy_headers.update(headers)
+        
+        try:
+            producer = self.get_producer()
+            producer.produce(
+                topic,
+                value=msg.value(),
+                key=msg.key(),
+                headers=[(key, value.encode('utf-8')) for key, value in copy_headers.items()],
+                on_delivery=self._on_delivery,
+            )
+            producer.poll(0)
+        except (KafkaException, BufferError) as e:
+            logger.error(f"Failed to produce message to {topic}: {e}")
+    
+    @staticmethod
+    def _load_value(payload: bytes) -> Dict[str, Any]:
+        """Decode a message value in either the Avro wire format or JSON.
+        
+        Args:
+            payload: Raw message value
+            
+        Returns:
+            Decoded message value
+        """
+        if registry.is_avro(payload):
+            return registry.decode(payload)[1]
+        return json.loads(payload.decode('utf-8'))
+    
+    @classmethod
+    def _raw_value(cls, msg) -> Dict[str, Any]:
+        """Decode a message value for storage in the dead letter queue.
+        
+        Args:
+            msg: Kafka message
+            
+        Returns:
+            Decoded value, or the raw text if the value is not a JSON or Avro object
+        """
+        try:
+            value = cls._load_value(msg.value())
+            if isinstance(value, dict):
+                return value
+        except (TypeError, ValueError):
+            pass
+        return {"raw": msg.value().decode('utf-8', errors='replace')}
+    
+    @staticmethod
+    def _message_source(msg) -> Dict[str, Any]:
+        """Get where a message was originally consumed from, for dead letter entries.
+        
+        Args:
+            msg: Kafka message
+            
+        Returns:
+            Original topic, partition, offset and key
+        """
+        partition = get_header(msg, ORIGINAL_PARTITION_HEADER)
+        offset = get_header(msg, ORIGINAL_OFFSET_HEADER)
+        key = msg.key()
+        return {
+            "topic": get_header(msg, ORIGINAL_TOPIC_HEADER) or msg.topic(),
+            "partition": int(partition) if partition else msg.partition(),
+            "offset": int(offset) if offset else msg.offset(),
+            "key": key.decode('utf-8', errors='replace') if key else None,
+        }
+    
+    @staticmethod
+    def _on_delivery(err, msg):
+        """Log failed deliveries to retry and dead letter topics."""
+        if err is not None:
+            logger.error(f"Failed to deliver message to {msg.topic()}: {err}")
 
 
 # Event handlers
-def handle_user_registered(event: Dict[str, Any]) -> EventProcessingResult:
+def handle_user_registered(event: UserEvent) -> EventProcessingResult:
     """Handle user registered event.
     
     Args:
@@ -365,10 +968,9 @@ def handle_user_registered(event: Dict[str, Any]) -> EventProcessingResult:
         EventProcessingResult: Processing result
     """
     try:
-        user_id = event.get('user_id')
-        user_data = event.get('data', {})
-        email = user_data.get('email')
-        timestamp = event.get('timestamp')
+        user_id = event.user_id
+        email = event.data.email
+        timestamp = event.timestamp
         
         logger.info(f"New user registered: {email} (ID: {user_id}) at {timestamp}")
         
@@ -376,11 +978,11 @@ def handle_user_registered(event: Dict[str, Any]) -> EventProcessingResult:
         # 1. Send welcome email
         # Send welcome email to the user
         logger.info(f"Sending welcome email to {email}...")
-        # send_welcome_email(email, user_data.get('full_name'))
+        # send_welcome_email(email, event.data.full_name)
         
         # 2. Create user profile in another service
         logger.info(f"Creating user profile for {email}...")
-        # create_user_profile(user_id, email, user_data)
+        # create_user_profile(user_id, email, event.data)
         
         # 3. Initialize user data in other systems
         logger.info(f"Initializing user data for {email}...")
@@ -409,7 +1011,7 @@ def handle_user_registered(event: Dict[str, Any]) -> EventProcessingResult:
         )
 
 
-def handle_user_login(event: Dict[str, Any]) -> EventProcessingResult:
+def handle_user_login(event: UserEvent) -> EventProcessingResult:
     """Handle user login event.
     
     Args:
@@ -419,10 +1021,9 @@ def handle_user_login(event: Dict[str, Any]) -> EventProcessingResult:
         EventProcessingResult: Processing result
     """
     try:
-        user_id = event.get('user_id')
-        user_data = event.get('data', {})
-        email = user_data.get('email')
-        metadata = event.get('metadata', {})
+        user_id = event.user_id
+        email = event.data.email
+        metadata = event.metadata
         
         # Check for required metadata
         ip_address = metadata.get('ip_address')
@@ -452,7 +1053,7 @@ def handle_user_login(event: Dict[str, Any]) -> EventProcessingResult:
         )
 
 
-def handle_user_updated(event: Dict[str, Any]) -> EventProcessingResult:
+def handle_user_updated(event: UserEvent) -> EventProcessingResult:
     """Handle user updated event.
     
     Args:
@@ -462,9 +1063,8 @@ def handle_user_updated(event: Dict[str, Any]) -> EventProcessingResult:
         EventProcessingResult: Processing result
     """
     try:
-        user_id = event.get('user_id')
-        user_data = event.get('data', {})
-        email = user_data.get('email')
+        user_id = event.user_id
+        email = event.data.email
         
         logger.info(f"User updated: {email} (ID: {user_id})")
         
@@ -488,7 +1088,7 @@ def handle_user_updated(event: Dict[str, Any]) -> EventProcessingResult:
         )
 
 
-def handle_user_deleted(event: Dict[str, Any]) -> EventProcessingResult:
+def handle_user_deleted(event: UserEvent) -> EventProcessingResult:
     """Handle user deleted event.
     
     Args:
@@ -498,9 +1098,8 @@ def handle_user_deleted(event: Dict[str, Any]) -> EventProcessingResult:
         EventProcessingResult: Processing result
     """
     try:
-        user_id = event.get('user_id')
-        user_data = event.get('data', {})
-        email = user_data.get('email')
+        user_id = event.user_id
+        email = event.data.email
         
         logger.info(f"User deleted: {email} (ID: {user_id})")
         
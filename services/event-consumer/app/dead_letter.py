@@ -0,0 +1,339 @@
+"""Bounded, optionally persistent dead letter queue for failed messages."""
+import json
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, IO, Iterable, List, Optional, Set, Tuple
+
+import app.metrics as metrics
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = "dlq-"
+SEGMENT_SUFFIX = ".log"
+
+
+class DeadLetterQueue:
+    """Dead letter queue for failed messages.
+    
+    Entries are kept in a fixed-size ring buffer, so adding is O(1) and the oldest
+    entry is dropped once the queue is full. Each entry gets a monotonically
+    increasing ``id`` used for pagination and replay.
+    
+    When a storage directory is configured, entries are also appended to local
+    segment files (one JSON record per line) and reloaded on startup. A segment holds
+    at most ``max_size`` entries and the newest segment is continued after a restart.
+    When a new segment is started, older segments are deleted once the newer ones
+    hold ``max_size`` entries between them, since nothing older can still be live.
+    """
+    
+    def __init__(self, max_size: int = 1000, storage_dir: Optional[str] = None):
+        """Initialize dead letter queue.
+        
+        Args:
+            max_size: Maximum size of the queue
+            storage_dir: Directory for segment files, or None to keep entries in memory only
+        """
+        self.queue: Deque[Dict[str, Any]] = deque(maxlen=max_size)
+        self.max_size = max_size
+        self.storage_dir = storage_dir
+        self.lock = threading.Lock()
+        self._next_id = 1
+        self._segment: Optional[IO[str]] = None
+        self._segment_entries = 0
+        # Entries written to each segment file, by file name
+        self._segment_counts: Dict[str, int] = {}
+        
+        if self.storage_dir:
+            os.makedirs(self.storage_dir, exist_ok=True)
+            self._load_segments()
+        
+        metrics.update_dlq_size(len(self.queue))
+    
+    def add(self, message: Dict[str, Any], error: str, source: Optional[Dict[str, Any]] = None):
+        """Add a message to the dead letter queue.
+        
+        Args:
+            message: Message to add
+            error: Error message
+            source: Topic, partition, offset and key the message was consumed from
+        """
+        with self.lock:
+            entry = {
+                "id": self._next_id,
+                "message": message,
+                "error": error,
+                "timestamp": datetime.now().isoformat(),
+                "source": source,
+            }
+            self._next_id += 1
+            self.queue.append(entry)
+            
+            if self.storage_dir:
+                self._append_record(entry)
+            
+            # Update metrics
+            metrics.update_dlq_size(len(self.queue))
+    
+    def get_all(self) -> List[Dict[str, Any]]:
+        """Get all messages in the queue.
+        
+        Returns:
+            List of messages
+        """
+        with self.lock:
+            return list(self.queue)
+    
+    def get_page(self, after_id: int = 0, limit: int = 100) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Get a page of messages, oldest first.
+        
+        Args:
+            after_id: Only return messages with an id greater than this
+            limit: Maximum number of messages to return
+        
+        Returns:
+            Messages on the page and the cursor for the next page, or None if this is the last page
+        """
+        with self.lock:
+            page = []
+            for entry in self.queue:
+                if entry["id"] <= after_id:
+                    continue
+                if len(page) == limit:
+                    return page, page[-1]["id"]
+                page.append(entry)
+            return page, None
+    
+    def get_many(self, ids: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+        """Get messages by id.
+        
+        Args:
+            ids: Message ids, or None for every message in the queue
+        
+        Returns:
+            Matching messages, oldest first
+        """
+        with self.lock:
+            if ids is None:
+                return list(self.queue)
+            wanted = set(ids)
+            return [entry for entry in self.queue if entry["id"] in wanted]
+    
+    def remove(self, ids: Iterable[int]):
+        """Remove messages by id.
+        
+        Args:
+            ids: Ids of the messages to remove
+        """
+        removed = set(ids)
+        if not removed:
+            return
+        
+        with self.lock:
+            self.queue = deque(
+                (entry for entry in self.queue if entry["id"] not in removed), maxlen=self.max_size
+            )
+            if self.storage_dir:
+                self._append_record({"deleted": sorted(removed)})
+            metrics.update_dlq_size(len(self.queue))
+    
+    def update(self, entry_id: int, error: str) -> bool:
+        """Record another failed attempt of a message that is already in the queue.
+        
+        Args:
+            entry_id: Id of the message
+            error: Error of the latest attempt
+            
+        Returns:
+            bool: True if the message was found, False otherwise
+        """
+        with self.lock:
+            for entry in self.queue:
+                if entry["id"] == entry_id:
+                    break
+            else:
+                return False
+            
+            entry["error"] = error
+            entry["attempts"] = entry.get("attempts", 1) + 1
+            entry["timestamp"] = datetime.now().isoformat()
+            if self.storage_dir:
+                self._append_record({"updated": entry_id, "error": entry["error"],
+                                     "attempts": entry["attempts"], "timestamp": entry["timestamp"]})
+            return True
+    
+    def __len__(self) -> int:
+        return len(self.queue)
+    
+    def clear(self):
+        """Clear the queue."""
+        with self.lock:
+            self.queue.clear()
+            if self.storage_dir:
+                self._close_segment()
+                for filename in self._segment_files():
+                    os.remove(os.path.join(self.storage_dir, filename))
+                self._segment_counts.clear()
+            metrics.update_dlq_size(0)
+    
+    def close(self):
+        """Close the current segment file."""
+        with self.lock:
+            self._close_segment()
+    
+    def _segment_files(self) -> List[str]:
+        """Get segment file names, oldest first."""
+        return sorted(
+            filename for filename in os.listdir(self.storage_dir)
+            if filename.startswith(SEGMENT_PREFIX) and filename.endswith(SEGMENT_SUFFIX)
+        )
+    
+    def _load_segments(self):
+        """Rebuild the in-memory queue from the segment files."""
+        entries: List[Dict[str, Any]] = []
+        deleted: Set[int] = set()
+        updates: Dict[int, Dict[str, Any]] = {}
+        segments = self._segment_files()
+        
+        for filename in segments:
+            self._segment_counts[filename] = 0
+            with open(os.path.join(self.storage_dir, filename), "r") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn write at the end of a segment after a crash
+                        logger.warning(f"Skipping corrupt dead letter record in {filename}")
+                        continue
+                    
+                    if "deleted" in record:
+                        deleted.update(record["deleted"])
+                    elif "updated" in record:
+                        updates[record.pop("updated")] = record
+                    else:
+                        entries.append(record)
+                        self._segment_counts[filename] += 1
+                        self._next_id = max(self._next_id, record["id"] + 1)
+        
+        for entry in entries:
+            if entry["id"] not in deleted:
+                entry.update(updates.get(entry["id"], {}))
+                self.queue.append(entry)
+        
+        if segments:
+            logger.info(f"Loaded {len(self.queue)} dead letter messages from {len(segments)} segments")
+    
+    def _append_record(self, record: Dict[str, Any]):
+        """Append a record to the current segment, rolling to a new segment when it is full.
+        
+        Args:
+            record: Entry, update or tombstone to append
+        """
+        try:
+            # Only entries count towards the segment size
+            if self._segment is None or self._segment_entries >= self.max_size:
+                self._open_segment()
+            
+            self._segment.write(json.dumps(record, default=str) + "\n")
+            self._segment.flush()
+            if "deleted" not in record and "updated" not in record:
+                self._segment_entries += 1
+                self._segment_counts[os.path.basename(self._segment.name)] = self._segment_entries
+        except OSError as e:
+            logger.error(f"Failed to persist dead letter record: {e}")
+    
+    def _open_segment(self):
+        """Continue the newest segment if it has room, otherwise start a new one."""
+        segments = self._segment_files()
+        if self._segment is None and segments and self._segment_counts.get(segments[-1], 0) < self.max_size:
+            self._resume_segment(segments[-1])
+        else:
+            self._roll_segment()
+    
+    def _resume_segment(self, filename: str):
+        """Reopen an existing segment for appending.
+        
+        Args:
+            filename: Segment file name
+        """
+        path = os.path.join(self.storage_dir, filename)
+        self._segment = open(path, "a")
+        self._segment_entries = self._segment_counts.get(filename, 0)
+        
+        # Terminate a torn record left by a crash so the next record starts on its own line
+        if os.path.getsize(path) > 0:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._segment.write("\n")
+    
+    def _roll_segment(self):
+        """Start a new segment and delete segments that can no longer hold live entries."""
+        self._close_segment()
+        
+        filename = f"{SEGMENT_PREFIX}{self._next_id:012d}{SEGMENT_SUFFIX}"
+        self._segment = open(os.path.join(self.storage_dir, filename), "a")
+        self._segment_entries = 0
+        self._segment_counts[filename] = 0
+        
+        # Walk back from the newest segment; once the newer segments hold max_size
+        # entries, the remaining older ones cannot hold live entries
+        segments = self._segment_files()
+        newer_entries = 0
+        for index in range(len(segments) - 1, -1, -1):
+            if newer_entries >= self.max_size:
+                for old in segments[:index + 1]:
+                    os.remove(os.path.join(self.storage_dir, old))
+                    self._segment_counts.pop(old, None)
+                break
+            newer_entries += self._segment_counts.get(segments[index], 0)
+    
+    def _close_segment(self):
+        """Close the current segment file if one is open."""
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+
+
+class ReplayMessage:
+    """Stand-in for a Kafka message used to re-inject a dead letter entry into the handler pipeline."""
+    
+    def __init__(self, entry: Dict[str, Any]):
+        """Initialize replay message.
+        
+        Args:
+            entry: Dead letter queue entry
+        """
+        source = entry.get("source") or {}
+        self._value = json.dumps(entry["message"], default=str).encode("utf-8")
+        self._key = source["key"].encode("utf-8") if source.get("key") else None
+        self._topic = source.get("topic", "dead-letter-queue")
+        self._partition = source.get("partition", -1)
+        self._offset = source.get("offset", entry["id"])
+        # Failures of the replay update this entry instead of adding a new one
+        self.dead_letter_id = entry["id"]
+        # Set once a failed replay has been handed to a retry topic
+        self.retry_scheduled = False
+    
+    def topic(self) -> str:
+        return self._topic
+    
+    def partition(self) -> int:
+        return self._partition
+    
+    def offset(self) -> int:
+        return self._offset
+    
+    def key(self) -> Optional[bytes]:
+        return self._key
+    
+    def value(self) -> bytes:
+        return self._value
+    
+    def headers(self) -> Optional[List[Tuple[str, bytes]]]:
+        return None
+    
+    def error(self) -> None:
+        return None
@@ -0,0 +1,171 @@
+"""Concurrent handler dispatch with per-key ordering for the event consumer."""
+import logging
+import queue
+import threading
+import zlib
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+class OffsetTracker:
+    """Tracks in-flight offsets per partition.
+    
+    Handlers complete out of order across keys, so a partition can only be committed
+    up to the lowest offset that is still in flight.
+    """
+    
+    def __init__(self):
+        """Initialize offset tracker."""
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Tuple[str, int], Deque[int]] = {}
+        self._completed: Dict[Tuple[str, int], Set[int]] = {}
+        self._committable: Dict[Tuple[str, int], int] = {}
+    
+    def track(self, topic: str, partition: int, offset: int):
+        """Record that a message has been handed to a worker.
+        
+        Args:
+            topic: Message topic
+            partition: Message partition
+            offset: Message offset
+        """
+        with self._lock:
+            self._in_flight.setdefault((topic, partition), deque()).append(offset)
+    
+    def complete(self, topic: str, partition: int, offset: int):
+        """Record that a message has been fully processed.
+        
+        Args:
+            topic: Message topic
+            partition: Message partition
+            offset: Message offset
+        """
+        key = (topic, partition)
+        with self._lock:
+            pending = self._in_flight.get(key)
+            if not pending:
+                return
+            
+            completed = self._completed.setdefault(key, set())
+            completed.add(offset)
+            
+            # Advance over the contiguous run of completed offsets
+            while pending and pending[0] in completed:
+                done = pending.popleft()
+                completed.discard(done)
+                self._committable[key] = done + 1
+    
+    def reset(self, partitions: Iterable[Tuple[str, int]]):
+        """Forget the offsets of partitions that are no longer assigned.
+        
+        Args:
+            partitions: (topic, partition) pairs to forget
+        """
+        with self._lock:
+            for key in partitions:
+                self._in_flight.pop(key, None)
+                self._completed.pop(key, None)
+                self._committable.pop(key, None)
+    
+    def pop_committable(self) -> Dict[Tuple[str, int], int]:
+        """Get and reset the next offset to commit for partitions that advanced.
+        
+        Returns:
+            Next offset to commit per (topic, partition)
+        """
+        with self._lock:
+            committable = self._committable
+            self._committable = {}
+            return committable
+    
+    def in_flight(self) -> int:
+        """Get the number of messages still being processed.
+        
+        Returns:
+            int: Number of in-flight messages
+        """
+        with self._lock:
+            return sum(len(pending) for pending in self._in_flight.values())
+
+
+class KeyedWorkerPool:
+    """Thread pool that runs tasks for the same key sequentially.
+    
+    Each key is hashed onto one worker with its own bounded queue, so tasks for a key
+    run in submission order while different keys run in parallel. A full queue blocks
+    the submitter, which applies backpressure to the poll loop.
+    """
+    
+    def __init__(self, num_workers: int, queue_size: int = 1000):
+        """Initialize worker pool.
+        
+        Args:
+            num_workers: Number of worker threads
+            queue_size: Maximum number of queued tasks per worker
+        """
+        self.num_workers = num_workers
+        self._queues: List[queue.Queue] = [queue.Queue(maxsize=queue_size) for _ in range(num_workers)]
+        self._threads: List[threading.Thread] = []
+    
+    def start(self):
+        """Start the worker threads."""
+        if self._threads:
+            return
+        
+        for index, task_queue in enumerate(self._queues):
+            thread = threading.Thread(
+                target=self._run, args=(task_queue,), name=f"event-worker-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Started {self.num_workers} event handler workers")
+    
+    def submit(self, key: Optional[Union[str, bytes]], func: Callable[..., Any], *args: Any):
+        """Queue a task on the worker that owns its key.
+        
+        Args:
+            key: Ordering key; tasks with equal keys run in submission order
+            func: Function to run
+            *args: Arguments passed to the function
+        """
+        if isinstance(key, str):
+            key = key.encode('utf-8')
+        index = zlib.crc32(key or b"") % self.num_workers
+        self._queues[index].put((func, args))
+    
+    def join(self):
+        """Block until every queued task has finished."""
+        for task_queue in self._queues:
+            task_queue.join()
+    
+    def stop(self):
+        """Finish queued tasks and stop the worker threads."""
+        if not self._threads:
+            return
+        
+        for task_queue in self._queues:
+            task_queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=10.0)
+        self._threads = []
+    
+    @staticmethod
+    def _run(task_queue: queue.Queue):
+        """Run tasks from a worker queue until a stop sentinel is received.
+        
+        Args:
+            task_queue: Queue owned by this worker
+        """
+        while True:
+            task = task_queue.get()
+            try:
+                if task is None:
+                    return
+                func, args = task
+                func(*args)
+            except Exception as e:
+                logger.exception(f"Unhandled error in event handler worker: {e}")
+            finally:
+                task_queue.task_done()
@@ -3,11 +3,12 @@ import logging
 import signal
 import sys
 import threading
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from prometheus_client import make_asgi_app
 
 from app.config import settings
@@ -18,6 +19,7 @@ from app.consumer import (
     handle_user_updated,
     handle_user_deleted
 )
+from app.retry import RetryTopicConsumer
 from app.schemas import EventProcessingResult, EventProcessingStatistics
 import app.metrics as metrics
 
@@ -63,26 +65,37 @@ consumer.register_handler("user_login", handle_user_login)
 consumer.register_handler("user_updated", handle_user_updated)
 consumer.register_handler("user_deleted", handle_user_deleted)
 
-# Consumer thread
+# Delay-aware consumer for the retry tier topics
+retry_consumer = RetryTopicConsumer(consumer)
+
+# Consumer threads
 consumer_thread = None
+retry_consumer_thread = None
 
 
 @app.on_event("startup")
 async def startup_event():
     """Start Kafka consumer on application startup."""
-    global consumer_thread
+    global consumer_thread, retry_consumer_thread
     logger.info("Starting Kafka consumer thread")
     consumer_thread = threading.Thread(target=consumer.start, daemon=True)
     consumer_thread.start()
+    
+    logger.info("Starting retry consumer thread")
+    retry_consumer_thread = threading.Thread(target=retry_consumer.start, daemon=True)
+    retry_consumer_thread.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Stop Kafka consumer on application shutdown."""
     logger.info("Stopping Kafka consumer")
+    retry_consumer.stop()
     consumer.stop()
     if consumer_thread:
         consumer_thread.join(timeout=5.0)
+    if retry_consumer_thread:
+        retry_consumer_thread.join(timeout=5.0)
     logger.info("Application shutdown complete")
 
 
@@ -100,10 +113,17 @@ async def metrics():
 
 
 @app.get("/dead-letter-queue", tags=["monitoring"])
-async def dead_letter_queue():
-    """Get messages in the dead letter queue."""
-    messages = consumer.get_dead_letter_queue()
-    return {"count": len(messages), "messages": messages}
+async def dead_letter_queue(
+    after_id: int = Query(0, ge=0, description="Return messages with an id greater than this"),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """Get a page of messages in the dead letter queue."""
+    messages, next_after_id = consumer.get_dead_letter_queue(after_id, limit)
+    return {
+        "count": len(consumer.dead_letter_queue),
+        "messages": messages,
+        "next_after_id": next_after_id,
+    }
 
 
 @app.post("/dead-letter-queue/clear", tags=["management"])
@@ -118,17 +138,41 @@ class RetryMessage(BaseModel):
     message: Dict[str, Any]
 
 
+class ReplayRequest(BaseModel):
+    """Dead letter messages to replay."""
+    ids: Optional[List[int]] = Field(None, description="Message ids to replay; all messages if omitted")
+    max_rate: float = Field(settings.DLQ_REPLAY_MAX_RATE, gt=0, description="Maximum messages replayed per second")
+    remove: bool = Field(True, description="Remove messages from the dead letter queue once replayed successfully")
+
+
 @app.post("/dead-letter-queue/retry", tags=["management"])
 async def retry_message(message: RetryMessage):
-    """Retry a message from the dead letter queue."""
-    # Not implemented in this demo
-    return {"message": "Retry functionality not implemented"}
+    """Retry a single message through the handler pipeline."""
+    entry = {"id": 0, "message": message.message}
+    success = await run_in_threadpool(consumer.replay_dead_letters, [entry], 0, False)
+    return {"message": "Message processed" if success else "Message processing failed", "success": bool(success)}
+
+
+@app.post("/dead-letter-queue/replay", status_code=status.HTTP_202_ACCEPTED, tags=["management"])
+async def replay_dead_letter_queue(request: ReplayRequest):
+    """Replay dead letter messages through the handler pipeline at a bounded rate."""
+    entries = consumer.dead_letter_queue.get_many(request.ids)
+    if not entries:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No matching dead letter messages")
+    
+    threading.Thread(
+        target=consumer.replay_dead_letters,
+        args=(entries, request.max_rate, request.remove),
+        daemon=True,
+    ).start()
+    return {"message": f"Replaying {len(entries)} messages", "count": len(entries)}
 
 
 def handle_signals():
     """Handle OS signals for graceful shutdown."""
     def signal_handler(sig, frame):
         logger.info(f"Received signal {sig}, shutting down...")
+        retry_consumer.stop()
         consumer.stop()
         sys.exit(0)
     
@@ -16,6 +16,42 @@ PROCESSING_TIME = Histogram(
     buckets=[0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
 )
 
+BATCH_SIZE = Histogram(
+    'event_batch_size',
+    'Number of messages per consumed batch',
+    buckets=[1, 10, 50, 100, 250, 500, 1000, 2500, 5000]
+)
+
+BATCH_PROCESSING_TIME = Histogram(
+    'event_batch_processing_seconds',
+    'Time spent decoding, validating and dispatching a batch',
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+)
+
+RETRIES_SCHEDULED = Counter(
+    'event_retries_scheduled_total',
+    'Number of failed events re-produced to a retry tier topic',
+    ['topic']
+)
+
+PROCESSING_TIME_WINDOW = Gauge(
+    'event_processing_window_milliseconds',
+    'Event processing time percentiles over the rolling statistics window',
+    ['quantile']
+)
+
+CONSUMER_LAG = Gauge(
+    'event_consumer_lag',
+    'Messages between the consumer position and the high watermark',
+    ['topic', 'partition']
+)
+
+COMMIT_LATENCY = Histogram(
+    'event_consumer_commit_seconds',
+    'Time from issuing an offset commit to its acknowledgement',
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5]
+)
+
 DEAD_LETTER_QUEUE_SIZE = Gauge(
     'dead_letter_queue_size',
     'Number of messages in the dead letter queue'
@@ -52,6 +88,23 @@ def record_event_processed(event_type, success=True):
     EVENTS_PROCESSED.labels(event_type=event_type, status=status).inc()
 
 
+class _ProcessingTimer:
+    """Context manager that records processing time for an event type."""
+    
+    __slots__ = ('event_type', 'start')
+    
+    def __init__(self, event_type):
+        self.event_type = event_type
+        
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+        
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        duration = time.perf_counter() - self.start
+        PROCESSING_TIME.labels(event_type=self.event_type).observe(duration)
+
+
 def observe_processing_time(event_type):
     """Create a context manager to observe processing time.
     
@@ -61,16 +114,70 @@ def observe_processing_time(event_type):
     Returns:
         context manager that records processing time
     """
-    class Timer:
-        def __enter__(self):
-            self.start = time.time()
-            return self
-            
-        def __exit__(self, exc_type, exc_val, exc_tb):
-            duration = time.time() - self.start
-            PROCESSING_TIME.labels(event_type=event_type).observe(duration)
+    return _ProcessingTimer(event_type)
+
+
+def record_batch(size, duration):
+    """Record the size and processing latency of a consumed batch.
     
-    return Timer()
+    Args:
+        size: Number of messages in the batch
+        duration: Batch processing time in seconds
+    """
+    BATCH_SIZE.observe(size)
+    BATCH_PROCESSING_TIME.observe(duration)
+
+
+def record_retry_scheduled(topic):
+    """Record a failed event being scheduled on a retry tier topic.
+    
+    Args:
+        topic: Retry topic the event was produced to
+    """
+    RETRIES_SCHEDULED.labels(topic=topic).inc()
+
+
+def update_processing_window(snapshot):
+    """Publish rolling-window processing time percentiles.
+    
+    Args:
+        snapshot: RollingWindow snapshot in milliseconds
+    """
+    for quantile in ('p50', 'p95', 'p99'):
+        PROCESSING_TIME_WINDOW.labels(quantile=quantile).set(snapshot[quantile])
+
+
+def update_partition_lag(topic, partition, lag):
+    """Update the lag of an assigned partition.
+    
+    Args:
+        topic: Topic name
+        partition: Partition number
+        lag: Messages behind the high watermark
+    """
+    CONSUMER_LAG.labels(topic=topic, partition=str(partition)).set(lag)
+
+
+def remove_partition_lag(topic, partition):
+    """Stop reporting lag for a partition that is no longer assigned.
+    
+    Args:
+        topic: Topic name
+        partition: Partition number
+    """
+    try:
+        CONSUMER_LAG.remove(topic, str(partition))
+    except KeyError:
+        pass
+
+
+def observe_commit_latency(duration):
+    """Record the duration of an offset commit.
+    
+    Args:
+        duration: Commit time in seconds
+    """
+    COMMIT_LATENCY.observe(duration)
 
 
 def update_dlq_size(size):
@@ -0,0 +1,140 @@
+"""Delay-aware consumer for retry tier topics."""
+import logging
+import time
+from typing import Dict, Tuple
+
+from confluent_kafka import Consumer, KafkaError, KafkaException, TopicPartition
+
+from app.consumer import KafkaEventConsumer, RETRY_COUNT_HEADER, RETRY_DUE_HEADER, get_header
+
+logger = logging.getLogger(__name__)
+
+
+class RetryTopicConsumer:
+    """Consumes retry tier topics and re-dispatches messages once they are due.
+    
+    Messages in a tier topic all share the same delay, so they become due in offset
+    order. When the head of a partition is not due yet, the partition is paused and
+    rewound to that message instead of sleeping, which keeps the other tiers moving.
+    """
+    
+    def __init__(self, event_consumer: KafkaEventConsumer):
+        """Initialize retry topic consumer.
+        
+        Args:
+            event_consumer: Consumer whose handlers and retry policy are used
+        """
+        self.event_consumer = event_consumer
+        self.topics = [
+            retry_topic
+            for topic in event_consumer.topics
+            for retry_topic in event_consumer.retry_policy.get_retry_topics(topic)
+        ]
+        self.running = False
+        self.consumer = None
+        self._paused: Dict[Tuple[str, int], float] = {}  # Due time (epoch seconds) per paused partition
+        
+        self.config = dict(event_consumer.config)
+        self.config['group.id'] = f"{event_consumer.group_id}-retry"
+        # The main consumer's commit callback times its own commits and is not thread-safe
+        self.config.pop('on_commit', None)
+    
+    def start(self):
+        """Start consuming retry topics."""
+        try:
+            self.consumer = Consumer(self.config)
+            self.consumer.subscribe(self.topics, on_revoke=self._on_revoke)
+            logger.info(f"Subscribed to retry topics: {self.topics}")
+            
+            self.running = True
+            while self.running:
+                try:
+                    self._resume_due_partitions()
+                    
+                    msg = self.consumer.poll(timeout=self._poll_timeout())
+                    if msg is None:
+                        continue
+                    
+                    if msg.error():
+                        if msg.error().code() != KafkaError._PARTITION_EOF:
+                            logger.error(f"Retry consumer error: {msg.error()}")
+                        continue
+                    
+                    self._handle_message(msg)
+                
+                except KafkaException as e:
+                    logger.error(f"Kafka exception in retry consumer: {e}")
+                except Exception as e:
+                    logger.exception(f"Unexpected error while consuming retry messages: {e}")
+        
+        except Exception as e:
+            logger.exception(f"Failed to start retry consumer: {e}")
+        finally:
+            self.stop()
+    
+    def stop(self):
+        """Stop consuming retry topics."""
+        self.running = False
+        if self.consumer:
+            self.consumer.close()
+            self.consumer = None
+            self._paused.clear()
+            logger.info("Retry consumer stopped")
+    
+    def _handle_message(self, msg):
+        """Dispatch a retry message if it is due, otherwise pause its partition until it is.
+        
+        Args:
+            msg: Kafka message from a retry topic
+        """
+        due_ms = get_header(msg, RETRY_DUE_HEADER)
+        due = int(due_ms) / 1000 if due_ms else 0.0
+        
+        if due > time.time():
+            partition = TopicPartition(msg.topic(), msg.partition(), msg.offset())
+            self.consumer.pause([partition])
+            self.consumer.seek(partition)
+            self._paused[(msg.topic(), msg.partition())] = due
+            return
+        
+        retry_count = int(get_header(msg, RETRY_COUNT_HEADER) or 1)
+        event = self.event_consumer._decode_message(msg)
+        if event is not None:
+            event_type, parsed_event, value = event
+            self.event_consumer._dispatch_event(msg, event_type, parsed_event, value, retry_count)
+        
+        # A failure has been moved on to the next tier or the dead letter topic
+        self.event_consumer.flush_producer()
+        self.consumer.commit(msg)
+    
+    def _resume_due_partitions(self):
+        """Resume paused partitions whose head message is now due."""
+        if not self._paused:
+            return
+        
+        now = time.time()
+        due = [key for key, due_time in self._paused.items() if due_time <= now]
+        if due:
+            self.consumer.resume([TopicPartition(topic, partition) for topic, partition in due])
+            for key in due:
+                del self._paused[key]
+    
+    def _poll_timeout(self) -> float:
+        """Get how long to poll before the next paused partition becomes due.
+        
+        Returns:
+            Poll timeout in seconds
+        """
+        if not self._paused:
+            return 1.0
+        return max(0.0, min(1.0, min(self._paused.values()) - time.time()))
+    
+    def _on_revoke(self, consumer, partitions):
+        """Forget pause state for revoked partitions.
+        
+        Args:
+            consumer: Kafka consumer
+            partitions: Partitions being revoked
+        """
+        for partition in partitions:
+            self._paused.pop((partition.topic, partition.partition), None)
@@ -1,16 +1,25 @@
 """Schema registry and validators for Kafka messages."""
+import io
 import json
 import logging
 import os
-from typing import Any, Dict, Optional, Union
+import struct
+from typing import Any, Dict, Optional, Tuple, Type, TypeVar, Union
 
 import fastavro
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
 logger = logging.getLogger(__name__)
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
 # Constants
 SCHEMAS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schemas")
+REGISTRY_FILE = os.path.join(SCHEMAS_DIR, "registry.json")
+
+# Avro wire format: magic byte, big-endian schema ID, then the Avro binary body
+AVRO_MAGIC_BYTE = 0
+AVRO_HEADER = struct.Struct(">bI")
 
 
 def load_avro_schema(schema_file: str) -> Dict[str, Any]:
@@ -39,6 +48,7 @@ class SchemaValidator:
         """Initialize schema validator."""
         self._schemas = {}
         self._parsed_schemas = {}
+        self._adapters: Dict[str, TypeAdapter] = {}
         self._load_schemas()
     
     def _load_schemas(self):
@@ -84,6 +94,51 @@ class SchemaValidator:
             logger.error(f"Schema validation failed for {schema_name}: {e}")
             return False
     
+    def register_model(self, schema_name: str, model: Type[ModelT]):
+        """Compile a Pydantic model as the fast-path validator for a schema.
+        
+        The validator is built once, so later calls for the same schema are no-ops.
+        
+        Args:
+            schema_name: Schema name (without extension)
+            model: Pydantic model messages for the schema are validated into
+        """
+        if schema_name not in self._adapters:
+            self._adapters[schema_name] = TypeAdapter(model)
+            logger.info(f"Compiled fast-path validator for schema: {schema_name}")
+    
+    def validate_json(self, schema_name: str, data: Union[str, bytes]) -> Any:
+        """Parse and validate raw JSON in a single pass with the compiled validator.
+        
+        Args:
+            schema_name: Schema name (without extension)
+            data: Raw JSON message value
+            
+        Returns:
+            Validated model instance
+            
+        Raises:
+            KeyError: If no model has been registered for the schema
+            ValidationError: If the data is not valid JSON or does not match the model
+        """
+        return self._adapters[schema_name].validate_json(data)
+    
+    def validate_python(self, schema_name: str, data: Dict[str, Any]) -> Any:
+        """Validate an already decoded record with the compiled validator.
+        
+        Args:
+            schema_name: Schema name (without extension)
+            data: Decoded record, e.g. from an Avro payload
+            
+        Returns:
+            Validated model instance
+            
+        Raises:
+            KeyError: If no model has been registered for the schema
+            ValidationError: If the data does not match the model
+        """
+        return self._adapters[schema_name].validate_python(data)
+    
     def get_schema(self, schema_name: str) -> Optional[Dict[str, Any]]:
         """Get schema by name.
         
@@ -96,5 +151,86 @@ class SchemaValidator:
         return self._schemas.get(schema_name)
 
 
+class SchemaRegistry:
+    """Local, file-backed registry mapping schema IDs to Avro schemas.
+    
+    ``registry.json`` lists every schema version as ``{"id", "subject", "file"}``.
+    Payloads carry the writer's schema ID in a 5-byte header, in the same layout as
+    Confluent Schema Registry, and are decoded into the latest schema of the subject.
+    The producing services ship a copy of the same registry, which must stay in sync.
+    """
+    
+    def __init__(self, registry_file: str = REGISTRY_FILE):
+        """Initialize schema registry.
+        
+        Args:
+            registry_file: Path to the registry file
+        """
+        self._schemas: Dict[int, Tuple[str, Any]] = {}
+        self._latest: Dict[str, int] = {}
+        self._load(registry_file)
+    
+    def _load(self, registry_file: str):
+        """Load and parse every schema listed in the registry file."""
+        if not os.path.exists(registry_file):
+            logger.warning(f"Schema registry file not found: {registry_file}")
+            return
+        
+        with open(registry_file, "r") as f:
+            entries = json.load(f)["schemas"]
+        
+        for entry in entries:
+            schema_id = int(entry["id"])
+            subject = entry["subject"]
+            parsed = fastavro.parse_schema(load_avro_schema(entry["file"]))
+            self._schemas[schema_id] = (subject, parsed)
+            if schema_id > self._latest.get(subject, -1):
+                self._latest[subject] = schema_id
+        logger.info(f"Loaded {len(self._schemas)} schemas into the registry")
+    
+    @staticmethod
+    def is_avro(payload: bytes) -> bool:
+        """Check whether a payload uses the Avro wire format rather than JSON.
+        
+        Args:
+            payload: Raw message value
+            
+        Returns:
+            bool: True if the payload starts with the Avro magic byte
+        """
+        return len(payload) >= AVRO_HEADER.size and payload[0] == AVRO_MAGIC_BYTE
+    
+    def decode(self, payload: bytes) -> Tuple[str, Dict[str, Any]]:
+        """Decode an Avro wire format payload.
+        
+        Args:
+            payload: Raw message value
+            
+        Returns:
+            Subject of the writer schema and the decoded record
+            
+        Raises:
+            ValueError: If the schema ID is unknown or the payload is malformed
+        """
+        _, schema_id = AVRO_HEADER.unpack_from(payload)
+        if schema_id not in self._schemas:
+            raise ValueError(f"Unknown schema ID: {schema_id}")
+        
+        subject, writer_schema = self._schemas[schema_id]
+        latest_id = self._latest[subject]
+        reader_schema = self._schemas[latest_id][1] if latest_id != schema_id else None
+        
+        try:
+            record = fastavro.schemaless_reader(
+                io.BytesIO(payload[AVRO_HEADER.size:]), writer_schema, reader_schema
+            )
+        except Exception as e:
+            raise ValueError(f"Malformed Avro payload for schema ID {schema_id}: {e}") from e
+        return subject, record
+
+
 # Global schema validator instance
 validator = SchemaValidator()
+
+# Global schema registry instance
+registry = SchemaRegistry()
@@ -0,0 +1,75 @@
+"""Rolling-window latency statistics for the event consumer."""
+import math
+import threading
+import time
+from array import array
+from typing import Dict
+
+
+class RollingWindow:
+    """Fixed-size, array-backed reservoir of recent samples.
+    
+    Samples and their timestamps are written into preallocated ring buffers, so
+    recording is O(1) and allocation free. Percentiles are computed on read over the
+    samples from the last ``window_seconds``; under high throughput the window is
+    further limited to the most recent ``capacity`` samples.
+    """
+    
+    def __init__(self, window_seconds: float = 60.0, capacity: int = 4096):
+        """Initialize rolling window.
+        
+        Args:
+            window_seconds: Age in seconds after which samples are ignored
+            capacity: Maximum number of samples kept
+        """
+        self.window_seconds = window_seconds
+        self.capacity = capacity
+        self._values = array('d', bytes(8 * capacity))
+        self._times = array('d', bytes(8 * capacity))
+        self._index = 0
+        self._count = 0
+        self._lock = threading.Lock()
+    
+    def record(self, value: float):
+        """Record a sample.
+        
+        Args:
+            value: Sample value
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._values[self._index] = value
+            self._times[self._index] = now
+            self._index = (self._index + 1) % self.capacity
+            if self._count < self.capacity:
+                self._count += 1
+    
+    def snapshot(self) -> Dict[str, float]:
+        """Summarize the samples in the current window.
+        
+        Returns:
+            Sample count, average, max and p50/p95/p99 (all 0 for an empty window)
+        """
+        cutoff = time.monotonic() - self.window_seconds
+        with self._lock:
+            samples = sorted(
+                self._values[i] for i in range(self._count) if self._times[i] >= cutoff
+            )
+        
+        if not samples:
+            return {"count": 0, "avg": 0.0, "max": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0}
+        
+        return {
+            "count": len(samples),
+            "avg": sum(samples) / len(samples),
+            "max": samples[-1],
+            "p50": self._percentile(samples, 0.50),
+            "p95": self._percentile(samples, 0.95),
+            "p99": self._percentile(samples, 0.99),
+        }
+    
+    @staticmethod
+    def _percentile(samples, quantile: float) -> float:
+        """Nearest-rank percentile of sorted samples."""
+        rank = max(1, math.ceil(quantile * len(samples)))
+        return samples[rank - 1]
@@ -0,0 +1,130 @@
+from app.consumer import KafkaEventConsumer
+from app.dead_letter import DeadLetterQueue
+from app.schemas import EventProcessingResult
+
+USER_ID = "2f1c8c1e-4b1e-4d3c-9a51-1f0e6c1d2a3b"
+LOGIN_EVENT = {"event_type": "user_login", "user_id": USER_ID, "data": {"id": USER_ID, "email": "user@example.com"}}
+
+
+def _ids(queue):
+    return [entry["id"] for entry in queue.get_all()]
+
+
+def _reload(queue, storage_dir, max_size):
+    queue.close()
+    return DeadLetterQueue(max_size=max_size, storage_dir=storage_dir)
+
+
+def test_restart_keeps_entries_of_partial_segment(tmp_path):
+    queue = DeadLetterQueue(max_size=5, storage_dir=str(tmp_path))
+    for i in range(7):
+        queue.add({"n": i}, "failed")
+    
+    queue = _reload(queue, str(tmp_path), 5)
+    queue.add({"n": 7}, "failed")
+    queue = _reload(queue, str(tmp_path), 5)
+    
+    assert _ids(queue) == [4, 5, 6, 7, 8]
+
+
+def test_rollover_across_restarts_keeps_newest_entries(tmp_path):
+    next_id = 1
+    queue = DeadLetterQueue(max_size=5, storage_dir=str(tmp_path))
+    for adds in [3, 1, 4, 2, 6, 1]:
+        for _ in range(adds):
+            queue.add({"n": next_id}, "failed")
+            next_id += 1
+        queue = _reload(queue, str(tmp_path), 5)
+        assert _ids(queue) == list(range(max(1, next_id - 5), next_id))
+    
+    # Segments are pruned once newer segments cover max_size entries
+    assert len(list(tmp_path.iterdir())) <= 3
+
+
+def test_restart_after_torn_write(tmp_path):
+    queue = DeadLetterQueue(max_size=5, storage_dir=str(tmp_path))
+    queue.add({"n": 1}, "failed")
+    queue.close()
+    segment = next(tmp_path.iterdir())
+    with open(segment, "a") as f:
+        f.write('{"id": 2, "mess')
+    
+    queue = DeadLetterQueue(max_size=5, storage_dir=str(tmp_path))
+    queue.add({"n": 2}, "failed")
+    queue = _reload(queue, str(tmp_path), 5)
+    
+    assert [entry["message"] for entry in queue.get_all()] == [{"n": 1}, {"n": 2}]
+
+
+def test_removed_entries_stay_removed_after_restart(tmp_path):
+    queue = DeadLetterQueue(max_size=5, storage_dir=str(tmp_path))
+    for i in range(4):
+        queue.add({"n": i}, "failed")
+    queue.remove([2, 3])
+    
+    queue = _reload(queue, str(tmp_path), 5)
+    
+    assert _ids(queue) == [1, 4]
+
+
+def test_replay_removes_only_successful_entries(tmp_path):
+    consumer = KafkaEventConsumer(["user-events"], "test-group")
+    consumer.dead_letter_queue = DeadLetterQueue(max_size=10, storage_dir=str(tmp_path))
+    for i in range(4):
+        consumer.dead_letter_queue.add({"n": i}, "failed")
+    consumer._process_message = lambda msg: b'"n": 1' not in msg.value()
+    consumer.flush_producer = lambda: None
+    
+    succeeded = consumer.replay_dead_letters(consumer.dead_letter_queue.get_all(), 0)
+    
+    assert succeeded == 3
+    assert _ids(consumer.dead_letter_queue) == [2]
+
+
+def _failing_consumer(tmp_path, retry_recommended):
+    consumer = KafkaEventConsumer(["user-events"], "test-group")
+    consumer.dead_letter_queue = DeadLetterQueue(max_size=10, storage_dir=str(tmp_path))
+    consumer.register_handler("user_login", lambda event: EventProcessingResult(
+        success=False, message="failed", error="still failing", retry_recommended=retry_recommended
+    ))
+    consumer.produced = []
+    consumer._produce_copy = lambda msg, topic, headers: consumer.produced.append(topic)
+    consumer.flush_producer = lambda: None
+    return consumer
+
+
+def test_failed_replay_updates_entry_instead_of_adding_one(tmp_path):
+    consumer = _failing_consumer(tmp_path, retry_recommended=False)
+    consumer.dead_letter_queue.add({"foo": 1}, "Missing event_type field")
+    consumer.dead_letter_queue.add(LOGIN_EVENT, "failed")
+    
+    succeeded = consumer.replay_dead_letters(consumer.dead_letter_queue.get_all(), 0)
+    
+    assert succeeded == 0
+    assert _ids(consumer.dead_letter_queue) == [1, 2]
+    entry = consumer.dead_letter_queue.get_many([2])[0]
+    assert entry["error"] == "still failing"
+    assert entry["attempts"] == 2
+    
+    queue = _reload(consumer.dead_letter_queue, str(tmp_path), 10)
+    assert _ids(queue) == [1, 2]
+    assert queue.get_many([2])[0]["attempts"] == 2
+
+
+def test_replay_handed_to_retry_topic_is_removed(tmp_path):
+    consumer = _failing_consumer(tmp_path, retry_recommended=True)
+    consumer.dead_letter_queue.add(LOGIN_EVENT, "failed", {"topic": "user-events", "partition": 0, "offset": 5})
+    
+    succeeded = consumer.replay_dead_letters(consumer.dead_letter_queue.get_all(), 0)
+    
+    assert succeeded == 0
+    assert consumer.produced == ["user-events.retry.1s"]
+    assert len(consumer.dead_letter_queue) == 0
+
+
+def test_failed_ad_hoc_retry_is_dead_lettered(tmp_path):
+    consumer = _failing_consumer(tmp_path, retry_recommended=False)
+    
+    consumer.replay_dead_letters([{"id": 0, "message": LOGIN_EVENT}], 0, False)
+    
+    assert _ids(consumer.dead_letter_queue) == [1]
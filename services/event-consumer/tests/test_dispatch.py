@@ -0,0 +1,129 @@
+import threading
+import time
+import zlib
+
+from confluent_kafka import TopicPartition
+
+from app.consumer import KafkaEventConsumer
+from app.dispatch import KeyedWorkerPool, OffsetTracker
+
+
+def _track(tracker, offsets, topic="t", partition=0):
+    for offset in offsets:
+        tracker.track(topic, partition, offset)
+
+
+def test_out_of_order_completion_commits_contiguous_offsets():
+    tracker = OffsetTracker()
+    _track(tracker, [10, 11, 12, 13])
+    
+    tracker.complete("t", 0, 11)
+    tracker.complete("t", 0, 10)
+    tracker.complete("t", 0, 13)
+    
+    # 12 is still in flight, so 13 must not be committed past it
+    assert tracker.pop_committable() == {("t", 0): 12}
+    assert tracker.in_flight() == 2
+    
+    tracker.complete("t", 0, 12)
+    
+    assert tracker.pop_committable() == {("t", 0): 14}
+    assert tracker.in_flight() == 0
+
+
+def test_gap_at_low_water_mark_holds_back_commit():
+    tracker = OffsetTracker()
+    _track(tracker, [5, 6, 7])
+    _track(tracker, [0, 1], partition=1)
+    
+    tracker.complete("t", 0, 6)
+    tracker.complete("t", 0, 7)
+    tracker.complete("t", 1, 0)
+    
+    # Partitions advance independently
+    assert tracker.pop_committable() == {("t", 1): 1}
+    assert tracker.pop_committable() == {}
+    
+    tracker.complete("t", 0, 5)
+    
+    assert tracker.pop_committable() == {("t", 0): 8}
+
+
+def test_reset_forgets_revoked_partitions():
+    tracker = OffsetTracker()
+    _track(tracker, [0, 1])
+    _track(tracker, [0], partition=1)
+    tracker.complete("t", 0, 0)
+    tracker.complete("t", 0, 1)
+    
+    tracker.reset([("t", 0)])
+    
+    assert tracker.pop_committable() == {}
+    assert tracker.in_flight() == 1
+    
+    # Re-assigned and consumed again from the last committed offset
+    _track(tracker, [0])
+    tracker.complete("t", 0, 0)
+    
+    assert tracker.pop_committable() == {("t", 0): 1}
+
+
+def test_revoke_drops_uncommitted_offsets_of_revoked_partitions():
+    consumer = KafkaEventConsumer(["t"], "g")
+    consumer.worker_pool = KeyedWorkerPool(1)
+    consumer._pending_offsets = {("t", 0): 5, ("t", 1): 3}
+    _track(consumer.offset_tracker, [5, 6])
+    consumer.offset_tracker.complete("t", 0, 5)
+    
+    # Without a consumer the commit cannot happen, like a failed commit
+    consumer._on_revoke(None, [TopicPartition("t", 0)])
+    consumer._commit_pending_offsets()
+    
+    assert consumer._pending_offsets == {("t", 1): 3}
+    assert consumer.offset_tracker.in_flight() == 0
+
+
+def _keys_on_different_workers(num_workers):
+    keys = {}
+    for index in range(100):
+        key = f"user-{index}"
+        keys.setdefault(zlib.crc32(key.encode("utf-8")) % num_workers, key)
+    return list(keys.values())
+
+
+def test_tasks_with_the_same_key_run_in_submission_order():
+    pool = KeyedWorkerPool(4)
+    pool.start()
+    results = []
+    
+    def task(value):
+        # Earlier tasks sleep longer, so any parallelism within a key reorders them
+        time.sleep((20 - value) / 2000)
+        results.append(value)
+    
+    for value in range(20):
+        pool.submit("user-1", task, value)
+    pool.join()
+    pool.stop()
+    
+    assert results == list(range(20))
+
+
+def test_different_keys_run_in_parallel_and_errors_do_not_stop_workers():
+    pool = KeyedWorkerPool(2)
+    pool.start()
+    first, second = _keys_on_different_workers(2)
+    released = threading.Event()
+    done = []
+    
+    def fail():
+        raise RuntimeError("handler failed")
+    
+    pool.submit(first, fail)
+    # Blocks its worker until a task on the other worker has run
+    pool.submit(first, lambda: done.append(released.wait(5)))
+    pool.submit(second, released.set)
+    pool.join()
+    pool.stop()
+    
+    assert done == [True]
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -18,6 +18,23 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Create Base class
 Base = declarative_base()
 
+def add_missing_columns(bind, table):
+    """
+    Add columns of a model that its existing table lacks
+    
+    create_all only creates missing tables, and the service has no migrations,
+    so columns added to a model are added here at startup. New columns must be
+    nullable, since existing rows get no value
+    """
+    with bind.begin() as connection:
+        existing = {column["name"] for column in inspect(connection).get_columns(table.name)}
+        # Several instances may start at once; PostgreSQL can skip a column another one added
+        if_not_exists = "IF NOT EXISTS " if connection.dialect.name == "postgresql" else ""
+        for column in table.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(dialect=connection.dialect)
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {if_not_exists}{column.name} {column_type}"))
+
 # Dependency to get DB session
 def get_db():
     db = SessionLocal()
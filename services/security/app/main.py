@@ -1,15 +1,21 @@
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
+import asyncio
 import os
 from dotenv import load_dotenv
 
-from database import engine, get_db
+from database import add_missing_columns, engine, get_db
 import models
 from routers import threat_intelligence, user_behavior_analytics
+from prometheus_client import make_asgi_app
+from services.analysis_worker_pool import get_analysis_pool
+from services.login_anomaly_detector import get_login_detector
+from services.login_event_consumer import consume_login_events, consumer_enabled
 
 # Create database tables
 models.Base.metadata.create_all(bind=engine)
+add_missing_columns(engine, models.UserLoginEvent.__table__)
 
 # Load environment variables
 load_dotenv()
@@ -41,6 +47,24 @@ app.include_router(
     tags=["User Behavior Analytics"],
 )
 
+# Add Prometheus metrics endpoint
+app.mount("/metrics", make_asgi_app())
+
+@app.on_event("startup")
+async def start_login_detector():
+    """Start the analysis workers, anomaly detection checkpoints and the optional Kafka login feed"""
+    get_login_detector().start()
+    get_analysis_pool().start()
+    app.state.login_consumer = asyncio.create_task(consume_login_events()) if consumer_enabled() else None
+
+@app.on_event("shutdown")
+async def stop_login_detector():
+    """Stop the Kafka login feed, drain the analysis queue and flush buffered anomalies"""
+    if app.state.login_consumer is not None:
+        app.state.login_consumer.cancel()
+    await asyncio.to_thread(get_analysis_pool().stop)
+    await asyncio.to_thread(get_login_detector().stop)
+
 @app.get("/", tags=["Health Check"])
 def read_root():
     """Health check endpoint"""
@@ -0,0 +1,37 @@
+"""Prometheus metrics for the security service."""
+from prometheus_client import Counter, Gauge, Histogram
+
+# Define metrics
+ANALYSIS_QUEUE_DEPTH = Gauge(
+    'uba_analysis_queue_depth',
+    'Login events waiting for anomaly analysis'
+)
+
+ANALYSIS_QUEUE_CAPACITY = Gauge(
+    'uba_analysis_queue_capacity',
+    'Maximum number of login events that can wait for anomaly analysis'
+)
+
+ANALYSIS_EVENTS = Counter(
+    'uba_analysis_events_total',
+    'Login events handed to the analysis worker pool',
+    ['status']  # queued, dropped, processed, failed
+)
+
+ANALYSIS_QUEUE_WAIT = Histogram(
+    'uba_analysis_queue_wait_seconds',
+    'Time login events spend queued before analysis',
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+)
+
+ANALYSIS_LATENCY = Histogram(
+    'uba_analysis_seconds',
+    'Time spent analyzing one login event',
+    buckets=[0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1]
+)
+
+ANOMALY_BATCH_SIZE = Histogram(
+    'uba_anomaly_batch_size',
+    'Anomalies and baselines written per detector checkpoint',
+    buckets=[1, 10, 50, 100, 250, 500, 1000, 2500, 5000]
+)
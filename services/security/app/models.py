@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Float, JSON, Text
+from sqlalchemy import Column, Integer, String, DateTime, Date, Boolean, ForeignKey, Float, JSON, Text, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -14,7 +14,7 @@ class ThreatIndicator(Base):
     source = Column(String, index=True)  # Source of the indicator
     confidence = Column(Float, nullable=True)  # Confidence score if available
     description = Column(Text, nullable=True)  # Description of the threat
-    metadata = Column(JSON, nullable=True)  # Additional metadata
+    indicator_metadata = Column("metadata", JSON, nullable=True)  # Additional metadata; "metadata" is reserved by SQLAlchemy
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     
@@ -33,6 +33,7 @@ class UserLoginEvent(Base):
     country = Column(String, nullable=True)
     city = Column(String, nullable=True)
     timestamp = Column(DateTime, default=func.now())
+    ingested_at = Column(DateTime, default=datetime.datetime.now)  # Set by the service; timestamp may come from the client
     
     # Relationships can be added here if needed
 
@@ -52,6 +53,30 @@ class UserLoginBaseline(Base):
     
     # Relationships can be added here if needed
 
+class UserLoginDailyAggregate(Base):
+    """Model for per-user, per-day aggregates of successful logins that baselines are built from"""
+    __tablename__ = "user_login_daily_aggregates"
+    __table_args__ = (UniqueConstraint("user_id", "day", name="uq_user_login_daily_aggregates_user_day"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(String, index=True)
+    username = Column(String)
+    day = Column(Date, index=True)
+    login_count = Column(Integer, default=0)
+    ip_addresses = Column(JSON)  # Top IP addresses with approximate counts
+    countries = Column(JSON)  # Top countries with approximate counts
+    cities = Column(JSON)  # Top cities with approximate counts
+    hours = Column(JSON)  # Login counts by hour of day
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+class BaselineWatermark(Base):
+    """Model for tracking which login events have been folded into daily aggregates"""
+    __tablename__ = "baseline_watermarks"
+    
+    name = Column(String, primary_key=True)
+    last_event_id = Column(Integer, default=0)  # Highest login event ID folded so far
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
 class LoginAnomaly(Base):
     """Model for storing detected login anomalies"""
     __tablename__ = "login_anomalies"
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, status
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Request, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
@@ -7,13 +7,15 @@ from database import get_db
 import models
 import schemas
 from services import user_behavior_analytics_service
+from services.analysis_worker_pool import get_analysis_pool
+from services.login_event_import import import_login_events
+from services.login_anomaly_detector import LoginEvent
 
 router = APIRouter()
 
 @router.post("/login-events", response_model=schemas.UserLoginEvent, status_code=status.HTTP_201_CREATED)
 def record_login_event(
     login_event: schemas.UserLoginEventCreate,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """
@@ -22,15 +24,28 @@ def record_login_event(
     # Create the login event
     db_login_event = user_behavior_analytics_service.create_login_event(db, login_event)
     
-    # Analyze for anomalies in the background
-    background_tasks.add_task(
-        user_behavior_analytics_service.analyze_login_event,
-        db=db,
-        login_event_id=db_login_event.id
-    )
+    # Analyze for anomalies on the worker pool, from a snapshot since the session closes with the request
+    get_analysis_pool().submit(LoginEvent.from_model(db_login_event))
     
     return db_login_event
 
+@router.post("/login-events/bulk", response_model=schemas.LoginEventBulkResult)
+async def record_login_events_bulk(request: Request):
+    """
+    Record many login events and analyze them for anomalies
+    
+    The body is newline-delimited JSON (application/x-ndjson) or a JSON array of
+    login events, read as a stream and written in batches. Invalid records are
+    rejected individually and listed in the response.
+    """
+    try:
+        return await import_login_events(request.stream(), request.headers.get("content-type", ""))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
 @router.get("/login-events", response_model=List[schemas.UserLoginEvent])
 def get_login_events(
     user_id: Optional[str] = None,
@@ -110,15 +125,13 @@ def resolve_anomaly(
 @router.post("/update-baselines", status_code=status.HTTP_202_ACCEPTED)
 def update_user_baselines(
     background_tasks: BackgroundTasks,
-    user_id: Optional[str] = None,
-    db: Session = Depends(get_db)
+    user_id: Optional[str] = None
 ):
     """
     Trigger an update of user login behavior baselines
     """
     background_tasks.add_task(
-        user_behavior_analytics_service.update_user_baselines,
-        db=db,
+        user_behavior_analytics_service.run_baseline_update,
         user_id=user_id
     )
     
@@ -1,6 +1,9 @@
 from pydantic import BaseModel, Field, validator
 from typing import Optional, List, Dict, Any, Union
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+
+# How far ahead of the server clock an imported login timestamp may be
+MAX_LOGIN_TIMESTAMP_SKEW = timedelta(minutes=5)
 
 # Threat Intelligence Schemas
 class ThreatIndicatorBase(BaseModel):
@@ -15,6 +18,8 @@ class ThreatIndicatorCreate(ThreatIndicatorBase):
     pass
 
 class ThreatIndicator(ThreatIndicatorBase):
+    # Read from the model's indicator_metadata attribute; "metadata" is reserved by SQLAlchemy
+    metadata: Optional[Dict[str, Any]] = Field(None, validation_alias="indicator_metadata", description="Additional metadata")
     id: int
     created_at: datetime
     updated_at: datetime
@@ -43,6 +48,32 @@ class UserLoginEventBase(BaseModel):
 class UserLoginEventCreate(UserLoginEventBase):
     pass
 
+class UserLoginEventImport(UserLoginEventBase):
+    timestamp: Optional[datetime] = Field(None, description="When the login happened (UTC unless an offset is given); defaults to the time of import")
+    
+    @validator("timestamp")
+    def normalize_timestamp(cls, v):
+        if v is None:
+            return v
+        # Login timestamps are stored and compared as naive UTC
+        if v.tzinfo is not None:
+            v = v.astimezone(timezone.utc).replace(tzinfo=None)
+        if v > datetime.now(timezone.utc).replace(tzinfo=None) + MAX_LOGIN_TIMESTAMP_SKEW:
+            raise ValueError("timestamp is in the future")
+        return v
+
+class LoginEventImportError(BaseModel):
+    index: int = Field(..., description="Position of the record in the request body, starting at 0")
+    error: str = Field(..., description="Why the record was rejected")
+
+class LoginEventBulkResult(BaseModel):
+    received: int = Field(..., description="Records read from the request body")
+    inserted: int = Field(..., description="Login events recorded")
+    rejected: int = Field(..., description="Records rejected as invalid")
+    queued_for_analysis: int = Field(..., description="Recorded events queued for anomaly analysis")
+    dropped_from_analysis: int = Field(0, description="Recorded events not analyzed because the analysis queue was full")
+    errors: List[LoginEventImportError] = Field(default_factory=list, description="The first rejected records")
+
 class UserLoginEvent(UserLoginEventBase):
     id: int
     timestamp: datetime
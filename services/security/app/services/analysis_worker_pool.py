@@ -0,0 +1,177 @@
+import os
+import queue
+import logging
+import threading
+import time
+from typing import Iterable, List, Optional
+
+from metrics import (
+    ANALYSIS_EVENTS,
+    ANALYSIS_LATENCY,
+    ANALYSIS_QUEUE_CAPACITY,
+    ANALYSIS_QUEUE_DEPTH,
+    ANALYSIS_QUEUE_WAIT,
+    ANOMALY_BATCH_SIZE,
+)
+from services.login_anomaly_detector import LoginAnomalyDetector, LoginEvent, get_login_detector
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+UBA_ANALYSIS_WORKERS = int(os.getenv("UBA_ANALYSIS_WORKERS", "4"))
+UBA_ANALYSIS_QUEUE_SIZE = int(os.getenv("UBA_ANALYSIS_QUEUE_SIZE", "10000"))
+# How long a full queue may block ingestion before the event is dropped
+UBA_ANALYSIS_ENQUEUE_TIMEOUT_SECONDS = float(os.getenv("UBA_ANALYSIS_ENQUEUE_TIMEOUT_SECONDS", "0.05"))
+# Buffered anomalies that trigger a checkpoint from a worker instead of waiting for the timer
+UBA_ANALYSIS_INSERT_BATCH_SIZE = int(os.getenv("UBA_ANALYSIS_INSERT_BATCH_SIZE", "500"))
+
+# Queued to stop a worker
+_STOP = None
+
+class AnalysisWorkerPool:
+    """
+    Worker threads that run login events through the anomaly detector.
+    
+    Each worker has its own bounded queue and events are routed by user_id, so
+    a user's events are analyzed in order. The detector opens its own database
+    sessions, so nothing depends on the request that recorded the event. When
+    a queue is full, submit blocks for at most enqueue_timeout and then drops
+    the event, keeping ingestion latency bounded.
+    """
+    
+    def __init__(
+        self,
+        workers: int = UBA_ANALYSIS_WORKERS,
+        queue_size: int = UBA_ANALYSIS_QUEUE_SIZE,
+        enqueue_timeout: float = UBA_ANALYSIS_ENQUEUE_TIMEOUT_SECONDS,
+        insert_batch_size: int = UBA_ANALYSIS_INSERT_BATCH_SIZE,
+        detector: Optional[LoginAnomalyDetector] = None
+    ):
+        self.enqueue_timeout = enqueue_timeout
+        self.insert_batch_size = insert_batch_size
+        self.detector = detector or get_login_detector()
+        self._queues: List[queue.Queue] = [
+            queue.Queue(maxsize=max(1, queue_size // workers)) for _ in range(workers)
+        ]
+        self._threads: List[threading.Thread] = []
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+        
+        ANALYSIS_QUEUE_CAPACITY.set(sum(q.maxsize for q in self._queues))
+        ANALYSIS_QUEUE_DEPTH.set_function(self.depth)
+    
+    def depth(self) -> int:
+        """
+        Number of events waiting for analysis
+        """
+        return sum(q.qsize() for q in self._queues)
+    
+    def submit(self, login_event: LoginEvent) -> bool:
+        """
+        Queue a login event for analysis; returns False if it was dropped
+        """
+        return self._put(login_event, self.enqueue_timeout)
+    
+    def submit_many(self, login_events: Iterable[LoginEvent]) -> int:
+        """
+        Queue login events for analysis; returns how many were accepted
+        
+        The whole batch waits at most enqueue_timeout for queue space, so once
+        that has passed, events that do not fit are dropped without waiting.
+        """
+        deadline = time.perf_counter() + self.enqueue_timeout
+        accepted = 0
+        for login_event in login_events:
+            if self._put(login_event, deadline - time.perf_counter()):
+                accepted += 1
+        return accepted
+    
+    def _put(self, login_event: LoginEvent, timeout: float) -> bool:
+        work_queue = self._queues[hash(login_event.user_id) % len(self._queues)]
+        try:
+            if timeout > 0:
+                work_queue.put((login_event, time.perf_counter()), timeout=timeout)
+            else:
+                work_queue.put_nowait((login_event, time.perf_counter()))
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+                dropped = self.dropped
+            ANALYSIS_EVENTS.labels(status="dropped").inc()
+            # Log the first drop and then every 1000th, not every event of an overload
+            if dropped % 1000 == 1:
+                logger.warning(f"Analysis queue full, dropped login event {login_event.id} ({dropped} dropped so far)")
+            return False
+        
+        ANALYSIS_EVENTS.labels(status="queued").inc()
+        return True
+    
+    def _work(self, work_queue: queue.Queue):
+        while True:
+            item = work_queue.get()
+            if item is _STOP:
+                work_queue.task_done()
+                return
+            
+            login_event, enqueued_at = item
+            started_at = time.perf_counter()
+            ANALYSIS_QUEUE_WAIT.observe(started_at - enqueued_at)
+            try:
+                self.detector.process(login_event)
+                ANALYSIS_EVENTS.labels(status="processed").inc()
+            except Exception as e:
+                ANALYSIS_EVENTS.labels(status="failed").inc()
+                logger.error(f"Error analyzing login event {login_event.id}: {str(e)}")
+            finally:
+                ANALYSIS_LATENCY.observe(time.perf_counter() - started_at)
+                work_queue.task_done()
+            
+            if self.detector.pending_count() >= self.insert_batch_size:
+                self.checkpoint()
+    
+    def checkpoint(self) -> int:
+        """
+        Write the detector's buffered anomalies and record the batch size
+        """
+        written = self.detector.checkpoint()
+        if written:
+            ANOMALY_BATCH_SIZE.observe(written)
+        return written
+    
+    def start(self):
+        """
+        Start the worker threads
+        """
+        if self._threads:
+            return
+        for index, work_queue in enumerate(self._queues):
+            thread = threading.Thread(target=self._work, args=(work_queue,), name=f"uba-analysis-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+    
+    def stop(self):
+        """
+        Analyze everything already queued, then stop the workers
+        """
+        if not self._threads:
+            return
+        for work_queue in self._queues:
+            work_queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self.checkpoint()
+
+_pool: Optional[AnalysisWorkerPool] = None
+_pool_lock = threading.Lock()
+
+def get_analysis_pool() -> AnalysisWorkerPool:
+    """
+    Get the process-wide analysis worker pool
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = AnalysisWorkerPool()
+    return _pool
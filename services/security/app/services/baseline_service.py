@@ -0,0 +1,240 @@
+import os
+import logging
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+import models
+from services.login_anomaly_detector import get_login_detector
+from services.top_k import TopK
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+UBA_BASELINE_WINDOW_DAYS = int(os.getenv("UBA_BASELINE_WINDOW_DAYS", "30"))
+# Items tracked per dimension in each daily aggregate
+UBA_AGGREGATE_TOP_K = int(os.getenv("UBA_AGGREGATE_TOP_K", "32"))
+UBA_BASELINE_EVENT_BATCH_SIZE = int(os.getenv("UBA_BASELINE_EVENT_BATCH_SIZE", "5000"))
+UBA_BASELINE_USER_BATCH_SIZE = int(os.getenv("UBA_BASELINE_USER_BATCH_SIZE", "500"))
+# Events newer than this may still have lower-ID transactions in flight, so they wait for the next run
+UBA_BASELINE_SETTLE_SECONDS = int(os.getenv("UBA_BASELINE_SETTLE_SECONDS", "60"))
+
+WATERMARK_NAME = "login_baselines"
+
+# Baseline sizes
+BASELINE_IP_ADDRESSES = 10
+BASELINE_COUNTRIES = 5
+BASELINE_CITIES = 10
+
+class DayBucket:
+    """
+    Successful logins of one user on one day, as folded from a batch of events
+    """
+    
+    def __init__(self, username: str):
+        self.username = username
+        self.login_count = 0
+        self.ip_addresses: Counter = Counter()
+        self.countries: Counter = Counter()
+        self.cities: Counter = Counter()
+        self.hours: Counter = Counter()
+    
+    def add(self, ip_address: Optional[str], country: Optional[str], city: Optional[str], timestamp: datetime):
+        self.login_count += 1
+        if ip_address:
+            self.ip_addresses[ip_address] += 1
+        if country:
+            self.countries[country] += 1
+        if city:
+            self.cities[city] += 1
+        self.hours[str(timestamp.hour)] += 1
+
+def _get_watermark(db: Session) -> models.BaselineWatermark:
+    """
+    Get the watermark row, locked so that concurrent refreshes do not fold events twice
+    """
+    watermark = db.query(models.BaselineWatermark).filter(
+        models.BaselineWatermark.name == WATERMARK_NAME
+    ).with_for_update().first()
+    if not watermark:
+        watermark = models.BaselineWatermark(name=WATERMARK_NAME, last_event_id=0)
+        db.add(watermark)
+        db.flush()
+    return watermark
+
+def _merge_buckets(db: Session, buckets: Dict[Tuple[str, date], DayBucket]):
+    """
+    Add folded buckets to their daily aggregate rows, creating missing rows
+    """
+    user_ids = {user_id for user_id, _ in buckets}
+    days = {day for _, day in buckets}
+    aggregates = {
+        (aggregate.user_id, aggregate.day): aggregate
+        for aggregate in db.query(models.UserLoginDailyAggregate).filter(
+            models.UserLoginDailyAggregate.user_id.in_(user_ids),
+            models.UserLoginDailyAggregate.day.in_(days)
+        )
+    }
+    
+    for (user_id, day), bucket in buckets.items():
+        aggregate = aggregates.get((user_id, day))
+        if not aggregate:
+            aggregate = models.UserLoginDailyAggregate(
+                user_id=user_id,
+                day=day,
+                login_count=0,
+                ip_addresses={},
+                countries={},
+                cities={},
+                hours={}
+            )
+            db.add(aggregate)
+        
+        # JSON columns only detect reassignment, so always assign new dicts
+        aggregate.username = bucket.username
+        aggregate.login_count += bucket.login_count
+        aggregate.ip_addresses = TopK(UBA_AGGREGATE_TOP_K, aggregate.ip_addresses).update(bucket.ip_addresses).counts
+        aggregate.countries = TopK(UBA_AGGREGATE_TOP_K, aggregate.countries).update(bucket.countries).counts
+        aggregate.cities = TopK(UBA_AGGREGATE_TOP_K, aggregate.cities).update(bucket.cities).counts
+        aggregate.hours = dict(Counter(aggregate.hours) + bucket.hours)
+
+def fold_new_login_events(db: Session, batch_size: int = UBA_BASELINE_EVENT_BATCH_SIZE) -> Set[str]:
+    """
+    Fold successful login events past the watermark into daily aggregates
+    
+    Returns the IDs of the users whose aggregates changed.
+    """
+    changed_users: Set[str] = set()
+    settled_before = datetime.now() - timedelta(seconds=UBA_BASELINE_SETTLE_SECONDS)
+    
+    while True:
+        watermark = _get_watermark(db)
+        events = db.query(
+            models.UserLoginEvent.id,
+            models.UserLoginEvent.user_id,
+            models.UserLoginEvent.username,
+            models.UserLoginEvent.ip_address,
+            models.UserLoginEvent.country,
+            models.UserLoginEvent.city,
+            models.UserLoginEvent.timestamp,
+            models.UserLoginEvent.ingested_at
+        ).filter(
+            models.UserLoginEvent.id > watermark.last_event_id,
+            models.UserLoginEvent.success == True
+        ).order_by(models.UserLoginEvent.id).limit(batch_size).all()
+        
+        buckets: Dict[Tuple[str, date], DayBucket] = {}
+        last_event_id = watermark.last_event_id
+        for event_id, user_id, username, ip_address, country, city, timestamp, ingested_at in events:
+            # Settle on the service's insert time; imported timestamps can be arbitrarily old or new.
+            # Rows written before ingested_at existed have it unset and are long settled.
+            if ingested_at is not None and ingested_at >= settled_before:
+                # Stop at the first unsettled event so nothing behind it is skipped
+                break
+            if timestamp is None:
+                last_event_id = event_id
+                continue
+            bucket = buckets.get((user_id, timestamp.date()))
+            if bucket is None:
+                bucket = buckets[(user_id, timestamp.date())] = DayBucket(username)
+            bucket.add(ip_address, country, city, timestamp)
+            last_event_id = event_id
+        
+        if last_event_id == watermark.last_event_id:
+            # Nothing to fold; release the watermark lock
+            db.commit()
+            break
+        
+        _merge_buckets(db, buckets)
+        watermark.last_event_id = last_event_id
+        db.commit()
+        changed_users.update(user_id for user_id, _ in buckets)
+        logger.info(f"Folded login events up to id {last_event_id} into {len(buckets)} daily aggregates")
+        
+        if len(events) < batch_size:
+            break
+    
+    return changed_users
+
+def _chunks(items: List[str], size: int) -> Iterable[List[str]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def rebuild_baselines(db: Session, user_ids: Iterable[str], window_days: int = UBA_BASELINE_WINDOW_DAYS) -> int:
+    """
+    Rebuild the baselines of the given users from their daily aggregates
+    
+    Users without logins in the window keep their current baseline.
+    Returns the number of baselines written.
+    """
+    since = (datetime.now() - timedelta(days=window_days)).date()
+    updated = 0
+    
+    for batch in _chunks(sorted(set(user_ids)), UBA_BASELINE_USER_BATCH_SIZE):
+        try:
+            aggregates = defaultdict(list)
+            for aggregate in db.query(models.UserLoginDailyAggregate).filter(
+                models.UserLoginDailyAggregate.user_id.in_(batch),
+                models.UserLoginDailyAggregate.day >= since
+            ).order_by(models.UserLoginDailyAggregate.day):
+                aggregates[aggregate.user_id].append(aggregate)
+            
+            baselines = {
+                baseline.user_id: baseline
+                for baseline in db.query(models.UserLoginBaseline).filter(
+                    models.UserLoginBaseline.user_id.in_(batch)
+                )
+            }
+            
+            for uid, days in aggregates.items():
+                ip_addresses = TopK(UBA_AGGREGATE_TOP_K)
+                countries = TopK(UBA_AGGREGATE_TOP_K)
+                cities = TopK(UBA_AGGREGATE_TOP_K)
+                hour_counts: Counter = Counter()
+                day_counts: Counter = Counter()
+                for aggregate in days:
+                    ip_addresses.update(aggregate.ip_addresses or {})
+                    countries.update(aggregate.countries or {})
+                    cities.update(aggregate.cities or {})
+                    hour_counts.update(aggregate.hours or {})
+                    day_counts[str(aggregate.day.weekday())] += aggregate.login_count
+                
+                baseline = baselines.get(uid)
+                if not baseline:
+                    baseline = models.UserLoginBaseline(user_id=uid)
+                    db.add(baseline)
+                
+                # Days are in ascending order, so the last one has the most recent username
+                baseline.username = days[-1].username
+                baseline.common_ip_addresses = ip_addresses.top(BASELINE_IP_ADDRESSES)
+                baseline.common_countries = countries.top(BASELINE_COUNTRIES)
+                baseline.common_cities = cities.top(BASELINE_CITIES)
+                baseline.common_times = dict(hour_counts)
+                baseline.common_days = dict(day_counts)
+                baseline.last_updated = datetime.now()
+            
+            db.commit()
+        except Exception as e:
+            logger.error(f"Error updating baselines for {len(batch)} users: {str(e)}")
+            db.rollback()
+            continue
+        
+        detector = get_login_detector()
+        for uid in aggregates:
+            detector.invalidate(uid)
+        updated += len(aggregates)
+    
+    return updated
+
+def prune_daily_aggregates(db: Session, window_days: int = UBA_BASELINE_WINDOW_DAYS) -> int:
+    """
+    Delete daily aggregates that have left the baseline window
+    """
+    since = (datetime.now() - timedelta(days=window_days)).date()
+    deleted = db.query(models.UserLoginDailyAggregate).filter(
+        models.UserLoginDailyAggregate.day < since
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
@@ -0,0 +1,170 @@
+import os
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+# Optional GeoIP service
+try:
+    import geoip2.database
+    import geoip2.errors
+    import maxminddb
+    GEOIP_AVAILABLE = True
+except ImportError:
+    logger.warning("GeoIP library not available. Geolocation will be disabled.")
+    GEOIP_AVAILABLE = False
+
+GEOIP_DB_PATH = os.getenv("GEOIP_DB_PATH", "./GeoLite2-City.mmdb")
+GEOIP_CACHE_SIZE = int(os.getenv("GEOIP_CACHE_SIZE", "65536"))
+GEOIP_RELOAD_INTERVAL_SECONDS = float(os.getenv("GEOIP_RELOAD_INTERVAL_SECONDS", "60"))
+
+# (country, city) for an IP address
+Location = Tuple[Optional[str], Optional[str]]
+UNKNOWN_LOCATION: Location = (None, None)
+
+# File signature before the first check, distinct from a missing file (None)
+_UNCHECKED = (-1, -1, -1)
+
+class GeoIPEnricher:
+    """
+    Process-wide GeoIP lookups for login enrichment.
+    
+    The database is opened once and memory-mapped, so lookups share the OS
+    page cache instead of re-reading the file. Results (including misses) are
+    kept in an LRU cache. The file is re-checked at most every reload_interval
+    seconds and reopened when it changes, which also clears the cache.
+    """
+    
+    def __init__(
+        self,
+        db_path: str = GEOIP_DB_PATH,
+        cache_size: int = GEOIP_CACHE_SIZE,
+        reload_interval: float = GEOIP_RELOAD_INTERVAL_SECONDS
+    ):
+        self.db_path = db_path
+        self.cache_size = cache_size
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._signature: Optional[Tuple[int, int, int]] = _UNCHECKED
+        self._next_check = 0.0
+        # Reader and its cached lookup are swapped together on reload
+        self._reader = None
+        self._lookup: Callable[[str], Location] = lambda ip_address: UNKNOWN_LOCATION
+        self._maybe_reload()
+    
+    def _file_signature(self) -> Optional[Tuple[int, int, int]]:
+        """
+        Identify the current database file, or None if it does not exist
+        """
+        try:
+            stat = os.stat(self.db_path)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    
+    def _maybe_reload(self):
+        """
+        Reopen the database if the file changed since it was last opened
+        """
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        
+        with self._lock:
+            if now < self._next_check:
+                return
+            self._next_check = now + self.reload_interval
+            
+            signature = self._file_signature()
+            if signature == self._signature:
+                return
+            
+            if signature is None:
+                logger.warning(f"GeoIP database not found at {self.db_path}. Geolocation will be disabled.")
+                reader = None
+                lookup = lambda ip_address: UNKNOWN_LOCATION
+            else:
+                try:
+                    # MODE_AUTO memory-maps the file (through the C extension when installed)
+                    reader = geoip2.database.Reader(self.db_path, mode=maxminddb.MODE_AUTO)
+                except (OSError, ValueError, maxminddb.InvalidDatabaseError) as e:
+                    # Keep serving from the previous database, e.g. while the file is being replaced
+                    logger.error(f"Error opening GeoIP database {self.db_path}: {str(e)}")
+                    return
+                lookup = lru_cache(maxsize=self.cache_size)(self._city_lookup(reader))
+                logger.info(f"Loaded GeoIP database {self.db_path}")
+            
+            # The previous reader is not closed here since other threads may still be
+            # using it; its memory map is released once the last reference is dropped
+            self._reader, self._lookup = reader, lookup
+            self._signature = signature
+    
+    @staticmethod
+    def _city_lookup(reader) -> Callable[[str], Location]:
+        """
+        Build the uncached lookup function for a reader
+        """
+        def city(ip_address: str) -> Location:
+            try:
+                response = reader.city(ip_address)
+            except (geoip2.errors.AddressNotFoundError, ValueError):
+                # Unknown or malformed addresses are cached as misses too
+                return UNKNOWN_LOCATION
+            return (response.country.name, response.city.name)
+        
+        return city
+    
+    def enrich(self, ip_address: str) -> Location:
+        """
+        Get the country and city of an IP address
+        """
+        self._maybe_reload()
+        try:
+            return self._lookup(ip_address)
+        except Exception as e:
+            logger.warning(f"Error getting geolocation for IP {ip_address}: {str(e)}")
+            return UNKNOWN_LOCATION
+    
+    def enrich_many(self, ip_addresses: Iterable[str]) -> Dict[str, Location]:
+        """
+        Get the country and city of many IP addresses, looking each distinct address up once
+        """
+        self._maybe_reload()
+        lookup = self._lookup
+        locations: Dict[str, Location] = {}
+        for ip_address in ip_addresses:
+            if ip_address in locations or not ip_address:
+                continue
+            try:
+                locations[ip_address] = lookup(ip_address)
+            except Exception as e:
+                logger.warning(f"Error getting geolocation for IP {ip_address}: {str(e)}")
+                locations[ip_address] = UNKNOWN_LOCATION
+        return locations
+    
+    def cache_info(self):
+        """
+        Get hit/miss statistics of the lookup cache
+        """
+        lookup = self._lookup
+        return lookup.cache_info() if hasattr(lookup, "cache_info") else None
+
+_enricher: Optional[GeoIPEnricher] = None
+_enricher_lock = threading.Lock()
+
+def get_geoip_enricher() -> Optional[GeoIPEnricher]:
+    """
+    Get the process-wide GeoIP enricher, or None if geoip2 is not installed
+    """
+    global _enricher
+    if not GEOIP_AVAILABLE:
+        return None
+    if _enricher is None:
+        with _enricher_lock:
+            if _enricher is None:
+                _enricher = GeoIPEnricher()
+    return _enricher
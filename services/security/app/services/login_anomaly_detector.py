@@ -0,0 +1,410 @@
+import os
+import logging
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func
+
+import models
+from database import SessionLocal
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+LOGIN_DETECTOR_SHARDS = int(os.getenv("LOGIN_DETECTOR_SHARDS", "16"))
+LOGIN_DETECTOR_MAX_USERS = int(os.getenv("LOGIN_DETECTOR_MAX_USERS", "100000"))
+LOGIN_DETECTOR_CHECKPOINT_SECONDS = float(os.getenv("LOGIN_DETECTOR_CHECKPOINT_SECONDS", "5"))
+
+# Detection rules
+BRUTE_FORCE_WINDOW = timedelta(hours=1)
+BRUTE_FORCE_THRESHOLD = 5
+MIN_TRAVEL_HOURS = 4
+UNUSUAL_HOUR_MIN_LOGINS = 3
+
+class LoginEvent(NamedTuple):
+    """
+    Detached snapshot of a persisted login event
+    """
+    id: int
+    user_id: str
+    username: str
+    success: bool
+    ip_address: Optional[str]
+    country: Optional[str]
+    city: Optional[str]
+    timestamp: datetime
+    
+    @classmethod
+    def from_model(cls, login_event: models.UserLoginEvent) -> "LoginEvent":
+        return cls(
+            id=login_event.id,
+            user_id=login_event.user_id,
+            username=login_event.username,
+            success=login_event.success,
+            ip_address=login_event.ip_address,
+            country=login_event.country,
+            city=login_event.city,
+            timestamp=login_event.timestamp
+        )
+
+class Baseline(NamedTuple):
+    """
+    The parts of a user's login baseline the rules check against
+    """
+    ip_addresses: FrozenSet[str]
+    countries: FrozenSet[str]
+    cities: FrozenSet[str]
+    hours: Dict[str, int]
+    
+    @classmethod
+    def from_model(cls, baseline: models.UserLoginBaseline) -> "Baseline":
+        return cls(
+            ip_addresses=frozenset(baseline.common_ip_addresses or []),
+            countries=frozenset(baseline.common_countries or []),
+            cities=frozenset(baseline.common_cities or []),
+            hours=dict(baseline.common_times or {})
+        )
+
+class UserState:
+    """
+    Everything the rules need to know about one user
+    """
+    __slots__ = ("baseline", "failures", "last_brute_force", "last_success")
+    
+    def __init__(self):
+        self.baseline: Optional[Baseline] = None
+        # Timestamps of failed logins inside the brute force window
+        self.failures: Deque[datetime] = deque()
+        self.last_brute_force: Optional[datetime] = None
+        # (country, city, timestamp) of the latest successful login
+        self.last_success: Optional[Tuple[Optional[str], Optional[str], datetime]] = None
+
+class _Shard:
+    """
+    LRU of user states guarded by one lock
+    """
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.states: "OrderedDict[str, UserState]" = OrderedDict()
+    
+    def get(self, user_id: str) -> Optional[UserState]:
+        state = self.states.get(user_id)
+        if state is not None:
+            self.states.move_to_end(user_id)
+        return state
+    
+    def put(self, user_id: str, state: UserState) -> UserState:
+        # Keep the state another thread may have loaded meanwhile
+        current = self.states.setdefault(user_id, state)
+        if len(self.states) > self.capacity:
+            self.states.popitem(last=False)
+        return current
+
+class LoginAnomalyDetector:
+    """
+    Streaming login anomaly detection over in-memory per-user state.
+    
+    State is sharded by user_id and loaded from the database the first time a
+    user is seen (or after being evicted), so evaluating an event costs O(1)
+    and no queries. Detected anomalies and new baselines are buffered and
+    written in one transaction per checkpoint. Feed events in order per user,
+    e.g. from a Kafka topic keyed by user_id.
+    """
+    
+    def __init__(
+        self,
+        shards: int = LOGIN_DETECTOR_SHARDS,
+        max_users: int = LOGIN_DETECTOR_MAX_USERS,
+        checkpoint_interval: float = LOGIN_DETECTOR_CHECKPOINT_SECONDS,
+        session_factory=SessionLocal
+    ):
+        self._shards = [_Shard(max(1, max_users // shards)) for _ in range(shards)]
+        self.checkpoint_interval = checkpoint_interval
+        self._session_factory = session_factory
+        self._pending_lock = threading.Lock()
+        self._pending_anomalies: List[Dict[str, Any]] = []
+        self._pending_baselines: Dict[str, Dict[str, Any]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def _shard(self, user_id: str) -> _Shard:
+        return self._shards[hash(user_id) % len(self._shards)]
+    
+    def _load_state(self, login_event: LoginEvent) -> UserState:
+        """
+        Rebuild a user's state from the database
+        """
+        state = UserState()
+        window_start = login_event.timestamp - BRUTE_FORCE_WINDOW
+        db = self._session_factory()
+        try:
+            baseline = db.query(models.UserLoginBaseline).filter(
+                models.UserLoginBaseline.user_id == login_event.user_id
+            ).first()
+            if baseline:
+                state.baseline = Baseline.from_model(baseline)
+            
+            previous_login = db.query(
+                models.UserLoginEvent.country,
+                models.UserLoginEvent.city,
+                models.UserLoginEvent.timestamp
+            ).filter(
+                models.UserLoginEvent.user_id == login_event.user_id,
+                models.UserLoginEvent.success == True,
+                models.UserLoginEvent.id != login_event.id,
+                models.UserLoginEvent.timestamp < login_event.timestamp
+            ).order_by(models.UserLoginEvent.timestamp.desc()).first()
+            if previous_login:
+                state.last_success = tuple(previous_login)
+            
+            # Only events older than this one; later ones are still to be processed
+            failures = db.query(models.UserLoginEvent.timestamp).filter(
+                models.UserLoginEvent.user_id == login_event.user_id,
+                models.UserLoginEvent.success == False,
+                models.UserLoginEvent.id < login_event.id,
+                models.UserLoginEvent.timestamp >= window_start
+            ).order_by(models.UserLoginEvent.timestamp).all()
+            state.failures.extend(timestamp for (timestamp,) in failures)
+            
+            state.last_brute_force = db.query(func.max(models.LoginAnomaly.timestamp)).filter(
+                models.LoginAnomaly.user_id == login_event.user_id,
+                models.LoginAnomaly.anomaly_type == "brute_force",
+                models.LoginAnomaly.timestamp >= window_start
+            ).scalar()
+        finally:
+            db.close()
+        return state
+    
+    def process(self, login_event: LoginEvent) -> List[Dict[str, str]]:
+        """
+        Evaluate all rules for a login event and buffer the anomalies found
+        """
+        shard = self._shard(login_event.user_id)
+        with shard.lock:
+            state = shard.get(login_event.user_id)
+        
+        if state is None:
+            state = self._load_state(login_event)
+            with shard.lock:
+                state = shard.put(login_event.user_id, state)
+        
+        with shard.lock:
+            if login_event.success:
+                anomalies = self._check_success(state, login_event)
+            else:
+                anomalies = self._check_failure(state, login_event)
+        
+        if anomalies:
+            with self._pending_lock:
+                self._pending_anomalies.extend(
+                    {
+                        "user_id": login_event.user_id,
+                        "username": login_event.username,
+                        "login_event_id": login_event.id,
+                        "anomaly_type": anomaly["type"],
+                        "severity": anomaly["severity"],
+                        "description": anomaly["description"]
+                    }
+                    for anomaly in anomalies
+                )
+        return anomalies
+    
+    def _check_failure(self, state: UserState, login_event: LoginEvent) -> List[Dict[str, str]]:
+        """
+        Brute force: too many failed logins inside the window
+        """
+        window_start = login_event.timestamp - BRUTE_FORCE_WINDOW
+        state.failures.append(login_event.timestamp)
+        while state.failures and state.failures[0] < window_start:
+            state.failures.popleft()
+        
+        failed_count = len(state.failures)
+        if failed_count < BRUTE_FORCE_THRESHOLD:
+            return []
+        # One brute force anomaly per user per window
+        if state.last_brute_force and state.last_brute_force >= window_start:
+            return []
+        
+        state.last_brute_force = login_event.timestamp
+        return [{
+            "type": "brute_force",
+            "severity": "high",
+            "description": f"Multiple failed login attempts ({failed_count} in the last hour)"
+        }]
+    
+    def _check_success(self, state: UserState, login_event: LoginEvent) -> List[Dict[str, str]]:
+        """
+        Location, IP, travel and time-of-day rules against the user's baseline
+        """
+        previous_login = state.last_success
+        if previous_login is None or previous_login[2] <= login_event.timestamp:
+            state.last_success = (login_event.country, login_event.city, login_event.timestamp)
+        
+        # The first login becomes the baseline and is not analyzed
+        if state.baseline is None:
+            state.baseline = self._initial_baseline(login_event)
+            return []
+        
+        baseline = state.baseline
+        anomalies = []
+        
+        if login_event.country and login_event.country not in baseline.countries:
+            anomalies.append({
+                "type": "new_country",
+                "severity": "medium",
+                "description": f"Login from a new country: {login_event.country}"
+            })
+        
+        if login_event.city and login_event.city not in baseline.cities:
+            anomalies.append({
+                "type": "new_city",
+                "severity": "low",
+                "description": f"Login from a new city: {login_event.city}"
+            })
+        
+        if login_event.ip_address not in baseline.ip_addresses:
+            anomalies.append({
+                "type": "new_ip_address",
+                "severity": "low",
+                "description": f"Login from a new IP address: {login_event.ip_address}"
+            })
+        
+        if previous_login and login_event.country and login_event.city:
+            previous_country, previous_city, previous_timestamp = previous_login
+            if (previous_country and previous_city
+                    and previous_timestamp < login_event.timestamp
+                    and previous_country != login_event.country):
+                time_diff = (login_event.timestamp - previous_timestamp).total_seconds() / 3600
+                # Different countries - assume minimum 4 hours for travel
+                if time_diff < MIN_TRAVEL_HOURS:
+                    anomalies.append({
+                        "type": "impossible_travel",
+                        "severity": "high",
+                        "description": (
+                            f"Impossible travel detected: Login from {login_event.city}, {login_event.country} "
+                            f"only {time_diff:.1f} hours after login from {previous_city}, {previous_country}"
+                        )
+                    })
+        
+        login_hour = login_event.timestamp.hour
+        if baseline.hours.get(str(login_hour), 0) < UNUSUAL_HOUR_MIN_LOGINS:
+            anomalies.append({
+                "type": "unusual_time",
+                "severity": "low",
+                "description": f"Login at unusual hour: {login_hour}:00"
+            })
+        
+        return anomalies
+    
+    def _initial_baseline(self, login_event: LoginEvent) -> Baseline:
+        """
+        Create a baseline from a user's first login and buffer it for the next checkpoint
+        """
+        baseline = Baseline(
+            ip_addresses=frozenset([login_event.ip_address] if login_event.ip_address else []),
+            countries=frozenset([login_event.country] if login_event.country else []),
+            cities=frozenset([login_event.city] if login_event.city else []),
+            hours={str(login_event.timestamp.hour): 1}
+        )
+        with self._pending_lock:
+            self._pending_baselines[login_event.user_id] = {
+                "user_id": login_event.user_id,
+                "username": login_event.username,
+                "common_ip_addresses": sorted(baseline.ip_addresses),
+                "common_countries": sorted(baseline.countries),
+                "common_cities": sorted(baseline.cities),
+                "common_times": baseline.hours,
+                "common_days": {str(login_event.timestamp.weekday()): 1}
+            }
+        return baseline
+    
+    def invalidate(self, user_id: Optional[str] = None):
+        """
+        Drop cached state so it is reloaded from the database, e.g. after baselines are rebuilt
+        """
+        shards = [self._shard(user_id)] if user_id else self._shards
+        for shard in shards:
+            with shard.lock:
+                if user_id:
+                    shard.states.pop(user_id, None)
+                else:
+                    shard.states.clear()
+    
+    def pending_count(self) -> int:
+        """
+        Number of anomalies and baselines waiting for the next checkpoint
+        """
+        return len(self._pending_anomalies) + len(self._pending_baselines)
+    
+    def checkpoint(self) -> int:
+        """
+        Write buffered anomalies and new baselines in one transaction
+        """
+        with self._pending_lock:
+            anomalies, self._pending_anomalies = self._pending_anomalies, []
+            baselines, self._pending_baselines = self._pending_baselines, {}
+        if not anomalies and not baselines:
+            return 0
+        
+        db = self._session_factory()
+        try:
+            if baselines:
+                # Baselines rebuilt by update_user_baselines meanwhile take precedence
+                existing = db.query(models.UserLoginBaseline.user_id).filter(
+                    models.UserLoginBaseline.user_id.in_(list(baselines))
+                ).all()
+                for (user_id,) in existing:
+                    del baselines[user_id]
+                db.bulk_insert_mappings(models.UserLoginBaseline, list(baselines.values()))
+            db.bulk_insert_mappings(models.LoginAnomaly, anomalies)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error writing login detector checkpoint: {str(e)}")
+            # Keep the records for the next checkpoint
+            with self._pending_lock:
+                self._pending_anomalies[:0] = anomalies
+                for user_id, baseline in baselines.items():
+                    self._pending_baselines.setdefault(user_id, baseline)
+            return 0
+        finally:
+            db.close()
+        
+        return len(anomalies) + len(baselines)
+    
+    def _run(self):
+        while not self._stop.wait(self.checkpoint_interval):
+            self.checkpoint()
+    
+    def start(self):
+        """
+        Start checkpointing in a background thread
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="login-detector-checkpoint", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """
+        Stop the checkpoint thread and write anything still buffered
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.checkpoint()
+
+# Create a singleton instance
+login_detector = LoginAnomalyDetector()
+
+def get_login_detector() -> LoginAnomalyDetector:
+    """
+    Get the process-wide login anomaly detector
+    """
+    return login_detector
@@ -0,0 +1,98 @@
+import os
+import json
+import asyncio
+import logging
+
+from pydantic import ValidationError
+
+import schemas
+from database import SessionLocal
+from services.analysis_worker_pool import get_analysis_pool
+from services.login_anomaly_detector import LoginEvent
+from services.user_behavior_analytics_service import create_login_event
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+# Optional Kafka feed
+try:
+    from aiokafka import AIOKafkaConsumer
+    KAFKA_AVAILABLE = True
+except ImportError:
+    KAFKA_AVAILABLE = False
+
+KAFKA_BOOTSTRAP_SERVERS = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:9092")
+# Unset disables the consumer; messages are UserLoginEventCreate JSON keyed by user_id
+LOGIN_EVENTS_TOPIC = os.getenv("LOGIN_EVENTS_TOPIC")
+LOGIN_EVENTS_GROUP_ID = os.getenv("LOGIN_EVENTS_GROUP_ID", "security-login-detector")
+# Backoff between attempts to store an event while e.g. the database is down
+LOGIN_EVENTS_RETRY_INITIAL_SECONDS = float(os.getenv("LOGIN_EVENTS_RETRY_INITIAL_SECONDS", "1"))
+LOGIN_EVENTS_RETRY_MAX_SECONDS = float(os.getenv("LOGIN_EVENTS_RETRY_MAX_SECONDS", "30"))
+
+def consumer_enabled() -> bool:
+    """
+    Whether login events should be consumed from Kafka
+    """
+    if LOGIN_EVENTS_TOPIC and not KAFKA_AVAILABLE:
+        logger.warning("LOGIN_EVENTS_TOPIC is set but aiokafka is not installed. Kafka login feed disabled.")
+    return bool(LOGIN_EVENTS_TOPIC) and KAFKA_AVAILABLE
+
+def ingest_login_event(raw: bytes):
+    """
+    Persist one login event from the feed and queue it for analysis
+    """
+    try:
+        login_event = schemas.UserLoginEventCreate(**json.loads(raw))
+    except (TypeError, ValueError, ValidationError) as e:
+        logger.warning(f"Skipping invalid login event: {str(e)}")
+        return
+    
+    db = SessionLocal()
+    try:
+        db_login_event = create_login_event(db, login_event)
+        snapshot = LoginEvent.from_model(db_login_event)
+    finally:
+        db.close()
+    
+    get_analysis_pool().submit(snapshot)
+
+async def ingest_with_retry(message):
+    """
+    Ingest one message, retrying with backoff until it is stored
+    """
+    delay = LOGIN_EVENTS_RETRY_INITIAL_SECONDS
+    while True:
+        try:
+            # Database work runs off the event loop
+            await asyncio.to_thread(ingest_login_event, message.value)
+            return
+        except Exception as e:
+            logger.error(f"Error processing login event at offset {message.offset}, retrying in {delay:.0f}s: {str(e)}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, LOGIN_EVENTS_RETRY_MAX_SECONDS)
+
+async def consume_login_events():
+    """
+    Feed login events from Kafka into the detector until cancelled
+    
+    Offsets are committed only once an event is stored, so events that
+    could not be stored are consumed again after a restart or rebalance
+    """
+    consumer = AIOKafkaConsumer(
+        LOGIN_EVENTS_TOPIC,
+        bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS,
+        group_id=LOGIN_EVENTS_GROUP_ID,
+        enable_auto_commit=False
+    )
+    await consumer.start()
+    logger.info(f"Consuming login events from {LOGIN_EVENTS_TOPIC}")
+    try:
+        async for message in consumer:
+            await ingest_with_retry(message)
+            try:
+                await consumer.commit()
+            except Exception as e:
+                # E.g. the partition was reassigned during a long outage; its new owner re-reads the event
+                logger.warning(f"Failed to commit login event offset {message.offset}: {str(e)}")
+    finally:
+        await consumer.stop()
@@ -0,0 +1,211 @@
+import os
+import json
+import codecs
+import asyncio
+import logging
+from typing import Any, AsyncIterable, AsyncIterator, List, Tuple
+
+from pydantic import ValidationError
+
+import schemas
+from database import SessionLocal
+from services.analysis_worker_pool import get_analysis_pool
+from services.user_behavior_analytics_service import create_login_events_bulk
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+# Login events written per transaction
+UBA_BULK_BATCH_SIZE = int(os.getenv("UBA_BULK_BATCH_SIZE", "1000"))
+# Rejected records reported back in the response; all of them are counted
+UBA_BULK_MAX_ERRORS = int(os.getenv("UBA_BULK_MAX_ERRORS", "100"))
+# Longest single record accepted, so a body without separators cannot be buffered whole
+UBA_BULK_MAX_RECORD_BYTES = int(os.getenv("UBA_BULK_MAX_RECORD_BYTES", str(1024 * 1024)))
+
+# A record's position in the body and its parsed value, or the ValueError it failed with
+Record = Tuple[int, Any]
+
+def is_ndjson(content_type: str) -> bool:
+    """
+    Whether a content type names newline-delimited JSON rather than a JSON array
+    """
+    content_type = (content_type or "").lower()
+    return "ndjson" in content_type or "jsonl" in content_type
+
+async def iter_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterator[Record]:
+    """
+    Parse newline-delimited JSON records from a byte stream
+    
+    A line that is not valid JSON is yielded as its ValueError, so one bad
+    record does not abort the rest of the body. Blank lines are skipped.
+    """
+    index = 0
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        lines = pending.split(b"\n")
+        pending = lines.pop()
+        if len(pending) > UBA_BULK_MAX_RECORD_BYTES:
+            raise ValueError(f"Record {index} is longer than {UBA_BULK_MAX_RECORD_BYTES} bytes")
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                yield index, json.loads(line)
+            except ValueError as e:
+                yield index, ValueError(f"Invalid JSON: {str(e)}")
+            index += 1
+    
+    if pending.strip():
+        try:
+            yield index, json.loads(pending)
+        except ValueError as e:
+            yield index, ValueError(f"Invalid JSON: {str(e)}")
+
+async def iter_json_array(chunks: AsyncIterable[bytes]) -> AsyncIterator[Record]:
+    """
+    Parse the elements of a JSON array from a byte stream without buffering the whole body
+    
+    Elements are decoded as soon as they are complete. Since a malformed array
+    has no reliable resynchronization point, it raises ValueError; elements
+    yielded before that point have already been handed on.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    position = 0
+    index = 0
+    # Expecting "[" first, then an element or "]", then "," or "]"
+    state = "start"
+    
+    async for chunk in chunks:
+        buffer = buffer[position:] + text_decoder.decode(chunk)
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n":
+                position += 1
+            if position >= len(buffer):
+                break
+            
+            if state == "start":
+                if buffer[position] != "[":
+                    raise ValueError("Request body must be a JSON array or newline-delimited JSON")
+                position += 1
+                state = "element_or_end"
+            elif state in ("element_or_end", "element"):
+                if state == "element_or_end" and buffer[position] == "]":
+                    position += 1
+                    state = "end"
+                    continue
+                try:
+                    value, end = decoder.raw_decode(buffer, position)
+                except ValueError:
+                    # Possibly an element split across chunks; wait for more input
+                    if len(buffer) - position > UBA_BULK_MAX_RECORD_BYTES:
+                        raise ValueError(f"Element {index} is invalid or longer than {UBA_BULK_MAX_RECORD_BYTES} bytes")
+                    break
+                if end == len(buffer) and not isinstance(value, (dict, list, str)):
+                    # A number at the end of the buffer may continue in the next chunk
+                    break
+                yield index, value
+                index += 1
+                position = end
+                state = "separator"
+            elif state == "separator":
+                if buffer[position] == ",":
+                    state = "element"
+                elif buffer[position] == "]":
+                    state = "end"
+                else:
+                    raise ValueError(f"Malformed JSON array after element {index - 1}")
+                position += 1
+            else:
+                raise ValueError("Unexpected data after the end of the JSON array")
+    
+    remainder = buffer[position:] + text_decoder.decode(b"", final=True)
+    if state in ("element_or_end", "element") and remainder.strip():
+        raise ValueError(f"Element {index} is not valid JSON")
+    if state == "start":
+        raise ValueError("Request body is empty")
+    if state != "end":
+        raise ValueError(f"JSON array is not terminated after {index} elements")
+
+def _insert_batch(login_events: List[schemas.UserLoginEventImport]) -> Tuple[int, int]:
+    """
+    Write a batch of login events and queue them for analysis
+    
+    Returns how many were inserted and how many were queued.
+    """
+    db = SessionLocal()
+    try:
+        snapshots = create_login_events_bulk(db, login_events)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    
+    return len(snapshots), get_analysis_pool().submit_many(snapshots)
+
+async def import_login_events(
+    chunks: AsyncIterable[bytes],
+    content_type: str,
+    batch_size: int = UBA_BULK_BATCH_SIZE
+) -> schemas.LoginEventBulkResult:
+    """
+    Import login events streamed as newline-delimited JSON or a JSON array
+    
+    Invalid records are rejected individually and reported; valid ones are
+    written in batches of batch_size, each in its own transaction, so a
+    failure partway through keeps the batches already written.
+    """
+    records = iter_ndjson(chunks) if is_ndjson(content_type) else iter_json_array(chunks)
+    received = inserted = rejected = queued = 0
+    errors: List[schemas.LoginEventImportError] = []
+    batch: List[schemas.UserLoginEventImport] = []
+    
+    async def flush():
+        nonlocal inserted, queued
+        # Database work runs off the event loop
+        batch_inserted, batch_queued = await asyncio.to_thread(_insert_batch, batch)
+        inserted += batch_inserted
+        queued += batch_queued
+        batch.clear()
+    
+    try:
+        async for index, record in records:
+            received += 1
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                if not isinstance(record, dict):
+                    raise ValueError("Record must be a JSON object")
+                batch.append(schemas.UserLoginEventImport(**record))
+            except (TypeError, ValueError, ValidationError) as e:
+                rejected += 1
+                if len(errors) < UBA_BULK_MAX_ERRORS:
+                    errors.append(schemas.LoginEventImportError(index=index, error=str(e)))
+                continue
+            
+            if len(batch) >= batch_size:
+                await flush()
+    except ValueError as e:
+        # The body is unreadable from here on; report what was already recorded
+        if batch:
+            await flush()
+        raise ValueError(f"{str(e)} ({inserted} login events were recorded before the error)")
+    
+    if batch:
+        await flush()
+    
+    if queued < inserted:
+        logger.warning(f"Analysis queue full, {inserted - queued} imported login events were not analyzed")
+    logger.info(f"Imported {inserted} login events ({rejected} rejected, {queued} queued for analysis)")
+    return schemas.LoginEventBulkResult(
+        received=received,
+        inserted=inserted,
+        rejected=rejected,
+        queued_for_analysis=queued,
+        dropped_from_analysis=inserted - queued,
+        errors=errors
+    )
@@ -57,7 +57,7 @@ def create_threat_indicator(
         source=indicator.source,
         confidence=indicator.confidence,
         description=indicator.description,
-        metadata=indicator.metadata
+        indicator_metadata=indicator.metadata
     )
     
     db.add(db_indicator)
@@ -165,7 +165,7 @@ async def process_stix_feed(db: Session, feed: schemas.ThreatFeedConfig):
                             source=feed.name,
                             confidence=stix_obj.confidence if hasattr(stix_obj, 'confidence') else None,
                             description=stix_obj.description if hasattr(stix_obj, 'description') else None,
-                            metadata={"stix_id": stix_obj.id}
+                            indicator_metadata={"stix_id": stix_obj.id}
                         ))
             
             except Exception as e:
@@ -228,7 +228,7 @@ async def process_csv_feed(db: Session, feed: schemas.ThreatFeedConfig):
                             source=feed.name,
                             confidence=float(data.get('confidence', 0)) if 'confidence' in data else None,
                             description=data.get('description', None),
-                            metadata=data
+                            indicator_metadata=data
                         ))
                 
                 except Exception as e:
@@ -297,7 +297,7 @@ async def process_json_feed(db: Session, feed: schemas.ThreatFeedConfig):
                             source=feed.name,
                             confidence=float(item.get('confidence', 0)) if 'confidence' in item else None,
                             description=item.get('description', None),
-                            metadata=item
+                            indicator_metadata=item
                         ))
                 
                 except Exception as e:
@@ -0,0 +1,38 @@
+import heapq
+from operator import itemgetter
+from typing import Dict, List, Mapping, Optional
+
+class TopK:
+    """
+    Bounded counts of the most frequent items, in the Space-Saving family of summaries.
+    
+    At most capacity items are tracked. Merging adds counts and keeps the
+    capacity largest, so an item dropped from one summary loses that part of
+    its count, while an item that stays in the top capacity of every merged
+    summary is counted exactly. Counts are a plain dict, so summaries can be
+    stored in JSON columns.
+    """
+    
+    def __init__(self, capacity: int, counts: Optional[Mapping[str, int]] = None):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = dict(counts or {})
+        self._truncate()
+    
+    def _truncate(self):
+        if len(self.counts) > self.capacity:
+            self.counts = dict(heapq.nlargest(self.capacity, self.counts.items(), key=itemgetter(1)))
+    
+    def update(self, counts: Mapping[str, int]) -> "TopK":
+        """
+        Merge item counts (from another summary or a Counter) into this summary
+        """
+        for item, count in counts.items():
+            self.counts[item] = self.counts.get(item, 0) + count
+        self._truncate()
+        return self
+    
+    def top(self, n: int) -> List[str]:
+        """
+        Get the n most frequent items, most frequent first
+        """
+        return [item for item, _ in heapq.nlargest(n, self.counts.items(), key=itemgetter(1))]
@@ -1,31 +1,26 @@
+from sqlalchemy import insert, text
 from sqlalchemy.orm import Session
 import httpx
+import csv
+import io
 import json
 import os
 import logging
 from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
 import math
-from collections import Counter
 
 import models
 import schemas
+from database import SessionLocal
+from services import baseline_service
+from services.geoip_service import get_geoip_enricher
+from services.login_anomaly_detector import LoginEvent, get_login_detector
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Optional GeoIP service
-try:
-    import geoip2.database
-    GEOIP_ENABLED = True
-    GEOIP_DB_PATH = os.getenv("GEOIP_DB_PATH", "./GeoLite2-City.mmdb")
-    if not os.path.exists(GEOIP_DB_PATH):
-        logger.warning(f"GeoIP database not found at {GEOIP_DB_PATH}. Geolocation will be disabled.")
-        GEOIP_ENABLED = False
-except ImportError:
-    logger.warning("GeoIP library not available. Geolocation will be disabled.")
-    GEOIP_ENABLED = False
 
 def create_login_event(db: Session, login_event: schemas.UserLoginEventCreate) -> models.UserLoginEvent:
     """
@@ -35,14 +30,9 @@ def create_login_event(db: Session, login_event: schemas.UserLoginEventCreate) -
     country = login_event.country
     city = login_event.city
     
-    if not country and not city and GEOIP_ENABLED:
-        try:
-            with geoip2.database.Reader(GEOIP_DB_PATH) as reader:
-                response = reader.city(login_event.ip_address)
-                country = response.country.name
-                city = response.city.name
-        except Exception as e:
-            logger.warning(f"Error getting geolocation for IP {login_event.ip_address}: {str(e)}")
+    geoip_enricher = get_geoip_enricher()
+    if not country and not city and geoip_enricher:
+        country, city = geoip_enricher.enrich(login_event.ip_address)
     
     # Create the login event
     db_login_event = models.UserLoginEvent(
@@ -61,6 +51,98 @@ def create_login_event(db: Session, login_event: schemas.UserLoginEventCreate) -
     
     return db_login_event
 
+# Columns written by bulk login event inserts, in COPY order
+BULK_LOGIN_EVENT_COLUMNS = ["id", "user_id", "username", "success", "ip_address", "user_agent", "country", "city", "timestamp", "ingested_at"]
+
+def _copy_login_events(db: Session, rows: List[Dict[str, Any]]) -> List[int]:
+    """
+    Insert login event rows with COPY on PostgreSQL, allocating their IDs up front
+    """
+    ids = [
+        row[0] for row in db.execute(
+            text("SELECT nextval(pg_get_serial_sequence('user_login_events', 'id')) FROM generate_series(1, :count)"),
+            {"count": len(rows)}
+        )
+    ]
+    
+    buffer = io.StringIO()
+    # QUOTE_NONNUMERIC quotes every string, so only None is written as an unquoted empty field (NULL)
+    writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+    for event_id, row in zip(ids, rows):
+        row["id"] = event_id
+        writer.writerow([row[column] for column in BULK_LOGIN_EVENT_COLUMNS])
+    buffer.seek(0)
+    
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY user_login_events ({', '.join(BULK_LOGIN_EVENT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    finally:
+        cursor.close()
+    return ids
+
+def create_login_events_bulk(db: Session, login_events: List[schemas.UserLoginEventImport]) -> List[LoginEvent]:
+    """
+    Create many user login events in one transaction
+    
+    Geolocation is looked up once per distinct IP address. Rows are written with
+    COPY on PostgreSQL and a batched multi-row INSERT elsewhere.
+    """
+    if not login_events:
+        return []
+    
+    geoip_enricher = get_geoip_enricher()
+    locations = {}
+    if geoip_enricher:
+        locations = geoip_enricher.enrich_many(
+            login_event.ip_address for login_event in login_events
+            if not login_event.country and not login_event.city
+        )
+    
+    now = datetime.now()
+    rows = []
+    for login_event in login_events:
+        country, city = login_event.country, login_event.city
+        if not country and not city:
+            country, city = locations.get(login_event.ip_address, (None, None))
+        rows.append({
+            "user_id": login_event.user_id,
+            "username": login_event.username,
+            "success": login_event.success,
+            "ip_address": login_event.ip_address,
+            "user_agent": login_event.user_agent,
+            "country": country,
+            "city": city,
+            "timestamp": login_event.timestamp or now,
+            "ingested_at": now
+        })
+    
+    if db.get_bind().dialect.name == "postgresql":
+        ids = _copy_login_events(db, rows)
+    else:
+        table = models.UserLoginEvent.__table__
+        ids = db.execute(
+            insert(table).returning(table.c.id, sort_by_parameter_order=True),
+            rows
+        ).scalars().all()
+    db.commit()
+    
+    return [
+        LoginEvent(
+            id=event_id,
+            user_id=row["user_id"],
+            username=row["username"],
+            success=row["success"],
+            ip_address=row["ip_address"],
+            country=row["country"],
+            city=row["city"],
+            timestamp=row["timestamp"]
+        )
+        for event_id, row in zip(ids, rows)
+    ]
+
 def get_login_events(
     db: Session,
     user_id: Optional[str] = None,
@@ -148,248 +230,29 @@ def analyze_login_event(db: Session, login_event_id: int):
         logger.error(f"Login event with id {login_event_id} not found")
         return
     
-    # Skip analysis for failed logins (they're handled separately)
-    if not login_event.success:
-        check_for_brute_force(db, login_event)
-        return
-    
-    # Get the user's baseline
-    baseline = db.query(models.UserLoginBaseline).filter(
-        models.UserLoginBaseline.user_id == login_event.user_id
-    ).first()
-    
-    # If no baseline exists, create one and skip analysis
-    if not baseline:
-        create_initial_baseline(db, login_event)
-        return
-    
-    # Check for anomalies
-    anomalies = []
-    
-    # Check for new location
-    if login_event.country and login_event.country not in baseline.common_countries:
-        anomalies.append({
-            "type": "new_country",
-            "severity": "medium",
-            "description": f"Login from a new country: {login_event.country}"
-        })
-    
-    if login_event.city and login_event.city not in baseline.common_cities:
-        anomalies.append({
-            "type": "new_city",
-            "severity": "low",
-            "description": f"Login from a new city: {login_event.city}"
-        })
-    
-    if login_event.ip_address not in baseline.common_ip_addresses:
-        anomalies.append({
-            "type": "new_ip_address",
-            "severity": "low",
-            "description": f"Login from a new IP address: {login_event.ip_address}"
-        })
-    
-    # Check for impossible travel
-    check_for_impossible_travel(db, login_event, baseline, anomalies)
-    
-    # Check for unusual time
-    login_hour = login_event.timestamp.hour
-    if str(login_hour) not in baseline.common_times or baseline.common_times.get(str(login_hour), 0) < 3:
-        anomalies.append({
-            "type": "unusual_time",
-            "severity": "low",
-            "description": f"Login at unusual hour: {login_hour}:00"
-        })
-    
-    # Create anomaly records
-    for anomaly in anomalies:
-        db_anomaly = models.LoginAnomaly(
-            user_id=login_event.user_id,
-            username=login_event.username,
-            login_event_id=login_event.id,
-            anomaly_type=anomaly["type"],
-            severity=anomaly["severity"],
-            description=anomaly["description"]
-        )
-        
-        db.add(db_anomaly)
-    
-    db.commit()
-
-def check_for_brute_force(db: Session, login_event: models.UserLoginEvent):
-    """
-    Check for brute force login attempts
-    """
-    if login_event.success:
-        return
-    
-    # Look for multiple failed logins in the last hour
-    one_hour_ago = login_event.timestamp - timedelta(hours=1)
-    
-    failed_count = db.query(models.UserLoginEvent).filter(
-        models.UserLoginEvent.user_id == login_event.user_id,
-        models.UserLoginEvent.success == False,
-        models.UserLoginEvent.timestamp >= one_hour_ago
-    ).count()
-    
-    # If there are more than 5 failed attempts in the last hour, create an anomaly
-    if failed_count >= 5:
-        # Check if we already have a brute_force anomaly for this user in the last hour
-        existing_anomaly = db.query(models.LoginAnomaly).filter(
-            models.LoginAnomaly.user_id == login_event.user_id,
-            models.LoginAnomaly.anomaly_type == "brute_force",
-            models.LoginAnomaly.timestamp >= one_hour_ago
-        ).first()
-        
-        if not existing_anomaly:
-            db_anomaly = models.LoginAnomaly(
-                user_id=login_event.user_id,
-                username=login_event.username,
-                login_event_id=login_event.id,
-                anomaly_type="brute_force",
-                severity="high",
-                description=f"Multiple failed login attempts ({failed_count} in the last hour)"
-            )
-            
-            db.add(db_anomaly)
-            db.commit()
+    get_login_detector().process(LoginEvent.from_model(login_event))
 
-def check_for_impossible_travel(
-    db: Session, 
-    login_event: models.UserLoginEvent, 
-    baseline: models.UserLoginBaseline,
-    anomalies: List[Dict[str, str]]
-):
-    """
-    Check for impossible travel (login from different locations in an impossibly short time)
+def update_user_baselines(db: Session, user_id: Optional[str] = None):
     """
-    if not login_event.country or not login_event.city:
-        return
-    
-    # Get the user's most recent successful login before this one
-    previous_login = db.query(models.UserLoginEvent).filter(
-        models.UserLoginEvent.user_id == login_event.user_id,
-        models.UserLoginEvent.success == True,
-        models.UserLoginEvent.id != login_event.id,
-        models.UserLoginEvent.timestamp < login_event.timestamp
-    ).order_by(models.UserLoginEvent.timestamp.desc()).first()
-    
-    if not previous_login or not previous_login.country or not previous_login.city:
-        return
-    
-    # If the locations are the same, no need to check
-    if (previous_login.country == login_event.country and 
-        previous_login.city == login_event.city):
-        return
-    
-    # Calculate time difference in hours
-    time_diff = (login_event.timestamp - previous_login.timestamp).total_seconds() / 3600
+    Update user login behavior baselines
     
-    # Very simplified check - in a real system, we would use actual distance calculations
-    # and more sophisticated travel time estimates
-    if previous_login.country != login_event.country:
-        # Different countries - assume minimum 4 hours for travel
-        if time_diff < 4:
-            anomalies.append({
-                "type": "impossible_travel",
-                "severity": "high",
-                "description": (
-                    f"Impossible travel detected: Login from {login_event.city}, {login_event.country} "
-                    f"only {time_diff:.1f} hours after login from {previous_login.city}, {previous_login.country}"
-                )
-            })
-
-def create_initial_baseline(db: Session, login_event: models.UserLoginEvent):
-    """
-    Create an initial baseline for a user based on their first login
+    New login events are folded into per-day aggregates, and only the baselines of
+    users with new events (plus user_id, if given) are rebuilt from their aggregates.
     """
-    baseline = models.UserLoginBaseline(
-        user_id=login_event.user_id,
-        username=login_event.username,
-        common_ip_addresses=[login_event.ip_address] if login_event.ip_address else [],
-        common_countries=[login_event.country] if login_event.country else [],
-        common_cities=[login_event.city] if login_event.city else [],
-        common_times={str(login_event.timestamp.hour): 1},
-        common_days={str(login_event.timestamp.weekday()): 1}
-    )
+    users = baseline_service.fold_new_login_events(db)
+    if user_id:
+        users.add(user_id)
     
-    db.add(baseline)
-    db.commit()
+    updated = baseline_service.rebuild_baselines(db, users)
+    pruned = baseline_service.prune_daily_aggregates(db)
+    logger.info(f"Updated {updated} baselines, pruned {pruned} expired daily aggregates")
 
-def update_user_baselines(db: Session, user_id: Optional[str] = None):
+def run_baseline_update(user_id: Optional[str] = None):
     """
-    Update user login behavior baselines
+    Update user login behavior baselines in a session of its own, for background tasks
     """
-    # Get users to update
-    if user_id:
-        users = [user_id]
-    else:
-        # Get all unique user IDs from login events
-        user_records = db.query(models.UserLoginEvent.user_id).distinct().all()
-        users = [record[0] for record in user_records]
-    
-    # Process each user
-    for uid in users:
-        try:
-            # Get successful login events for this user in the last 30 days
-            thirty_days_ago = datetime.now() - timedelta(days=30)
-            login_events = db.query(models.UserLoginEvent).filter(
-                models.UserLoginEvent.user_id == uid,
-                models.UserLoginEvent.success == True,
-                models.UserLoginEvent.timestamp >= thirty_days_ago
-            ).all()
-            
-            if not login_events:
-                logger.info(f"No recent login events for user {uid}")
-                continue
-            
-            # Extract data for baseline
-            ip_addresses = [event.ip_address for event in login_events if event.ip_address]
-            countries = [event.country for event in login_events if event.country]
-            cities = [event.city for event in login_events if event.city]
-            
-            # Count occurrences of each hour and day
-            hours = [event.timestamp.hour for event in login_events]
-            days = [event.timestamp.weekday() for event in login_events]
-            
-            hour_counts = Counter(hours)
-            day_counts = Counter(days)
-            
-            # Get or create baseline
-            baseline = db.query(models.UserLoginBaseline).filter(
-                models.UserLoginBaseline.user_id == uid
-            ).first()
-            
-            if not baseline:
-                # Get username from the most recent login
-                username = login_events[0].username if login_events else "unknown"
-                
-                baseline = models.UserLoginBaseline(
-                    user_id=uid,
-                    username=username,
-                    common_ip_addresses=[],
-                    common_countries=[],
-                    common_cities=[],
-                    common_times={},
-                    common_days={}
-                )
-                db.add(baseline)
-            
-            # Update baseline
-            # For IP addresses, countries, and cities, we'll keep the most common ones
-            baseline.common_ip_addresses = [ip for ip, count in Counter(ip_addresses).most_common(10)]
-            baseline.common_countries = [country for country, count in Counter(countries).most_common(5)]
-            baseline.common_cities = [city for city, count in Counter(cities).most_common(10)]
-            
-            # For hours and days, we'll keep the counts
-            baseline.common_times = {str(hour): count for hour, count in hour_counts.items()}
-            baseline.common_days = {str(day): count for day, count in day_counts.items()}
-            
-            baseline.last_updated = datetime.now()
-            
-            db.commit()
-            
-            logger.info(f"Updated baseline for user {uid}")
-        
-        except Exception as e:
-            logger.error(f"Error updating baseline for user {uid}: {str(e)}")
-            db.rollback()
\ No newline at end of file
+    db = SessionLocal()
+    try:
+        update_user_baselines(db, user_id)
+    finally:
+        db.close()
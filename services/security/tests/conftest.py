@@ -0,0 +1,34 @@
+"""
+Fixtures for the security service tests.
+
+The service imports its modules flat from app/ and creates its engine at import
+time, so the database URL and import path are set before anything is imported.
+"""
+import os
+import sys
+import tempfile
+
+_workdir = tempfile.mkdtemp(prefix="security-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_workdir}/test.db"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+import pytest
+
+import database
+import models
+
+@pytest.fixture(scope="session", autouse=True)
+def tables():
+    models.Base.metadata.create_all(database.engine)
+
+@pytest.fixture
+def db():
+    """
+    A database session; every table is emptied afterwards
+    """
+    session = database.SessionLocal()
+    yield session
+    session.close()
+    with database.engine.begin() as connection:
+        for table in reversed(models.Base.metadata.sorted_tables):
+            connection.execute(table.delete())
@@ -0,0 +1,20 @@
+import time
+from datetime import datetime
+
+from services.analysis_worker_pool import AnalysisWorkerPool
+from services.login_anomaly_detector import LoginAnomalyDetector, LoginEvent
+
+def login_events(count: int):
+    return [LoginEvent(i, f"u{i}", "alice", True, "10.0.0.1", None, None, datetime(2026, 1, 1)) for i in range(count)]
+
+def test_submit_many_waits_once_for_a_full_batch():
+    pool = AnalysisWorkerPool(workers=4, queue_size=40, enqueue_timeout=0.05, detector=LoginAnomalyDetector())
+    
+    started = time.perf_counter()
+    accepted = pool.submit_many(login_events(1000))
+    
+    # Without workers only the queue capacity is accepted, and the rest is dropped
+    # after one shared timeout instead of one timeout per event
+    assert accepted == 40
+    assert pool.dropped == 960
+    assert time.perf_counter() - started < 1
@@ -0,0 +1,91 @@
+from datetime import date, datetime, timedelta
+
+import models
+from services import baseline_service
+
+def add_event(db, user_id="u1", timestamp=None, ingested_at=None, success=True, ip_address="10.0.0.1"):
+    event = models.UserLoginEvent(
+        user_id=user_id,
+        username=f"user-{user_id}",
+        success=success,
+        ip_address=ip_address,
+        user_agent="test",
+        country="NL",
+        city="Amsterdam",
+        timestamp=timestamp or datetime.now() - timedelta(hours=1),
+        ingested_at=ingested_at or datetime.now() - timedelta(hours=1)
+    )
+    db.add(event)
+    db.commit()
+    return event
+
+def watermark(db):
+    return db.query(models.BaselineWatermark).one().last_event_id
+
+def test_fold_aggregates_successful_events_per_day(db):
+    yesterday = datetime.now() - timedelta(days=1)
+    add_event(db, timestamp=yesterday)
+    add_event(db, timestamp=yesterday, ip_address="10.0.0.2")
+    add_event(db, timestamp=yesterday, success=False)
+    last = add_event(db, user_id="u2", timestamp=yesterday - timedelta(days=1))
+    
+    assert baseline_service.fold_new_login_events(db, batch_size=2) == {"u1", "u2"}
+    
+    aggregate = db.query(models.UserLoginDailyAggregate).filter_by(user_id="u1").one()
+    assert aggregate.day == yesterday.date()
+    assert aggregate.login_count == 2
+    assert aggregate.ip_addresses == {"10.0.0.1": 1, "10.0.0.2": 1}
+    assert watermark(db) == last.id
+    
+    # Folded events are not counted again
+    assert baseline_service.fold_new_login_events(db) == set()
+    assert db.query(models.UserLoginDailyAggregate).filter_by(user_id="u1").one().login_count == 2
+
+def test_fold_settles_on_ingestion_time_not_event_timestamp(db):
+    # An imported event that claims to be from the near future must not hold back older rows
+    add_event(db, user_id="u1", timestamp=datetime.now() + timedelta(minutes=4))
+    settled = add_event(db, user_id="u2")
+    unsettled = add_event(db, user_id="u3", ingested_at=datetime.now())
+    add_event(db, user_id="u4")
+    
+    assert baseline_service.fold_new_login_events(db) == {"u1", "u2"}
+    assert watermark(db) == settled.id
+    
+    unsettled.ingested_at = datetime.now() - timedelta(hours=1)
+    db.commit()
+    
+    assert baseline_service.fold_new_login_events(db) == {"u3", "u4"}
+
+def test_fold_treats_rows_without_ingestion_time_as_settled(db):
+    event = add_event(db)
+    event.ingested_at = None
+    db.commit()
+    
+    assert baseline_service.fold_new_login_events(db) == {"u1"}
+
+def test_rebuild_builds_baselines_from_aggregates_in_window(db):
+    for days_ago in (1, 2, 40):
+        add_event(db, timestamp=datetime.now() - timedelta(days=days_ago), ip_address=f"10.0.0.{days_ago}")
+    add_event(db, user_id="u2", timestamp=datetime.now() - timedelta(days=40))
+    users = baseline_service.fold_new_login_events(db)
+    
+    assert baseline_service.rebuild_baselines(db, users, window_days=30) == 1
+    
+    baseline = db.query(models.UserLoginBaseline).filter_by(user_id="u1").one()
+    assert sorted(baseline.common_ip_addresses) == ["10.0.0.1", "10.0.0.2"]
+    assert baseline.common_countries == ["NL"]
+    assert sum(baseline.common_days.values()) == 2
+    # u2 only logged in before the window
+    assert db.query(models.UserLoginBaseline).filter_by(user_id="u2").count() == 0
+
+def test_prune_deletes_aggregates_outside_window(db):
+    for days_ago in (1, 29, 31):
+        add_event(db, timestamp=datetime.now() - timedelta(days=days_ago))
+    baseline_service.fold_new_login_events(db)
+    
+    assert baseline_service.prune_daily_aggregates(db, window_days=30) == 1
+    
+    since = date.today() - timedelta(days=30)
+    days = [aggregate.day for aggregate in db.query(models.UserLoginDailyAggregate)]
+    assert len(days) == 2
+    assert all(day >= since for day in days)
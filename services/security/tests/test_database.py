@@ -0,0 +1,22 @@
+from sqlalchemy import create_engine, inspect, text
+
+import models
+from database import add_missing_columns
+
+def test_missing_columns_are_added_to_existing_table(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/old.db")
+    # The table as created before ingested_at was added
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE user_login_events (id INTEGER PRIMARY KEY, user_id VARCHAR, username VARCHAR, "
+            "success BOOLEAN, ip_address VARCHAR, user_agent VARCHAR, country VARCHAR, city VARCHAR, timestamp DATETIME)"
+        ))
+        connection.execute(text("INSERT INTO user_login_events (id, user_id) VALUES (1, 'u1')"))
+    
+    add_missing_columns(engine, models.UserLoginEvent.__table__)
+    # Running it again is a no-op
+    add_missing_columns(engine, models.UserLoginEvent.__table__)
+    
+    assert "ingested_at" in {column["name"] for column in inspect(engine).get_columns("user_login_events")}
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT user_id, ingested_at FROM user_login_events")).all() == [("u1", None)]
@@ -0,0 +1,60 @@
+import asyncio
+from types import SimpleNamespace
+
+from services import login_event_consumer
+
+class FakeConsumer:
+    """
+    Stands in for AIOKafkaConsumer; commits record the consumer position
+    """
+    instances = []
+    
+    def __init__(self, *topics, **config):
+        self.config = config
+        self.offsets = [0, 1]
+        self.position = 0
+        self.commits = []
+        FakeConsumer.instances.append(self)
+    
+    async def start(self):
+        pass
+    
+    async def stop(self):
+        pass
+    
+    def __aiter__(self):
+        return self
+    
+    async def __anext__(self):
+        if not self.offsets:
+            raise StopAsyncIteration
+        offset = self.offsets.pop(0)
+        self.position = offset + 1
+        return SimpleNamespace(offset=offset, value=b"{}")
+    
+    async def commit(self):
+        self.commits.append(self.position)
+
+async def no_sleep(delay):
+    pass
+
+def test_offsets_are_committed_only_after_events_are_stored(monkeypatch):
+    FakeConsumer.instances.clear()
+    monkeypatch.setattr(login_event_consumer, "AIOKafkaConsumer", FakeConsumer, raising=False)
+    monkeypatch.setattr(login_event_consumer.asyncio, "sleep", no_sleep)
+    
+    attempts = []
+    def ingest(raw):
+        attempts.append(raw)
+        # The database is down for the first two attempts
+        if len(attempts) <= 2:
+            assert FakeConsumer.instances[0].commits == []
+            raise RuntimeError("database unavailable")
+    monkeypatch.setattr(login_event_consumer, "ingest_login_event", ingest)
+    
+    asyncio.run(login_event_consumer.consume_login_events())
+    
+    consumer = FakeConsumer.instances[0]
+    assert consumer.config["enable_auto_commit"] is False
+    assert len(attempts) == 4
+    assert consumer.commits == [1, 2]
@@ -0,0 +1,70 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pydantic import ValidationError
+
+import models
+import schemas
+from services.login_anomaly_detector import LoginAnomalyDetector, LoginEvent
+from services.login_event_import import import_login_events
+from services.user_behavior_analytics_service import create_login_event, create_login_events_bulk
+
+def login_event(**fields):
+    record = {
+        "user_id": "u1",
+        "username": "alice",
+        "success": True,
+        "ip_address": "10.0.0.1",
+        "user_agent": "test",
+        "country": "NL",
+        "city": "Amsterdam"
+    }
+    record.update(fields)
+    return record
+
+async def body(data: bytes):
+    yield data
+
+def test_aware_timestamp_is_converted_to_naive_utc():
+    event = schemas.UserLoginEventImport(**login_event(timestamp="2026-01-01T12:00:00+02:00"))
+    
+    assert event.timestamp == datetime(2026, 1, 1, 10, 0)
+    assert event.timestamp.tzinfo is None
+
+def test_naive_timestamp_is_kept():
+    event = schemas.UserLoginEventImport(**login_event(timestamp="2026-01-01T12:00:00"))
+    
+    assert event.timestamp == datetime(2026, 1, 1, 12, 0)
+
+def test_future_timestamp_is_rejected():
+    future = datetime.now(timezone.utc) + timedelta(days=1)
+    
+    with pytest.raises(ValidationError, match="in the future"):
+        schemas.UserLoginEventImport(**login_event(timestamp=future.isoformat()))
+
+def test_import_reports_future_timestamps_per_record(db):
+    future = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+    records = [login_event(timestamp="2026-01-01T10:00:00Z"), login_event(timestamp=future), login_event()]
+    
+    result = asyncio.run(import_login_events(body(json.dumps(records).encode()), "application/json"))
+    
+    assert (result.received, result.inserted, result.rejected) == (3, 2, 1)
+    assert result.errors[0].index == 1
+    assert "in the future" in result.errors[0].error
+    assert db.query(models.UserLoginEvent).count() == 2
+
+def test_detector_handles_imported_aware_timestamps(db):
+    imported = [
+        schemas.UserLoginEventImport(**login_event(timestamp="2026-01-01T10:00:00Z")),
+        schemas.UserLoginEventImport(**login_event(success=False, timestamp="2026-01-01T10:05:00Z"))
+    ]
+    detector = LoginAnomalyDetector()
+    for snapshot in create_login_events_bulk(db, imported):
+        assert snapshot.timestamp.tzinfo is None
+        detector.process(snapshot)
+    
+    # A server-stamped event for the same user is compared with the imported ones
+    db_login_event = create_login_event(db, schemas.UserLoginEventCreate(**login_event(success=False)))
+    detector.process(LoginEvent.from_model(db_login_event))